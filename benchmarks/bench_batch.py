@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for batch(), in one event loop and sharded.
+
+Runs the same batch against the fake CLI in claude_agent_sdk.testing, first in
+the parent's event loop and then sharded across worker processes, and
+reports wall time and prompts per second for each. Each fake CLI streams
+`--events` one-character text deltas, so per-message parsing dominates the way
+it does for long streamed answers.
+
+Usage:
+    python benchmarks/bench_batch.py [--prompts N] [--concurrency K]
+        [--processes 1,2,4] [--events N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from claude_agent_sdk import ClaudeAgentOptions, batch  # noqa: E402
+from claude_agent_sdk.testing import FakeCLIWorkload, fake_cli_path  # noqa: E402
+
+
+async def bench(
+    prompts: int, concurrency: int, processes: int | None, events: int
+) -> dict[str, float]:
+    options = ClaudeAgentOptions(
+        cli_path=fake_cli_path(),
+        env=FakeCLIWorkload(text_bytes=events, delta_bytes=1).env(),
+        include_partial_messages=True,
+    )
+    run = batch(
+        [f"prompt {i}" for i in range(prompts)],
+        options,
+        concurrency=concurrency,
+        ordered=False,
+        keep_messages=False,
+        processes=processes,
+    )
+    start = time.perf_counter()
+    async for result in run:
+        if result.error is not None:
+            raise result.error
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "prompts_per_second": round(prompts / elapsed, 1),
+    }
+
+
+def run(
+    prompts: int, concurrency: int, processes: list[int], events: int
+) -> dict[str, dict[str, float]]:
+    # The fake CLI reports a supported version; skip the extra spawn per query
+    os.environ["CLAUDE_AGENT_SDK_SKIP_VERSION_CHECK"] = "1"
+    results = {"in_process": anyio.run(bench, prompts, concurrency, None, events)}
+    for count in processes:
+        results[f"processes_{count}"] = anyio.run(
+            bench, prompts, concurrency, count, events
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--processes",
+        default="1,2,4",
+        help="Comma-separated worker process counts to compare",
+    )
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(
+        args.prompts,
+        args.concurrency,
+        [int(count) for count in args.processes.split(",") if count],
+        args.events,
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<14} {'seconds':>10} {'prompts/s':>12}")
+    for mode, r in results.items():
+        print(f"{mode:<14} {r['seconds']:>10.3f} {r['prompts_per_second']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Microbenchmark for control protocol round trips through Query.
+
+Drives a Query over an in-memory loopback transport that plays the CLI's
+side of the protocol instantly, so the numbers are the SDK's own cost per
+round trip:
+
+- control_round_trip: an SDK-initiated request (`_send_control_request`)
+  answered by the CLI
+- can_use_tool / hook_callback: a CLI-initiated request dispatched to a
+  trivial callback and answered
+- mcp_tools_call: an `mcp_message` tools/call routed to a trivial SDK MCP
+  tool, and mcp_tools_call_direct, the same call through
+  `_handle_sdk_mcp_request` without the control protocol around it
+
+Usage:
+    python benchmarks/bench_control.py [--iterations N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from claude_agent_sdk import (  # noqa: E402
+    PermissionResultAllow,
+    create_sdk_mcp_server,
+    tool,
+)
+from claude_agent_sdk._internal.query import Query  # noqa: E402
+from claude_agent_sdk._internal.transport import Transport  # noqa: E402
+
+
+class LoopbackTransport(Transport):
+    """Plays the CLI: answers SDK requests, delivers SDK responses."""
+
+    def __init__(self) -> None:
+        self._send, self._receive = anyio.create_memory_object_stream[dict[str, Any]](
+            max_buffer_size=1000
+        )
+        self.responses: dict[str, anyio.Event] = {}
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        message = json.loads(data)
+        if message["type"] == "control_request":
+            await self._send.send(
+                {
+                    "type": "control_response",
+                    "response": {
+                        "subtype": "success",
+                        "request_id": message["request_id"],
+                        "response": {},
+                    },
+                }
+            )
+        elif message["type"] == "control_response":
+            self.responses.pop(message["response"]["request_id"]).set()
+
+    async def request(self, request_id: str, request: dict[str, Any]) -> None:
+        """Send a CLI-initiated control request and wait for the SDK's answer."""
+        answered = self.responses[request_id] = anyio.Event()
+        await self._send.send(
+            {"type": "control_request", "request_id": request_id, "request": request}
+        )
+        await answered.wait()
+
+    def read_messages(self) -> AsyncIterator[dict[str, Any]]:
+        return self._receive.__aiter__()
+
+    async def close(self) -> None:
+        self._send.close()
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+@tool("echo", "Echo the input", {"text": str})
+async def echo(args: dict[str, Any]) -> dict[str, Any]:
+    return {"content": [{"type": "text", "text": args["text"]}]}
+
+
+async def allow(
+    tool_name: str, tool_input: dict[str, Any], context: Any
+) -> PermissionResultAllow:
+    return PermissionResultAllow()
+
+
+async def hook(hook_input: Any, tool_use_id: str | None, context: Any) -> Any:
+    return {}
+
+
+TOOLS_CALL = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "tools/call",
+    "params": {"name": "echo", "arguments": {"text": "hi"}},
+}
+
+CLI_REQUESTS: dict[str, dict[str, Any]] = {
+    "can_use_tool": {
+        "subtype": "can_use_tool",
+        "tool_name": "Bash",
+        "input": {"command": "ls"},
+        "permission_suggestions": None,
+    },
+    "hook_callback": {
+        "subtype": "hook_callback",
+        "callback_id": "hook_0",
+        "input": {"hook_event_name": "PreToolUse", "tool_name": "Bash"},
+        "tool_use_id": "toolu_01",
+    },
+    "mcp_tools_call": {
+        "subtype": "mcp_message",
+        "server_name": "bench",
+        "message": TOOLS_CALL,
+    },
+}
+
+
+async def _timed(iterations: int, call: Any) -> float:
+    """Mean microseconds per awaited call, after a warm-up."""
+    for _ in range(min(iterations, 200)):
+        await call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _bench(iterations: int) -> dict[str, dict[str, float]]:
+    transport = LoopbackTransport()
+    server = create_sdk_mcp_server("bench", tools=[echo])
+    query = Query(
+        transport,
+        is_streaming_mode=True,
+        can_use_tool=allow,
+        hooks={"PreToolUse": [{"matcher": None, "hooks": [hook]}]},
+        sdk_mcp_servers={"bench": server["instance"]},
+    )
+    await query.start()
+    await query.initialize()
+    results = {}
+    try:
+        results["control_round_trip"] = await _timed(
+            iterations, lambda: query._send_control_request({"subtype": "interrupt"})
+        )
+        counter = iter(range(10**9))
+        for name, request in CLI_REQUESTS.items():
+            results[name] = await _timed(
+                iterations,
+                lambda request=request: transport.request(
+                    f"cli_{next(counter)}", request
+                ),
+            )
+        results["mcp_tools_call_direct"] = await _timed(
+            iterations, lambda: query._handle_sdk_mcp_request("bench", TOOLS_CALL)
+        )
+    finally:
+        await query.close()
+    return {name: {"us_per_call": round(us, 2)} for name, us in results.items()}
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+    return anyio.run(_bench, iterations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'path':<24} {'us/call':>10}")
+    for name, r in results.items():
+        print(f"{name:<24} {r['us_per_call']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for `import claude_agent_sdk`.
+
+Runs `python -X importtime -c "import claude_agent_sdk"` in fresh
+interpreters and reports the median cumulative import time of the package,
+the slowest modules it pulls in, and whether mcp was loaded. Exits non-zero
+if the median exceeds the budget or mcp is imported eagerly, so it can gate
+CI.
+
+Usage:
+    python benchmarks/bench_import.py [--runs N] [--budget-ms MS] [--top N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+PACKAGE = "claude_agent_sdk"
+
+# Generous enough for slow CI machines; eager mcp imports alone cost ~500ms
+DEFAULT_BUDGET_MS = 250.0
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """Import the package in a fresh interpreter; return self/cumulative µs."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def run(runs: int, top: int) -> dict[str, object]:
+    samples = [import_times() for _ in range(runs)]
+    totals = [sample[PACKAGE][1] for sample in samples]
+    median_run = samples[totals.index(sorted(totals)[len(totals) // 2])]
+    slowest = sorted(
+        (
+            (name, self_us)
+            for name, (self_us, _) in median_run.items()
+            if name != PACKAGE
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "median_ms": round(statistics.median(totals) / 1000, 1),
+        "min_ms": round(min(totals) / 1000, 1),
+        "mcp_imported": any(name.split(".")[0] == "mcp" for name in median_run),
+        "slowest_modules_ms": {
+            name: round(self_us / 1000, 2) for name, self_us in slowest
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.top)
+    results["budget_ms"] = args.budget_ms
+    over_budget = results["median_ms"] > args.budget_ms  # type: ignore[operator]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"import {PACKAGE}: median {results['median_ms']:.1f} ms, "
+            f"min {results['min_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)"
+        )
+        print(f"mcp imported: {results['mcp_imported']}")
+        print(f"{'module':<50} {'self ms':>8}")
+        for name, ms in results["slowest_modules_ms"].items():  # type: ignore[attr-defined]
+            print(f"{name:<50} {ms:>8.2f}")
+
+    if over_budget or results["mcp_imported"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
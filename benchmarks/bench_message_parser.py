@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Microbenchmark for parse_message.
+
+Reports, for each message kind, the time to parse one message and the memory
+retained by the parsed result (allocated blocks and bytes, measured while
+holding every parsed message alive, the way a long transcript does).
+
+Usage:
+    python benchmarks/bench_message_parser.py [--iterations N] [--json]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from claude_agent_sdk._internal.message_parser import parse_message  # noqa: E402
+
+SAMPLE_MESSAGES: dict[str, dict[str, Any]] = {
+    "assistant_text": {
+        "type": "assistant",
+        "message": {
+            "model": "claude-sonnet-4-5",
+            "content": [{"type": "text", "text": "Hello! How can I help today?"}],
+        },
+        "parent_tool_use_id": None,
+        "session_id": "session-1",
+    },
+    "assistant_tool_use": {
+        "type": "assistant",
+        "message": {
+            "model": "claude-sonnet-4-5",
+            "content": [
+                {"type": "thinking", "thinking": "Read the file.", "signature": "sig"},
+                {"type": "text", "text": "Let me read that file."},
+                {
+                    "type": "tool_use",
+                    "id": "toolu_01",
+                    "name": "Read",
+                    "input": {"file_path": "/tmp/example.py"},
+                },
+            ],
+        },
+        "parent_tool_use_id": None,
+        "session_id": "session-1",
+    },
+    "user_tool_result": {
+        "type": "user",
+        "message": {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": "toolu_01",
+                    "content": "x = 1\n" * 200,
+                    "is_error": False,
+                }
+            ],
+        },
+        "parent_tool_use_id": None,
+        "session_id": "session-1",
+    },
+    "system": {
+        "type": "system",
+        "subtype": "init",
+        "session_id": "session-1",
+        "tools": ["Read", "Write", "Bash"],
+        "model": "claude-sonnet-4-5",
+    },
+    "result": {
+        "type": "result",
+        "subtype": "success",
+        "duration_ms": 1200,
+        "duration_api_ms": 1000,
+        "is_error": False,
+        "num_turns": 2,
+        "session_id": "session-1",
+        "total_cost_usd": 0.0123,
+        "usage": {"input_tokens": 100, "output_tokens": 50},
+        "result": "Done.",
+    },
+    "stream_event": {
+        "type": "stream_event",
+        "uuid": "evt-1",
+        "session_id": "session-1",
+        "event": {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": "Hel"},
+        },
+        "parent_tool_use_id": None,
+    },
+}
+
+
+def bench_time(data: dict[str, Any], iterations: int, lazy: bool = False) -> float:
+    """Return mean nanoseconds per parse_message call."""
+    # Warm up
+    for _ in range(min(iterations, 1000)):
+        parse_message(data, lazy=lazy)
+
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        parse_message(data, lazy=lazy)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def bench_memory(
+    data: dict[str, Any], iterations: int, lazy: bool = False
+) -> tuple[float, float]:
+    """Return (allocated blocks, bytes) retained per parsed message."""
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    held = [parse_message(data, lazy=lazy) for _ in range(iterations)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    # Don't count the list that holds the results
+    list_bytes = sys.getsizeof(held)
+    del held
+    return (
+        (blocks_after - blocks_before - 1) / iterations,
+        (current - list_bytes) / iterations,
+    )
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for kind, data in SAMPLE_MESSAGES.items():
+        # Lazy parsing only differs for messages with content blocks
+        modes = [False, True] if data["type"] in ("user", "assistant") else [False]
+        for lazy in modes:
+            ns_per_message = bench_time(data, iterations, lazy)
+            blocks, nbytes = bench_memory(data, min(iterations, 20_000), lazy)
+            results[f"{kind}_lazy" if lazy else kind] = {
+                "ns_per_message": round(ns_per_message, 1),
+                "allocated_blocks_per_message": round(blocks, 2),
+                "retained_bytes_per_message": round(nbytes, 1),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'kind':<22} {'ns/msg':>10} {'blocks/msg':>12} {'bytes/msg':>12}")
+    for kind, r in results.items():
+        print(
+            f"{kind:<22} {r['ns_per_message']:>10.1f} "
+            f"{r['allocated_blocks_per_message']:>12.2f} "
+            f"{r['retained_bytes_per_message']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
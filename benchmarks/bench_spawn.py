@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Spawn-to-first-message latency against the fake CLI.
+
+Measures, over several runs:
+
+- query_first_message: from calling query() with a string prompt to the
+  first message it yields (process spawn plus the CLI's first write)
+- client_connect: ClaudeSDKClient.connect(), i.e. spawn plus the
+  initialize handshake
+- client_first_message: from client.query() on a connected client to the
+  first message of the answer
+
+The fake CLI in claude_agent_sdk.testing is a Python process, so its
+interpreter startup is included; compare runs against each other rather
+than against the real CLI.
+
+Usage:
+    python benchmarks/bench_spawn.py [--runs N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient, query  # noqa: E402
+from claude_agent_sdk.testing import FakeCLIWorkload, fake_cli_path  # noqa: E402
+
+
+async def _sample(options: ClaudeAgentOptions) -> dict[str, float]:
+    # Each answer is read to the end: leaving the generator early would
+    # close it from another task
+    start = time.perf_counter()
+    query_first = None
+    async for _ in query(prompt="hello", options=options):
+        query_first = query_first or time.perf_counter() - start
+
+    client = ClaudeSDKClient(options)
+    start = time.perf_counter()
+    await client.connect()
+    connected = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        client_first = None
+        await client.query("hello")
+        async for _ in client.receive_response():
+            client_first = client_first or time.perf_counter() - start
+    finally:
+        await client.disconnect()
+    assert query_first is not None and client_first is not None
+    return {
+        "query_first_message": query_first,
+        "client_connect": connected,
+        "client_first_message": client_first,
+    }
+
+
+def run(runs: int) -> dict[str, dict[str, float]]:
+    os.environ["CLAUDE_AGENT_SDK_SKIP_VERSION_CHECK"] = "1"
+    options = ClaudeAgentOptions(cli_path=fake_cli_path(), env=FakeCLIWorkload().env())
+    samples = [anyio.run(_sample, options) for _ in range(runs)]
+    results = {}
+    for name in samples[0]:
+        times = sorted(sample[name] * 1000 for sample in samples)
+        results[name] = {
+            "median_ms": round(statistics.median(times), 2),
+            "p90_ms": round(times[min(int(len(times) * 0.9), len(times) - 1)], 2),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'stage':<22} {'median ms':>10} {'p90 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['median_ms']:>10.2f} {r['p90_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
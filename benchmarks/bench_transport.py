@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Microbenchmark for stdout framing in SubprocessCLITransport.
+
+Feeds synthetic CLI output, cut into pipe-sized chunks, through the
+transport's decoded reader (`read_messages`, which buffers text and
+decodes speculatively) and its raw reader (`read_raw_messages`, which
+splits bytes on newlines), and reports messages and megabytes per second
+for each workload.
+
+Usage:
+    python benchmarks/bench_transport.py [--scale N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from claude_agent_sdk._internal.transport.subprocess_cli import (  # noqa: E402
+    SubprocessCLITransport,
+)
+from claude_agent_sdk.types import ClaudeAgentOptions  # noqa: E402
+
+# anyio reads pipes in chunks of at most this many bytes
+PIPE_CHUNK = 65536
+
+
+def _stream_event(i: int) -> dict[str, Any]:
+    return {
+        "type": "stream_event",
+        "uuid": f"evt-{i}",
+        "session_id": "session-1",
+        "parent_tool_use_id": None,
+        "event": {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": "token "},
+        },
+    }
+
+
+def _tool_result(size: int) -> dict[str, Any]:
+    return {
+        "type": "user",
+        "message": {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": "toolu_01",
+                    "content": "x = 1\n" * (size // 6),
+                    "is_error": False,
+                }
+            ],
+        },
+        "parent_tool_use_id": None,
+        "session_id": "session-1",
+    }
+
+
+def workloads(scale: int) -> dict[str, list[dict[str, Any]]]:
+    """Message sequences keyed by name; `scale` multiplies their length."""
+    return {
+        "stream_events": [_stream_event(i) for i in range(2000 * scale)],
+        "tool_results_64k": [_tool_result(64 * 1024) for _ in range(20 * scale)],
+        "tool_results_1m": [_tool_result(1024 * 1024) for _ in range(scale)],
+    }
+
+
+class _FinishedProcess:
+    """Stands in for an exited CLI process whose stdout is `chunks`."""
+
+    returncode = 0
+
+    def __init__(self, chunks: list[bytes]):
+        self.stdout = _Chunks(chunks)
+
+    async def wait(self) -> int:
+        return 0
+
+
+class _Chunks:
+    def __init__(self, chunks: list[Any]):
+        self._chunks = chunks
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _transport(chunks: list[bytes]) -> SubprocessCLITransport:
+    transport = SubprocessCLITransport(
+        prompt="bench",
+        options=ClaudeAgentOptions(cli_path="/bin/false", max_buffer_size=8 << 20),
+    )
+    transport._process = _FinishedProcess(chunks)  # type: ignore[assignment]
+    transport._stdout_stream = _Chunks([c.decode() for c in chunks])  # type: ignore[assignment]
+    return transport
+
+
+async def _read(chunks: list[bytes], raw: bool) -> tuple[int, float]:
+    transport = _transport(chunks)
+    reader = transport.read_raw_messages() if raw else transport.read_messages()
+    count = 0
+    start = time.perf_counter()
+    async for _ in reader:
+        count += 1
+    return count, time.perf_counter() - start
+
+
+def run(scale: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, messages in workloads(scale).items():
+        data = b"".join(json.dumps(m).encode() + b"\n" for m in messages)
+        chunks = [data[i : i + PIPE_CHUNK] for i in range(0, len(data), PIPE_CHUNK)]
+        for raw in (False, True):
+            # Best of three, to keep scheduler noise out of comparisons
+            runs = [anyio.run(_read, chunks, raw) for _ in range(3)]
+            count, elapsed = min(runs, key=lambda run: run[1])
+            assert count == len(messages), f"{name}: read {count} of {len(messages)}"
+            results[f"{name}_raw" if raw else name] = {
+                "ns_per_message": round(elapsed / count * 1e9, 1),
+                "messages_per_second": round(count / elapsed, 1),
+                "mb_per_second": round(len(data) / elapsed / 1e6, 1),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.scale)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'workload':<22} {'ns/msg':>12} {'msgs/s':>12} {'MB/s':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<22} {r['ns_per_message']:>12.1f} "
+            f"{r['messages_per_second']:>12.1f} {r['mb_per_second']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare two benchmark result files and flag regressions.
+
+Reads two files written by benchmarks/run_all.py (for example from the
+parent commit and from HEAD) and prints the relative change of every
+metric they share. Metrics named *_per_second are better when higher;
+all others (times, bytes, allocations) are better when lower. A change
+for the worse beyond the threshold is a regression, and any regression
+makes the exit status 1.
+
+Usage:
+    python benchmarks/compare.py BASE.json HEAD.json [--threshold 0.1] [--all]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_second")
+
+
+def compare(
+    base: dict[str, Any], head: dict[str, Any], threshold: float
+) -> list[dict[str, Any]]:
+    """One row per metric present in both reports, in head's order."""
+    rows = []
+    for bench, cases in head["results"].items():
+        for case, metrics in cases.items():
+            base_metrics = base["results"].get(bench, {}).get(case, {})
+            for metric, value in metrics.items():
+                before = base_metrics.get(metric)
+                if not isinstance(value, int | float) or not isinstance(
+                    before, int | float
+                ):
+                    continue
+                change = (value - before) / before if before else 0.0
+                worse = -change if higher_is_better(metric) else change
+                if worse > threshold:
+                    status = "regression"
+                elif worse < -threshold:
+                    status = "improved"
+                else:
+                    status = "same"
+                rows.append(
+                    {
+                        "name": f"{bench}.{case}.{metric}",
+                        "base": before,
+                        "head": value,
+                        "change": change,
+                        "status": status,
+                    }
+                )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change treated as noise (default 0.1 = 10%%)",
+    )
+    parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    rows = compare(base, head, args.threshold)
+
+    print(f"base: {base.get('commit') or args.base}")
+    print(f"head: {head.get('commit') or args.head}")
+    shown = [row for row in rows if args.all or row["status"] != "same"]
+    if shown:
+        width = max(len(row["name"]) for row in shown)
+        print(f"{'metric':<{width}} {'base':>14} {'head':>14} {'change':>8}")
+        for row in shown:
+            flag = " <-- REGRESSION" if row["status"] == "regression" else ""
+            print(
+                f"{row['name']:<{width}} {row['base']:>14.6g} {row['head']:>14.6g} "
+                f"{row['change']:>+8.1%}{flag}"
+            )
+    regressions = sum(row["status"] == "regression" for row in rows)
+    print(
+        f"{len(rows)} metrics compared, {regressions} regressed, "
+        f"{sum(row['status'] == 'improved' for row in rows)} improved "
+        f"(threshold {args.threshold:.0%})"
+    )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Run the benchmark suite and store the results as JSON.
+
+Runs each benchmark in this directory with settings sized for a run of a
+minute or two, and writes one JSON document holding every result, keyed
+as results[benchmark][case][metric], together with the git commit and
+the interpreter it was measured on. Compare two such files with
+benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run_all.py [--only NAME,...] [--output PATH]
+
+The default output is benchmarks/results/<commit>.json; `--output -`
+prints to stdout.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+BENCHMARKS = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS))
+
+import bench_batch  # noqa: E402
+import bench_control  # noqa: E402
+import bench_import  # noqa: E402
+import bench_message_parser  # noqa: E402
+import bench_spawn  # noqa: E402
+import bench_transport  # noqa: E402
+
+Results = dict[str, dict[str, float]]
+
+
+def _import_time() -> Results:
+    result = bench_import.run(runs=5, top=0)
+    return {"import": {"median_ms": result["median_ms"], "min_ms": result["min_ms"]}}  # type: ignore[dict-item]
+
+
+SUITE: dict[str, Callable[[], Results]] = {
+    "import": _import_time,
+    "message_parser": lambda: bench_message_parser.run(20_000),
+    "transport": lambda: bench_transport.run(1),
+    "control": lambda: bench_control.run(2000),
+    "spawn": lambda: bench_spawn.run(5),
+    "batch": lambda: bench_batch.run(16, 8, [2], 200),
+}
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=BENCHMARKS,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: list[str]) -> dict[str, Any]:
+    results = {}
+    for name in names:
+        print(f"running {name}...", file=sys.stderr)
+        results[name] = SUITE[name]()
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only",
+        help=f"Comma-separated benchmarks to run (default: {','.join(SUITE)})",
+    )
+    parser.add_argument("--output", help="File to write, or - for stdout")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(SUITE)
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    report = run(names)
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+        return
+    output = Path(
+        args.output
+        or BENCHMARKS / "results" / f"{(report['commit'] or 'unknown')[:12]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text + "\n")
+    print(f"wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
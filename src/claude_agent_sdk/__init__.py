@@ -1,8 +1,9 @@
 """Claude SDK for Python."""
 
 from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Any, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from ._errors import (
     ClaudeSDKError,
@@ -10,18 +11,32 @@ from ._errors import (
     CLIJSONDecodeError,
     CLINotFoundError,
     ProcessError,
+    StructuredOutputError,
 )
+from ._internal.batch import BatchRun
+from ._internal.partial_json import IncrementalJSONParser, PartialJSONError
+from ._internal.stream_assembler import StreamAssembler
+from ._internal.structured_output import StructuredOutputStream
+from ._internal.tool_session import current_tool_session
 from ._internal.transport import Transport
 from ._version import __version__
-from .client import ClaudeSDKClient
-from .query import query
+from .batch import batch
+from .client import ClaudeSDKClient, ClientSession
+from .metrics import MetricsRegistry
+from .pool import ClientPool
+from .profiling import Profiler, StageTimer
+from .query import query, query_raw
+from .tracing import TurnTracer
 from .types import (
     AgentDefinition,
     AssistantMessage,
     BaseHookInput,
+    BatchResult,
     CanUseTool,
     ClaudeAgentOptions,
     ContentBlock,
+    ContentBlockView,
+    HedgePolicy,
     HookCallback,
     HookContext,
     HookInput,
@@ -38,6 +53,10 @@ from .types import (
     PostToolUseHookInput,
     PreCompactHookInput,
     PreToolUseHookInput,
+    RawMessage,
+    ResourceLimits,
+    ResourceUsage,
+    RestartPolicy,
     ResultMessage,
     SdkPluginConfig,
     SettingSource,
@@ -48,11 +67,26 @@ from .types import (
     ThinkingBlock,
     ToolPermissionContext,
     ToolResultBlock,
+    ToolSession,
     ToolUseBlock,
     UserMessage,
     UserPromptSubmitHookInput,
 )
 
+if TYPE_CHECKING:
+    from ._internal.sdk_mcp_server import SdkMcpServer
+
+
+def __getattr__(name: str) -> Any:
+    # SdkMcpServer subclasses mcp's Server, so mcp is only imported once it
+    # is used
+    if name == "SdkMcpServer":
+        from ._internal.sdk_mcp_server import SdkMcpServer
+
+        return SdkMcpServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # MCP Server Support
 
 T = TypeVar("T")
@@ -112,7 +146,8 @@ def tool(
         ...     return {"content": [{"type": "text", "text": f"Result: {args['a'] / args['b']}"}]}
 
     Notes:
-        - The tool function must be async (defined with async def)
+        - The tool function must be async (defined with async def), unless the
+          server runs it on an executor (see create_sdk_mcp_server)
         - The function receives a single dict argument with the input parameters
         - The function should return a dict with a "content" key containing the response
         - Errors can be indicated by including "is_error": True in the response
@@ -132,7 +167,12 @@ def tool(
 
 
 def create_sdk_mcp_server(
-    name: str, version: str = "1.0.0", tools: list[SdkMcpTool[Any]] | None = None
+    name: str,
+    version: str = "1.0.0",
+    tools: list[SdkMcpTool[Any]] | None = None,
+    executor: Executor | Callable[[], Executor] | None = None,
+    memory_limit: int | None = None,
+    max_concurrency: int | None = None,
 ) -> McpSdkServerConfig:
     """Create an in-process MCP server that runs within your Python application.
 
@@ -151,6 +191,19 @@ def create_sdk_mcp_server(
         tools: List of SdkMcpTool instances created with the @tool decorator.
             These are the functions that Claude can call through this server.
             If None or empty, the server will have no tools (rarely useful).
+        executor: Optional executor for running tool handlers off the event
+            loop. Accepts an Executor instance or a zero-argument factory such
+            as the ProcessPoolExecutor class itself. Use this for CPU-heavy
+            tools that would otherwise stall message processing. With a
+            process pool, handlers must be defined at module level so they
+            can be pickled, and current_tool_session() returns a copy with
+            only `key` and `session_id`: its `state` is not shared with the
+            worker. Factory-built pools are restarted if a worker crashes.
+        memory_limit: Optional per-call memory budget in bytes for tool
+            handlers. Requires a ProcessPoolExecutor on a POSIX platform;
+            a handler that exceeds it fails with MemoryError.
+        max_concurrency: Optional cap on tool calls running at once on this
+            server, counted across every session the server is attached to.
 
     Returns:
         McpSdkServerConfig: A configuration object that can be passed to
@@ -193,103 +246,59 @@ def create_sdk_mcp_server(
         >>>
         >>> server = create_sdk_mcp_server("store", tools=[add_item])
 
+        CPU-heavy tools in worker processes:
+        >>> from concurrent.futures import ProcessPoolExecutor
+        >>>
+        >>> @tool("analyze", "Analyze a file", {"path": str})
+        ... def analyze(args):  # module-level, so it can be pickled
+        ...     return {"content": [{"type": "text", "text": run_analyzer(args["path"])}]}
+        >>>
+        >>> server = create_sdk_mcp_server(
+        ...     "analyzers", tools=[analyze], executor=ProcessPoolExecutor
+        ... )
+
+        Sharing one server between many concurrent clients:
+        >>> @tool("lookup", "Look up a record", {"key": str})
+        ... async def lookup(args):
+        ...     session = current_tool_session()  # who is calling
+        ...     session.state.setdefault("lookups", []).append(args["key"])
+        ...     return {"content": [{"type": "text", "text": db.get(args["key"])}]}
+        >>>
+        >>> shared = create_sdk_mcp_server("db", tools=[lookup], max_concurrency=32)
+        >>> options = ClaudeAgentOptions(mcp_servers={"db": shared})
+        >>> # Every ClaudeSDKClient(options) now shares the same warmed server
+        >>> shared["instance"].stats()
+
+        Changing tools at runtime, without reconnecting:
+        >>> server = create_sdk_mcp_server("calc", tools=[add])
+        >>> server["instance"].add_tool(multiply)  # sessions are notified
+        >>> server["instance"].remove_tool("add")
+
     Notes:
         - The server runs in the same process as your Python application
         - Tools have direct access to your application's variables and state
         - No subprocess or IPC overhead for tool calls
         - Server lifecycle is managed automatically by the SDK
+        - The returned config may be shared by any number of concurrent
+          clients; each gets its own ToolSession (see current_tool_session())
+        - Tools can be added or removed later through the SdkMcpServer in
+          config["instance"]; connected sessions pick up the change
 
     See Also:
         - tool(): Decorator for creating tool functions
         - ClaudeAgentOptions: Configuration for using servers with query()
     """
-    from mcp.server import Server
-    from mcp.types import ImageContent, TextContent, Tool
+    from ._internal.sdk_mcp_server import SdkMcpServer
 
     # Create MCP server instance
-    server = Server(name, version=version)
-
-    # Register tools if provided
-    if tools:
-        # Store tools for access in handlers
-        tool_map = {tool_def.name: tool_def for tool_def in tools}
-
-        # Register list_tools handler to expose available tools
-        @server.list_tools()  # type: ignore[no-untyped-call,misc]
-        async def list_tools() -> list[Tool]:
-            """Return the list of available tools."""
-            tool_list = []
-            for tool_def in tools:
-                # Convert input_schema to JSON Schema format
-                if isinstance(tool_def.input_schema, dict):
-                    # Check if it's already a JSON schema
-                    if (
-                        "type" in tool_def.input_schema
-                        and "properties" in tool_def.input_schema
-                    ):
-                        schema = tool_def.input_schema
-                    else:
-                        # Simple dict mapping names to types - convert to JSON schema
-                        properties = {}
-                        for param_name, param_type in tool_def.input_schema.items():
-                            if param_type is str:
-                                properties[param_name] = {"type": "string"}
-                            elif param_type is int:
-                                properties[param_name] = {"type": "integer"}
-                            elif param_type is float:
-                                properties[param_name] = {"type": "number"}
-                            elif param_type is bool:
-                                properties[param_name] = {"type": "boolean"}
-                            else:
-                                properties[param_name] = {"type": "string"}  # Default
-                        schema = {
-                            "type": "object",
-                            "properties": properties,
-                            "required": list(properties.keys()),
-                        }
-                else:
-                    # For TypedDict or other types, create basic schema
-                    schema = {"type": "object", "properties": {}}
-
-                tool_list.append(
-                    Tool(
-                        name=tool_def.name,
-                        description=tool_def.description,
-                        inputSchema=schema,
-                    )
-                )
-            return tool_list
-
-        # Register call_tool handler to execute tools
-        @server.call_tool()  # type: ignore[misc]
-        async def call_tool(name: str, arguments: dict[str, Any]) -> Any:
-            """Execute a tool by name with given arguments."""
-            if name not in tool_map:
-                raise ValueError(f"Tool '{name}' not found")
-
-            tool_def = tool_map[name]
-            # Call the tool's handler with arguments
-            result = await tool_def.handler(arguments)
-
-            # Convert result to MCP format
-            # The decorator expects us to return the content, not a CallToolResult
-            # It will wrap our return value in CallToolResult
-            content: list[TextContent | ImageContent] = []
-            if "content" in result:
-                for item in result["content"]:
-                    if item.get("type") == "text":
-                        content.append(TextContent(type="text", text=item["text"]))
-                    if item.get("type") == "image":
-                        content.append(
-                            ImageContent(
-                                type="image",
-                                data=item["data"],
-                                mimeType=item["mimeType"],
-                            )
-                        )
-
-            # Return just the content list - the decorator wraps it
-            return content
+    server = SdkMcpServer(
+        name,
+        version=version,
+        tools=tools,
+        executor=executor,
+        memory_limit=memory_limit,
+        max_concurrency=max_concurrency,
+    )
 
     # Return SDK server configuration
     return McpSdkServerConfig(type="sdk", name=name, instance=server)
@@ -298,10 +307,19 @@ def create_sdk_mcp_server(
 __all__ = [
     # Main exports
     "query",
+    "query_raw",
+    "batch",
+    "BatchRun",
     "__version__",
     # Transport
     "Transport",
     "ClaudeSDKClient",
+    "ClientSession",
+    "ClientPool",
+    "MetricsRegistry",
+    "TurnTracer",
+    "Profiler",
+    "StageTimer",
     # Types
     "PermissionMode",
     "McpServerConfig",
@@ -311,12 +329,24 @@ __all__ = [
     "SystemMessage",
     "ResultMessage",
     "Message",
+    "RawMessage",
+    "ResourceUsage",
+    "ResourceLimits",
+    "RestartPolicy",
+    "HedgePolicy",
+    "BatchResult",
     "ClaudeAgentOptions",
     "TextBlock",
     "ThinkingBlock",
     "ToolUseBlock",
     "ToolResultBlock",
     "ContentBlock",
+    "ContentBlockView",
+    # Streaming
+    "StreamAssembler",
+    "IncrementalJSONParser",
+    "PartialJSONError",
+    "StructuredOutputStream",
     # Tool callbacks
     "CanUseTool",
     "ToolPermissionContext",
@@ -346,10 +376,14 @@ __all__ = [
     "create_sdk_mcp_server",
     "tool",
     "SdkMcpTool",
+    "SdkMcpServer",
+    "ToolSession",
+    "current_tool_session",
     # Errors
     "ClaudeSDKError",
     "CLIConnectionError",
     "CLINotFoundError",
     "ProcessError",
     "CLIJSONDecodeError",
+    "StructuredOutputError",
 ]
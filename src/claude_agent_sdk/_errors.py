@@ -54,3 +54,16 @@ class MessageParseError(ClaudeSDKError):
     def __init__(self, message: str, data: dict[str, Any] | None = None):
         self.data = data
         super().__init__(message)
+
+
+class StructuredOutputError(ClaudeSDKError):
+    """Raised when streamed structured output does not match its schema."""
+
+    def __init__(
+        self, message: str, path: tuple[str | int, ...] = (), value: Any = None
+    ):
+        self.path = path
+        self.value = value
+        if path:
+            message = f"{message} at {'/'.join(str(p) for p in path)}"
+        super().__init__(message)
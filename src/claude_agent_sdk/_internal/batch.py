@@ -0,0 +1,437 @@
+"""Concurrent execution of many independent queries."""
+
+import logging
+import math
+import os
+import pickle
+import struct
+import sys
+from collections.abc import Callable, Iterable, Iterator, Sized
+from dataclasses import replace
+from pathlib import Path
+from subprocess import PIPE
+from typing import Any
+
+import anyio
+from anyio.abc import ByteSendStream, ObjectSendStream, Process, TaskGroup
+from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio.streams.memory import MemoryObjectReceiveStream
+
+from ..types import BatchResult, ClaudeAgentOptions, ResultMessage
+from .client import InternalClient
+from .transport import Transport
+
+logger = logging.getLogger(__name__)
+
+# Frames between the parent and shard workers: a 4-byte big-endian length
+# followed by a pickle
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def add_usage(total: dict[str, Any], usage: dict[str, Any]) -> None:
+    """Add the numeric fields of a usage dict into a running total."""
+    for key, value in usage.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int | float):
+            total[key] = total.get(key, 0) + value
+        elif isinstance(value, dict):
+            add_usage(total.setdefault(key, {}), value)
+
+
+def encode_frame(obj: Any) -> bytes:
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    return _FRAME_HEADER.pack(len(data)) + data
+
+
+async def receive_frame(stream: BufferedByteReceiveStream) -> Any:
+    """Read one frame. Raises anyio.IncompleteRead at end of stream."""
+    (length,) = _FRAME_HEADER.unpack(await stream.receive_exactly(_FRAME_HEADER.size))
+    return pickle.loads(await stream.receive_exactly(length))
+
+
+class BatchRun:
+    """A batch of prompts being run by batch().
+
+    Iterate it to receive a BatchResult for each prompt as it completes. The
+    aggregate cost and usage are updated as results arrive and remain
+    available after iteration ends.
+
+    A global max_budget_usd is shared by reserving part of it for each
+    query while it runs: its share of what is neither spent nor reserved,
+    split over the free concurrency slots (or the prompts left, if fewer)
+    and capped at options.max_budget_usd. The reservation is the query's
+    own max_budget_usd and is released when its result arrives, so
+    concurrent queries can't together overspend the batch.
+
+    To leave the loop early, iterate inside `async with run:` (or call
+    aclose()), which cancels the queries still running. Both must happen in
+    the task that iterates the batch.
+    """
+
+    def __init__(
+        self,
+        prompts: Iterable[str],
+        options: ClaudeAgentOptions,
+        concurrency: int,
+        ordered: bool,
+        spawn_interval: float,
+        retries: int,
+        retry_backoff: float,
+        max_budget_usd: float | None,
+        transport_factory: Callable[[str], Transport] | None,
+        keep_messages: bool = True,
+        processes: int | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1")
+        self._prompts = prompts
+        self._options = options
+        self._concurrency = concurrency
+        self._ordered = ordered
+        self._spawn_interval = spawn_interval
+        self._retries = retries
+        self._retry_backoff = retry_backoff
+        self._max_budget_usd = max_budget_usd
+        self._transport_factory = transport_factory
+        self._keep_messages = keep_messages
+        self._processes = processes
+
+        self._pending: Iterator[tuple[int, str]] | None = None
+        self._prompts_left = len(prompts) if isinstance(prompts, Sized) else None
+        self._spawn_lock: anyio.Lock | None = None
+        self._next_spawn = 0.0
+        self._iterating = False
+        self._task_group: TaskGroup | None = None
+        self._receive: MemoryObjectReceiveStream[BatchResult] | None = None
+        self._finished = False
+        # Results that finished ahead of an earlier prompt, when ordered
+        self._held: dict[int, BatchResult] = {}
+        self._next_index = 0
+
+        # Budget held by queries still running, and the cost of queries that
+        # failed without reporting one
+        self._reserved_usd = 0.0
+        self._unknown_cost_usd = 0.0
+        self._in_flight = 0
+
+        self.total_cost_usd = 0.0
+        self.usage: dict[str, Any] = {}
+        self.completed = 0
+        self.failed = 0
+        self.spawned = 0
+        self.budget_exhausted = False
+        self.skipped: list[int] = []  # Prompts not started once the budget ran out
+        self._skipped: set[int] = set()
+
+    def __aiter__(self) -> "BatchRun":
+        if self._iterating:
+            raise RuntimeError("A batch can only be iterated once")
+        self._iterating = True
+        return self
+
+    async def __anext__(self) -> BatchResult:
+        if self._receive is None and not self._finished:
+            await self._start()
+        while True:
+            if self._ordered:
+                while self._next_index in self._skipped:
+                    self._next_index += 1
+                if self._next_index in self._held:
+                    self._next_index += 1
+                    return self._held.pop(self._next_index - 1)
+            if self._receive is None:
+                # Every worker is done; anything still held follows a gap
+                if self._held:
+                    return self._held.pop(min(self._held))
+                raise StopAsyncIteration
+            try:
+                result = await self._receive.receive()
+            except anyio.EndOfStream:
+                await self.aclose()
+                continue
+            except anyio.get_cancelled_exc_class():
+                # Raises a worker's error instead, if that is what cancelled us
+                await self.aclose()
+                raise
+            if not self._ordered:
+                return result
+            self._held[result.index] = result
+
+    async def __aenter__(self) -> "BatchRun":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop the batch, cancelling any queries still running."""
+        self._finished = True
+        receive, self._receive = self._receive, None
+        task_group, self._task_group = self._task_group, None
+        if receive is not None:
+            receive.close()
+        if task_group is not None:
+            task_group.cancel_scope.cancel()
+            await task_group.__aexit__(None, None, None)
+
+    async def _start(self) -> None:
+        self._pending = enumerate(self._prompts)
+        self._spawn_lock = anyio.Lock()
+        send, self._receive = anyio.create_memory_object_stream[BatchResult](
+            max_buffer_size=self._concurrency
+        )
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        with send:
+            if self._processes is None:
+                for _ in range(self._concurrency):
+                    self._task_group.start_soon(self._worker, send.clone())
+            else:
+                per_process = math.ceil(self._concurrency / self._processes)
+                for _ in range(self._processes):
+                    self._task_group.start_soon(self._shard, per_process, send.clone())
+
+    def _next_prompt(self) -> tuple[int, str, float | None] | None:
+        """Take the next prompt to run and reserve its budget.
+
+        Skips all prompts once the budget is spent.
+        """
+        assert self._pending is not None
+        for index, prompt in self._pending:
+            if self._prompts_left is not None:
+                self._prompts_left -= 1
+            if (
+                self._max_budget_usd is not None
+                and self.total_cost_usd + self._unknown_cost_usd >= self._max_budget_usd
+            ):
+                self.budget_exhausted = True
+                self.skipped.append(index)
+                self._skipped.add(index)
+                continue
+            return index, prompt, self._reserve()
+        return None
+
+    def _reserve(self) -> float | None:
+        if self._max_budget_usd is None:
+            return None
+        unreserved = max(
+            self._max_budget_usd
+            - self.total_cost_usd
+            - self._unknown_cost_usd
+            - self._reserved_usd,
+            0,
+        )
+        slots = self._concurrency - self._in_flight
+        if self._prompts_left is not None:
+            slots = min(slots, self._prompts_left + 1)
+        budget = unreserved / max(slots, 1)
+        if self._options.max_budget_usd is not None:
+            budget = min(budget, self._options.max_budget_usd)
+        self._reserved_usd += budget
+        self._in_flight += 1
+        return budget
+
+    def _settle(self, result: BatchResult, reserved_usd: float | None) -> None:
+        """Release a query's reservation and record its result."""
+        if reserved_usd is not None:
+            self._reserved_usd -= reserved_usd
+            self._in_flight -= 1
+            if result.result is None or result.result.total_cost_usd is None:
+                # The prompt may have been sent, but its cost is unknown
+                self._unknown_cost_usd += reserved_usd
+        self._record(result)
+
+    async def _worker(self, send: ObjectSendStream[BatchResult]) -> None:
+        async with send:
+            while (item := self._next_prompt()) is not None:
+                index, prompt, budget_usd = item
+                result = await self._run_prompt(index, prompt, budget_usd)
+                self._settle(result, budget_usd)
+                await send.send(result)
+
+    def _record(self, result: BatchResult) -> None:
+        if result.result is not None:
+            if result.result.total_cost_usd:
+                self.total_cost_usd += result.result.total_cost_usd
+            if result.result.usage:
+                add_usage(self.usage, result.result.usage)
+        if result.error is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    async def _throttle_spawn(self) -> None:
+        """Space CLI starts at least spawn_interval apart."""
+        if self._spawn_interval <= 0:
+            return
+        assert self._spawn_lock is not None
+        async with self._spawn_lock:
+            delay = self._next_spawn - anyio.current_time()
+            if delay > 0:
+                await anyio.sleep(delay)
+            self._next_spawn = anyio.current_time() + self._spawn_interval
+
+    async def _run_prompt(
+        self, index: int, prompt: str, budget_usd: float | None = None
+    ) -> BatchResult:
+        result = BatchResult(index=index, prompt=prompt)
+        while True:
+            result.attempts += 1
+            result.messages = []
+            result.error = None
+            try:
+                await self._run_once(prompt, result, budget_usd)
+            except Exception as e:
+                result.error = e
+                # Once a ResultMessage arrived the work is done and paid for
+                if result.result is None and result.attempts <= self._retries:
+                    delay = self._retry_backoff * 2 ** (result.attempts - 1)
+                    logger.warning(
+                        f"Batch prompt {index} failed ({e}); retrying in {delay:.1f}s"
+                    )
+                    await anyio.sleep(delay)
+                    continue
+            return result
+
+    async def _run_once(
+        self, prompt: str, result: BatchResult, budget_usd: float | None
+    ) -> None:
+        options = self._options
+        # Cap each query at its reservation of the global budget
+        if budget_usd is not None:
+            options = replace(options, max_budget_usd=budget_usd)
+
+        await self._throttle_spawn()
+        self.spawned += 1
+        transport = self._transport_factory(prompt) if self._transport_factory else None
+        async for message in InternalClient().process_query(
+            prompt=prompt, options=options, transport=transport
+        ):
+            if self._keep_messages:
+                result.messages.append(message)
+            if isinstance(message, ResultMessage):
+                result.result = message
+
+    # Sharding across worker processes
+
+    def _shard_config(self, concurrency: int) -> dict[str, Any]:
+        options = self._options
+        # The default stderr stream can't be pickled; workers use their own
+        if options.debug_stderr is sys.stderr:
+            options = replace(options, debug_stderr=None)
+        # A registry, tracer or profiler in a worker would record into a copy
+        # nobody reads
+        if (
+            options.metrics is not None
+            or options.tracer is not None
+            or options.profiler is not None
+        ):
+            options = replace(options, metrics=None, tracer=None, profiler=None)
+        return {
+            "options": options,
+            "concurrency": concurrency,
+            "retries": self._retries,
+            "retry_backoff": self._retry_backoff,
+            "transport_factory": self._transport_factory,
+            "keep_messages": self._keep_messages,
+        }
+
+    async def _shard(
+        self, concurrency: int, send: ObjectSendStream[BatchResult]
+    ) -> None:
+        """Run prompts in worker processes, keeping `concurrency` in flight.
+
+        If a worker dies, its in-flight prompts fail and a new worker takes
+        over the rest.
+        """
+        async with send:
+            while not await self._run_shard_process(concurrency, send):
+                pass
+
+    async def _run_shard_process(
+        self, concurrency: int, send: ObjectSendStream[BatchResult]
+    ) -> bool:
+        """Run one worker process. Returns False if it exited prematurely."""
+        # Make the worker import this copy of the package, installed or not
+        package_root = str(Path(__file__).resolve().parents[2])
+        pythonpath = os.environ.get("PYTHONPATH")
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [package_root, pythonpath])),
+        }
+        async with await anyio.open_process(
+            [sys.executable, "-m", "claude_agent_sdk._internal.batch_worker"],
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=None,
+            env=env,
+        ) as process:
+            assert process.stdin is not None and process.stdout is not None
+            stdin: ByteSendStream = process.stdin
+            stdout = BufferedByteReceiveStream(process.stdout)
+            in_flight: dict[int, tuple[str, float | None]] = {}
+            try:
+                await stdin.send(encode_frame(self._shard_config(concurrency)))
+                await self._fill_shard(stdin, in_flight, concurrency)
+                while in_flight:
+                    try:
+                        result: BatchResult = await receive_frame(stdout)
+                    except (anyio.IncompleteRead, anyio.EndOfStream):
+                        await self._fail_shard(process, in_flight, send)
+                        return False
+                    result.prompt, budget_usd = in_flight.pop(result.index)
+                    self.spawned += result.attempts
+                    self._settle(result, budget_usd)
+                    await send.send(result)
+                    await self._fill_shard(stdin, in_flight, concurrency)
+                await stdin.send(encode_frame(None))
+                await process.wait()
+                return True
+            except anyio.BrokenResourceError:
+                # The worker closed its stdin while prompts were being sent
+                await self._fail_shard(process, in_flight, send)
+                return False
+            finally:
+                if process.returncode is None:
+                    process.kill()
+
+    async def _fill_shard(
+        self,
+        stdin: ByteSendStream,
+        in_flight: dict[int, tuple[str, float | None]],
+        concurrency: int,
+    ) -> None:
+        while len(in_flight) < concurrency:
+            item = self._next_prompt()
+            if item is None:
+                return
+            index, prompt, budget_usd = item
+            in_flight[index] = (prompt, budget_usd)
+            await self._throttle_spawn()
+            await stdin.send(encode_frame(item))
+
+    async def _fail_shard(
+        self,
+        process: Process,
+        in_flight: dict[int, tuple[str, float | None]],
+        send: ObjectSendStream[BatchResult],
+    ) -> None:
+        returncode = await process.wait()
+        for index, (prompt, budget_usd) in in_flight.items():
+            result = BatchResult(
+                index=index,
+                prompt=prompt,
+                error=RuntimeError(
+                    f"Batch worker process exited with code {returncode}"
+                ),
+                attempts=1,
+            )
+            self.spawned += 1
+            self._settle(result, budget_usd)
+            await send.send(result)
+        in_flight.clear()
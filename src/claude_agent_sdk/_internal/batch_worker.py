@@ -0,0 +1,86 @@
+"""Worker process for batch() sharding.
+
+Run as `python -m claude_agent_sdk._internal.batch_worker`. The parent sends
+frames (see batch.encode_frame) on stdin: first the shard configuration, then
+`(index, prompt, budget_usd)` for each prompt to run, then None once there is
+nothing left. Each finished prompt is answered with a BatchResult frame on
+stdout, without its prompt, which the parent already holds.
+"""
+
+import os
+import pickle
+import sys
+from typing import Any, BinaryIO
+
+import anyio
+import anyio.to_thread
+
+from ..types import BatchResult
+from .batch import _FRAME_HEADER, BatchRun, encode_frame
+
+
+def _read_frame(stream: BinaryIO) -> Any:
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None
+    (length,) = _FRAME_HEADER.unpack(header)
+    return pickle.loads(stream.read(length))
+
+
+def _encode_result(result: BatchResult) -> bytes:
+    result.prompt = ""
+    if result.error is None:
+        return encode_frame(result)
+    # Exceptions with custom constructors or unpicklable state often don't
+    # survive a pickle round trip; send those as their message
+    try:
+        frame = encode_frame(result)
+        pickle.loads(frame[_FRAME_HEADER.size :])
+        return frame
+    except Exception:
+        error = result.error
+        result.error = RuntimeError(f"{type(error).__name__}: {error}")
+        return encode_frame(result)
+
+
+async def _serve(stdin: BinaryIO, stdout: BinaryIO) -> None:
+    config = await anyio.to_thread.run_sync(_read_frame, stdin)
+    if config is None:
+        return
+    runner = BatchRun(
+        prompts=[],
+        options=config["options"],
+        concurrency=config["concurrency"],
+        ordered=False,
+        spawn_interval=0.0,
+        retries=config["retries"],
+        retry_backoff=config["retry_backoff"],
+        max_budget_usd=None,
+        transport_factory=config["transport_factory"],
+        keep_messages=config["keep_messages"],
+    )
+    write_lock = anyio.Lock()
+
+    async def run(index: int, prompt: str, budget_usd: float | None) -> None:
+        result = await runner._run_prompt(index, prompt, budget_usd)
+        frame = _encode_result(result)
+        async with write_lock:
+            await anyio.to_thread.run_sync(stdout.write, frame)
+            await anyio.to_thread.run_sync(stdout.flush)
+
+    async with anyio.create_task_group() as tg:
+        while (
+            request := await anyio.to_thread.run_sync(_read_frame, stdin)
+        ) is not None:
+            tg.start_soon(run, *request)
+
+
+def main() -> None:
+    # Frames own the original stdout; anything else printed goes to stderr
+    stdout = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    anyio.run(_serve, sys.stdin.buffer, stdout)
+
+
+if __name__ == "__main__":
+    main()
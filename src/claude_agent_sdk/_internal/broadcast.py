@@ -0,0 +1,189 @@
+"""Fan-out of one message stream to several independent subscribers."""
+
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import replace
+from typing import Any, Generic, Literal, TypeVar
+
+import anyio
+
+from ..types import StreamEvent
+from .stream_coalescer import merge_deltas
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+OverflowPolicy = Literal["block", "drop_oldest", "coalesce"]
+
+_OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+def _stream_event_dict(message: StreamEvent) -> dict[str, Any]:
+    return {
+        "type": "stream_event",
+        "session_id": message.session_id,
+        "parent_tool_use_id": message.parent_tool_use_id,
+        "event": message.event,
+    }
+
+
+def _merge(first: Any, second: Any) -> Any:
+    """Merge two delta messages, raw or parsed, or return None."""
+    if isinstance(first, dict) and isinstance(second, dict):
+        return merge_deltas(first, second)
+    if isinstance(first, StreamEvent) and isinstance(second, StreamEvent):
+        merged = merge_deltas(_stream_event_dict(first), _stream_event_dict(second))
+        return replace(first, event=merged["event"]) if merged is not None else None
+    return None
+
+
+class Subscription(Generic[T]):
+    """One subscriber's view of a MessageBroadcast.
+
+    Holds up to `buffer_size` undelivered messages. When full, the
+    `overflow` policy decides what happens to the next one:
+
+    - "block": delivery to every subscriber waits until this one catches up
+    - "drop_oldest": the oldest undelivered message is discarded
+    - "coalesce": a partial-message delta is merged into the newest
+      undelivered delta of the same content block; anything that can't be
+      merged waits as with "block"
+
+    Messages are the same objects every subscriber receives, so they must
+    not be modified. Iterate with `async for`; iteration ends when the
+    source ends, and re-raises the error if the source failed. Close the
+    subscription (or use it as a context manager) to stop receiving.
+    """
+
+    def __init__(
+        self,
+        broadcast: "MessageBroadcast[T]",
+        buffer_size: int,
+        overflow: OverflowPolicy,
+    ):
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(_OVERFLOW_POLICIES)}")
+        self._broadcast = broadcast
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.dropped = 0
+        self.coalesced = 0
+        self._queue: deque[T] = deque()
+        self._readable = anyio.Event()
+        self._writable = anyio.Event()
+        self._closed = False
+
+    async def _put(self, message: T) -> None:
+        while not self._closed and len(self._queue) >= self.buffer_size:
+            if self.overflow == "drop_oldest":
+                self._queue.popleft()
+                self.dropped += 1
+                break
+            if self.overflow == "coalesce":
+                merged = _merge(self._queue[-1], message)
+                if merged is not None:
+                    self._queue[-1] = merged
+                    self.coalesced += 1
+                    return
+            self._writable = anyio.Event()
+            await self._writable.wait()
+        if self._closed:
+            return
+        self._queue.append(message)
+        self._readable.set()
+
+    def _finish(self) -> None:
+        self._readable.set()
+
+    def __aiter__(self) -> "Subscription[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        while not self._queue:
+            if self._closed or self._broadcast.finished:
+                if not self._closed and self._broadcast.error is not None:
+                    raise self._broadcast.error
+                raise StopAsyncIteration
+            self._readable = anyio.Event()
+            await self._readable.wait()
+        message = self._queue.popleft()
+        self._writable.set()
+        return message
+
+    def close(self) -> None:
+        """Stop receiving; undelivered messages are discarded."""
+        self._closed = True
+        self._queue.clear()
+        self._broadcast._unsubscribe(self)
+        self._readable.set()
+        self._writable.set()
+
+    def __enter__(self) -> "Subscription[T]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def stats(self) -> dict[str, int]:
+        """Messages waiting, dropped and merged away for this subscriber."""
+        return {
+            "queued": len(self._queue),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class MessageBroadcast(Generic[T]):
+    """Deliver every message of a source stream to each subscriber.
+
+    run() consumes the source once and hands the same message object to
+    every subscription's queue. Subscribers only receive messages that
+    arrive after they subscribe.
+
+    The source's original consumer reads through receive() instead, from
+    a subscription that exists from the start and is kept across calls,
+    so nothing published between two calls is lost. Until receive() is
+    first called its `buffer_size` queue drops the oldest messages rather
+    than holding up the other subscribers; after that it blocks.
+    """
+
+    def __init__(self, source: AsyncIterator[T], buffer_size: int = 100):
+        self._source = source
+        self._subscriptions: list[Subscription[T]] = []
+        self.finished = False
+        self.error: Exception | None = None
+        self._default = self.subscribe(buffer_size, "drop_oldest")
+
+    def subscribe(
+        self, buffer_size: int = 100, overflow: OverflowPolicy = "block"
+    ) -> Subscription[T]:
+        subscription = Subscription(self, buffer_size, overflow)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    async def receive(self) -> AsyncIterator[T]:
+        """Messages for the source's original consumer."""
+        self._default.overflow = "block"
+        async for message in self._default:
+            yield message
+
+    def _unsubscribe(self, subscription: Subscription[T]) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    async def run(self) -> None:
+        try:
+            async for message in self._source:
+                for subscription in list(self._subscriptions):
+                    await subscription._put(message)
+        except Exception as e:
+            logger.debug(f"Broadcast source failed: {e}")
+            self.error = e
+        finally:
+            self.finished = True
+            for subscription in self._subscriptions:
+                subscription._finish()
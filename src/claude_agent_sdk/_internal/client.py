@@ -1,20 +1,26 @@
 """Internal client implementation."""
 
+import time
 from collections.abc import AsyncIterable, AsyncIterator
 from dataclasses import replace
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from ..types import (
     ClaudeAgentOptions,
     HookEvent,
     HookMatcher,
     Message,
+    RawMessage,
+    ResultMessage,
 )
 from .message_parser import parse_message
 from .query import Query
 from .transport import Transport
 from .transport.subprocess_cli import SubprocessCLITransport
 
+if TYPE_CHECKING:
+    from ..metrics import SessionMetrics
+
 
 class InternalClient:
     """Internal client implementation."""
@@ -47,7 +53,48 @@ class InternalClient:
         transport: Transport | None = None,
     ) -> AsyncIterator[Message]:
         """Process a query through transport and Query."""
+        async for message in self._process(prompt, options, transport, raw=False):
+            yield message
+
+    async def process_query_raw(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]],
+        options: ClaudeAgentOptions,
+        transport: Transport | None = None,
+    ) -> AsyncIterator[RawMessage]:
+        """Process a query, yielding data messages undecoded."""
+        async for message in self._process(prompt, options, transport, raw=True):
+            yield message
+
+    async def _process(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]],
+        options: ClaudeAgentOptions,
+        transport: Transport | None,
+        raw: bool,
+    ) -> AsyncIterator[Any]:
+        started = time.perf_counter()
+        query, metrics = await self.open(prompt, options, transport, raw=raw)
+        try:
+            if raw:
+                async for raw_message in query.receive_raw_messages():
+                    yield raw_message
+                return
+
+            async for message in self.messages(query, options, metrics, started):
+                yield message
+
+        finally:
+            await query.close()
 
+    async def open(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]],
+        options: ClaudeAgentOptions,
+        transport: Transport | None = None,
+        raw: bool = False,
+    ) -> "tuple[Query, SessionMetrics | None]":
+        """Spawn the CLI and start a Query for the prompt; the caller closes it."""
         # Validate and configure permission settings (matching TypeScript SDK logic)
         configured_options = options
         if options.can_use_tool:
@@ -68,6 +115,21 @@ class InternalClient:
             # Automatically set permission_prompt_tool_name to "stdio" for control protocol
             configured_options = replace(options, permission_prompt_tool_name="stdio")
 
+        metrics = (
+            configured_options.metrics.session()
+            if configured_options.metrics is not None
+            else None
+        )
+
+        trace = (
+            configured_options.tracer.session()
+            if configured_options.tracer is not None
+            else None
+        )
+        if trace is not None and isinstance(prompt, str):
+            # The prompt goes out on the command line, so the turn starts now
+            trace.prompt_sent()
+
         # Use provided transport or create subprocess transport
         if transport is not None:
             chosen_transport = transport
@@ -75,10 +137,15 @@ class InternalClient:
             chosen_transport = SubprocessCLITransport(
                 prompt=prompt,
                 options=configured_options,
+                metrics=metrics,
+                profiler=configured_options.profiler,
             )
 
         # Connect transport
+        started = time.perf_counter()
         await chosen_transport.connect()
+        if trace is not None:
+            trace.span("spawn", "process", started, time.perf_counter())
 
         # Extract SDK MCP servers from configured options
         sdk_mcp_servers = {}
@@ -99,6 +166,17 @@ class InternalClient:
             if configured_options.hooks
             else None,
             sdk_mcp_servers=sdk_mcp_servers,
+            coalesce_window=configured_options.stream_coalesce_window,
+            coalesce_max_bytes=configured_options.stream_coalesce_max_bytes,
+            raw=raw or configured_options.raw_messages,
+            buffer_size=configured_options.message_buffer_size,
+            buffer_policy=configured_options.message_buffer_policy,
+            spill_dir=configured_options.message_spill_dir,
+            metrics=metrics,
+            trace=trace,
+            profiler=configured_options.profiler,
+            resource_sample_interval=configured_options.resource_sample_interval,
+            resource_limits=configured_options.resource_limits,
         )
 
         try:
@@ -115,10 +193,38 @@ class InternalClient:
                 # Create a task that will run in the background
                 query._tg.start_soon(query.stream_input, prompt)
             # For string prompts, the prompt is already passed via CLI args
-
-            # Yield parsed messages
-            async for data in query.receive_messages():
-                yield parse_message(data)
-
-        finally:
+        except BaseException:
             await query.close()
+            raise
+        return query, metrics
+
+    async def messages(
+        self,
+        query: Query,
+        options: ClaudeAgentOptions,
+        metrics: "SessionMetrics | None",
+        started: float,
+    ) -> AsyncIterator[Message]:
+        """Parse the messages of an opened Query.
+
+        With metrics, a ResultMessage also records the time since `started`.
+        """
+        # Yield parsed messages
+        lazy = options.lazy_content_blocks
+        profiler = options.profiler
+        async for data in query.receive_messages():
+            if metrics is None and profiler is None:
+                yield parse_message(data, lazy=lazy)
+                continue
+            parse_started = time.perf_counter()
+            if profiler is None:
+                message = parse_message(data, lazy=lazy)
+            else:
+                with profiler.stage("parse_message", type=data.get("type")):
+                    message = parse_message(data, lazy=lazy)
+            if metrics is not None:
+                now = time.perf_counter()
+                metrics.parsed("message", now - parse_started)
+                if isinstance(message, ResultMessage):
+                    metrics.query_finished(now - started, message.subtype)
+            yield message
@@ -0,0 +1,209 @@
+"""Hedged one-shot queries: a second attempt races a slow first one."""
+
+import logging
+import math
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import suppress
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+import anyio
+from anyio.streams.memory import MemoryObjectSendStream
+
+from .._errors import CLIConnectionError
+from ..types import ClaudeAgentOptions, HedgePolicy, Message, ResultMessage
+from .client import InternalClient
+
+if TYPE_CHECKING:
+    from ..metrics import MetricsRegistry
+    from .query import Query
+
+logger = logging.getLogger(__name__)
+
+# Time a losing attempt gets to stop and report its cost after the interrupt
+_SETTLE_TIMEOUT = 2.0
+
+
+class _Attempt:
+    """One CLI process running the query's prompt."""
+
+    def __init__(self, options: ClaudeAgentOptions, reserved_usd: float | None):
+        self.options = options
+        # Budget held for a hedge until its cost is known; None for the
+        # first attempt, which is not extra
+        self.reserved_usd = reserved_usd
+        self.messages: list[Message] = []
+        self.result: ResultMessage | None = None
+        self.query: Query | None = None
+        self.input_done = anyio.Event()
+        self.done = anyio.Event()
+        self.scope = anyio.CancelScope()
+
+    async def _prompt(self, prompt: str) -> AsyncIterator[dict[str, Any]]:
+        # Sent as a stream, with input kept open until the result, so that
+        # the attempt can still be interrupted
+        yield {
+            "type": "user",
+            "message": {"role": "user", "content": prompt},
+            "parent_tool_use_id": None,
+            "session_id": "default",
+        }
+        await self.input_done.wait()
+
+    async def run(
+        self,
+        prompt: str,
+        started: float,
+        send: MemoryObjectSendStream[tuple["_Attempt", Exception | None]],
+    ) -> None:
+        """Run the prompt; reports the result, or the error before one."""
+        client = InternalClient()
+        with send, self.scope:
+            try:
+                self.query, metrics = await client.open(
+                    self._prompt(prompt), self.options
+                )
+                async for message in client.messages(
+                    self.query, self.options, metrics, started
+                ):
+                    if self.result is not None:
+                        continue
+                    self.messages.append(message)
+                    if isinstance(message, ResultMessage):
+                        self.result = message
+                        # Ending input lets the CLI exit after the result
+                        self.input_done.set()
+                        send.send_nowait((self, None))
+                if self.result is None:
+                    raise CLIConnectionError("CLI exited before sending a result")
+            except Exception as e:
+                if self.result is None:
+                    send.send_nowait((self, e))
+                else:
+                    logger.debug(f"Error after the result of a hedged attempt: {e}")
+            finally:
+                self.input_done.set()
+                if self.query is not None:
+                    await self.query.close()
+                self.done.set()
+
+    async def abandon(self) -> None:
+        """Interrupt the attempt, giving it a moment to report its cost."""
+        if self.query is not None:
+            with anyio.move_on_after(_SETTLE_TIMEOUT):
+                with suppress(Exception):
+                    await self.query.interrupt()
+                await self.done.wait()
+        self.scope.cancel()
+
+    def settle(self, policy: HedgePolicy) -> None:
+        """Release a hedge's reservation, charging what it cost."""
+        if self.reserved_usd is None:
+            return
+        policy._reserved_usd -= self.reserved_usd
+        if self.result is not None and self.result.total_cost_usd is not None:
+            policy.spent_usd += self.result.total_cost_usd
+        elif self.query is not None:
+            # The prompt went out but its cost is unknown
+            policy.spent_usd += self.reserved_usd
+
+
+def hedge_delay(policy: HedgePolicy, registry: "MetricsRegistry | None") -> float:
+    """Seconds to wait for a result before starting a hedge."""
+    if policy.percentile is None or registry is None:
+        return policy.delay
+    if registry.query_seconds.count("success") < policy.min_samples:
+        return policy.delay
+    delay = registry.query_seconds.quantile(policy.percentile, "success")
+    return policy.delay if delay is None else delay
+
+
+def _reserve(policy: HedgePolicy, options: ClaudeAgentOptions) -> _Attempt | None:
+    budget = policy.remaining_usd()
+    if options.max_budget_usd is not None:
+        budget = min(budget, options.max_budget_usd)
+    if budget <= 0:
+        return None
+    policy._reserved_usd += budget
+    return _Attempt(replace(options, max_budget_usd=budget), budget)
+
+
+async def hedged_query(
+    prompt: str, options: ClaudeAgentOptions, policy: HedgePolicy
+) -> AsyncGenerator[Message, None]:
+    """Run a query, racing a second attempt against it once it is slow.
+
+    Yields the messages of the first attempt to produce a ResultMessage.
+    Raises the first attempt's error if every attempt failed.
+    """
+    started = time.perf_counter()
+    registry = options.metrics
+    send, receive = anyio.create_memory_object_stream[
+        tuple[_Attempt, Exception | None]
+    ](max_buffer_size=math.inf)
+    attempts = [_Attempt(options, None)]
+    hedge_timer = anyio.CancelScope()
+    winner: _Attempt | None = None
+    errors: list[Exception] = []
+
+    async def hedge() -> None:
+        with hedge_timer:
+            await anyio.sleep(hedge_delay(policy, registry))
+            attempt = _reserve(policy, options)
+            if attempt is None:
+                policy.skipped += 1
+                if registry is not None:
+                    registry.hedged_queries.inc("skipped")
+                return
+            policy.hedges += 1
+            logger.debug(
+                f"No result after {time.perf_counter() - started:.2f}s, "
+                f"starting a hedge with a ${attempt.reserved_usd:.4f} budget"
+            )
+            attempts.append(attempt)
+            tg.start_soon(attempt.run, prompt, started, send.clone())
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(attempts[0].run, prompt, started, send.clone())
+            tg.start_soon(hedge)
+
+            try:
+                async for attempt, error in receive:
+                    if error is None:
+                        winner = attempt
+                        break
+                    errors.append(error)
+                    if len(errors) == len(attempts):
+                        # Not worth hedging a query that failed outright
+                        hedge_timer.cancel()
+                        break
+
+                if winner is not None:
+                    hedge_timer.cancel()
+                    for attempt in attempts:
+                        if attempt is not winner:
+                            tg.start_soon(attempt.abandon)
+                    if len(attempts) > 1:
+                        is_hedge = winner.reserved_usd is not None
+                        if is_hedge:
+                            policy.hedge_wins += 1
+                        if registry is not None:
+                            registry.hedged_queries.inc(
+                                "hedge" if is_hedge else "primary"
+                            )
+                    for message in winner.messages:
+                        yield message
+            except GeneratorExit:
+                # Closed early by the consumer. Letting GeneratorExit reach
+                # the task group would report it as an attempt error.
+                tg.cancel_scope.cancel()
+    finally:
+        send.close()
+        receive.close()
+        for attempt in attempts:
+            attempt.settle(policy)
+
+    if winner is None and errors:
+        raise errors[0]
@@ -0,0 +1,128 @@
+"""Message buffer that spills to disk instead of applying backpressure."""
+
+import json
+import logging
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import IO, Any
+
+import anyio
+
+from ..types import RawMessage
+from .raw_message import sniff_message
+
+logger = logging.getLogger(__name__)
+
+# Line prefixes in the spill file: decoded message dicts, raw CLI lines
+_DICT = b"D"
+_RAW = b"R"
+
+
+class SpillBuffer:
+    """FIFO of messages that never blocks the sender.
+
+    Up to `memory_limit` messages are held in memory. Beyond that, messages
+    are appended to a temporary file (in `directory`, if given) and read
+    back in order as the consumer catches up, so a slow consumer costs disk
+    space rather than stalling the reader of the CLI's output.
+
+    Messages must be JSON-serializable dicts or RawMessage. Sends and
+    receives use the same object; iterate it with `async for`.
+    """
+
+    def __init__(self, memory_limit: int, directory: str | Path | None = None):
+        if memory_limit < 1:
+            raise ValueError("memory_limit must be at least 1")
+        self.memory_limit = memory_limit
+        self._directory = directory
+        self._memory: deque[dict[str, Any] | RawMessage] = deque()
+        self._file: IO[bytes] | None = None
+        self._read_offset = 0
+        self._on_disk = 0
+        self._readable = anyio.Event()
+        self._closed = False
+        self.spilled = 0
+        self.peak_on_disk = 0
+
+    async def send(self, message: dict[str, Any] | RawMessage) -> None:
+        if self._closed:
+            raise anyio.ClosedResourceError
+        # Once anything is on disk, newer messages queue behind it there
+        if self._on_disk or len(self._memory) >= self.memory_limit:
+            self._spill(message)
+        else:
+            self._memory.append(message)
+        self._readable.set()
+
+    def _spill(self, message: dict[str, Any] | RawMessage) -> None:
+        if self._file is None:
+            # Closed in close(); lives as long as the buffer
+            self._file = tempfile.TemporaryFile(  # noqa: SIM115
+                prefix="claude-sdk-spill-", dir=self._directory
+            )
+            logger.debug(
+                f"Message buffer exceeded {self.memory_limit} messages; "
+                "spilling to disk"
+            )
+        if isinstance(message, RawMessage):
+            line = _RAW + message.data
+        else:
+            line = _DICT + json.dumps(message).encode()
+        self._file.seek(0, 2)
+        self._file.write(line + b"\n")
+        self._on_disk += 1
+        self.spilled += 1
+        self.peak_on_disk = max(self.peak_on_disk, self._on_disk)
+
+    def _load(self) -> None:
+        """Move the oldest spilled messages back into memory."""
+        assert self._file is not None
+        self._file.seek(self._read_offset)
+        while self._on_disk and len(self._memory) < self.memory_limit:
+            line = self._file.readline()
+            self._read_offset += len(line)
+            self._on_disk -= 1
+            body = line[1:-1]
+            if line[:1] == _RAW:
+                self._memory.append(sniff_message(body))
+            else:
+                self._memory.append(json.loads(body))
+        if not self._on_disk:
+            # Everything is back in memory; start the file over
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_offset = 0
+
+    def __aiter__(self) -> "SpillBuffer":
+        return self
+
+    async def __anext__(self) -> dict[str, Any] | RawMessage:
+        while not self._memory:
+            if self._on_disk:
+                self._load()
+                break
+            if self._closed:
+                raise StopAsyncIteration
+            self._readable = anyio.Event()
+            await self._readable.wait()
+        return self._memory.popleft()
+
+    def close(self) -> None:
+        """Discard buffered messages and remove the spill file."""
+        self._closed = True
+        self._memory.clear()
+        self._on_disk = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._readable.set()
+
+    def stats(self) -> dict[str, int]:
+        """Messages in memory and on disk now, and spilled in total."""
+        return {
+            "in_memory": len(self._memory),
+            "on_disk": self._on_disk,
+            "spilled": self.spilled,
+            "peak_on_disk": self.peak_on_disk,
+        }
@@ -1,13 +1,16 @@
 """Message parser for Claude Code SDK responses."""
 
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from .._errors import MessageParseError
 from ..types import (
     AssistantMessage,
     ContentBlock,
+    ContentBlockView,
     Message,
+    ResourceUsage,
     ResultMessage,
     StreamEvent,
     SystemMessage,
@@ -21,12 +24,156 @@ from ..types import (
 logger = logging.getLogger(__name__)
 
 
-def parse_message(data: dict[str, Any]) -> Message:
+# Content block parsers, keyed by block "type"
+
+
+def _parse_text_block(block: dict[str, Any]) -> TextBlock:
+    return TextBlock(text=block["text"])
+
+
+def _parse_thinking_block(block: dict[str, Any]) -> ThinkingBlock:
+    return ThinkingBlock(thinking=block["thinking"], signature=block["signature"])
+
+
+def _parse_tool_use_block(block: dict[str, Any]) -> ToolUseBlock:
+    return ToolUseBlock(id=block["id"], name=block["name"], input=block["input"])
+
+
+def _parse_tool_result_block(block: dict[str, Any]) -> ToolResultBlock:
+    return ToolResultBlock(
+        tool_use_id=block["tool_use_id"],
+        content=block.get("content"),
+        is_error=block.get("is_error"),
+    )
+
+
+BlockParser = Callable[[dict[str, Any]], ContentBlock]
+
+_USER_BLOCK_PARSERS: dict[str, BlockParser] = {
+    "text": _parse_text_block,
+    "tool_use": _parse_tool_use_block,
+    "tool_result": _parse_tool_result_block,
+}
+
+_ASSISTANT_BLOCK_PARSERS: dict[str, BlockParser] = {
+    "text": _parse_text_block,
+    "thinking": _parse_thinking_block,
+    "tool_use": _parse_tool_use_block,
+    "tool_result": _parse_tool_result_block,
+}
+
+
+def _parse_blocks(
+    blocks: list[dict[str, Any]], parsers: dict[str, BlockParser]
+) -> list[ContentBlock]:
+    # Unknown block types are skipped
+    content_blocks: list[ContentBlock] = []
+    for block in blocks:
+        parser = parsers.get(block["type"])
+        if parser is not None:
+            content_blocks.append(parser(block))
+    return content_blocks
+
+
+# Message parsers, keyed by message "type"
+
+
+def _parse_user_message(data: dict[str, Any]) -> UserMessage:
+    content = data["message"]["content"]
+    if isinstance(content, list):
+        content = _parse_blocks(content, _USER_BLOCK_PARSERS)
+    return UserMessage(
+        content=content,
+        parent_tool_use_id=data.get("parent_tool_use_id"),
+    )
+
+
+def _parse_assistant_message(data: dict[str, Any]) -> AssistantMessage:
+    return AssistantMessage(
+        content=_parse_blocks(data["message"]["content"], _ASSISTANT_BLOCK_PARSERS),
+        model=data["message"]["model"],
+        parent_tool_use_id=data.get("parent_tool_use_id"),
+    )
+
+
+def _parse_system_message(data: dict[str, Any]) -> SystemMessage:
+    return SystemMessage(subtype=data["subtype"], data=data)
+
+
+def _parse_result_message(data: dict[str, Any]) -> ResultMessage:
+    return ResultMessage(
+        subtype=data["subtype"],
+        duration_ms=data["duration_ms"],
+        duration_api_ms=data["duration_api_ms"],
+        is_error=data["is_error"],
+        num_turns=data["num_turns"],
+        session_id=data["session_id"],
+        total_cost_usd=data.get("total_cost_usd"),
+        usage=data.get("usage"),
+        result=data.get("result"),
+        structured_output=data.get("structured_output"),
+        resource_usage=ResourceUsage(**data["sdk_resource_usage"])
+        if "sdk_resource_usage" in data
+        else None,
+    )
+
+
+def _parse_stream_event(data: dict[str, Any]) -> StreamEvent:
+    return StreamEvent(
+        uuid=data["uuid"],
+        session_id=data["session_id"],
+        event=data["event"],
+        parent_tool_use_id=data.get("parent_tool_use_id"),
+    )
+
+
+def _parse_user_message_lazy(data: dict[str, Any]) -> UserMessage:
+    content = data["message"]["content"]
+    if isinstance(content, list):
+        content = ContentBlockView(content, _USER_BLOCK_PARSERS)
+    return UserMessage(
+        content=content,
+        parent_tool_use_id=data.get("parent_tool_use_id"),
+        raw=data,
+    )
+
+
+def _parse_assistant_message_lazy(data: dict[str, Any]) -> AssistantMessage:
+    return AssistantMessage(
+        content=ContentBlockView(data["message"]["content"], _ASSISTANT_BLOCK_PARSERS),
+        model=data["message"]["model"],
+        parent_tool_use_id=data.get("parent_tool_use_id"),
+        raw=data,
+    )
+
+
+MessageParser = Callable[[dict[str, Any]], Message]
+
+_MESSAGE_PARSERS: dict[str, MessageParser] = {
+    "user": _parse_user_message,
+    "assistant": _parse_assistant_message,
+    "system": _parse_system_message,
+    "result": _parse_result_message,
+    "stream_event": _parse_stream_event,
+}
+
+_LAZY_MESSAGE_PARSERS: dict[str, MessageParser] = {
+    **_MESSAGE_PARSERS,
+    "user": _parse_user_message_lazy,
+    "assistant": _parse_assistant_message_lazy,
+}
+
+
+def parse_message(data: dict[str, Any], lazy: bool = False) -> Message:
     """
     Parse message from CLI output into typed Message objects.
 
     Args:
         data: Raw message dictionary from CLI output
+        lazy: If True, user and assistant content blocks are built on first
+            access through a ContentBlockView, and the message keeps `data`
+            as its `raw` attribute. Missing block fields are then reported
+            when the block is accessed rather than here.
 
     Returns:
         Parsed Message object
@@ -44,130 +191,14 @@ def parse_message(data: dict[str, Any]) -> Message:
     if not message_type:
         raise MessageParseError("Message missing 'type' field", data)
 
-    match message_type:
-        case "user":
-            try:
-                parent_tool_use_id = data.get("parent_tool_use_id")
-                if isinstance(data["message"]["content"], list):
-                    user_content_blocks: list[ContentBlock] = []
-                    for block in data["message"]["content"]:
-                        match block["type"]:
-                            case "text":
-                                user_content_blocks.append(
-                                    TextBlock(text=block["text"])
-                                )
-                            case "tool_use":
-                                user_content_blocks.append(
-                                    ToolUseBlock(
-                                        id=block["id"],
-                                        name=block["name"],
-                                        input=block["input"],
-                                    )
-                                )
-                            case "tool_result":
-                                user_content_blocks.append(
-                                    ToolResultBlock(
-                                        tool_use_id=block["tool_use_id"],
-                                        content=block.get("content"),
-                                        is_error=block.get("is_error"),
-                                    )
-                                )
-                    return UserMessage(
-                        content=user_content_blocks,
-                        parent_tool_use_id=parent_tool_use_id,
-                    )
-                return UserMessage(
-                    content=data["message"]["content"],
-                    parent_tool_use_id=parent_tool_use_id,
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in user message: {e}", data
-                ) from e
-
-        case "assistant":
-            try:
-                content_blocks: list[ContentBlock] = []
-                for block in data["message"]["content"]:
-                    match block["type"]:
-                        case "text":
-                            content_blocks.append(TextBlock(text=block["text"]))
-                        case "thinking":
-                            content_blocks.append(
-                                ThinkingBlock(
-                                    thinking=block["thinking"],
-                                    signature=block["signature"],
-                                )
-                            )
-                        case "tool_use":
-                            content_blocks.append(
-                                ToolUseBlock(
-                                    id=block["id"],
-                                    name=block["name"],
-                                    input=block["input"],
-                                )
-                            )
-                        case "tool_result":
-                            content_blocks.append(
-                                ToolResultBlock(
-                                    tool_use_id=block["tool_use_id"],
-                                    content=block.get("content"),
-                                    is_error=block.get("is_error"),
-                                )
-                            )
-
-                return AssistantMessage(
-                    content=content_blocks,
-                    model=data["message"]["model"],
-                    parent_tool_use_id=data.get("parent_tool_use_id"),
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in assistant message: {e}", data
-                ) from e
-
-        case "system":
-            try:
-                return SystemMessage(
-                    subtype=data["subtype"],
-                    data=data,
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in system message: {e}", data
-                ) from e
-
-        case "result":
-            try:
-                return ResultMessage(
-                    subtype=data["subtype"],
-                    duration_ms=data["duration_ms"],
-                    duration_api_ms=data["duration_api_ms"],
-                    is_error=data["is_error"],
-                    num_turns=data["num_turns"],
-                    session_id=data["session_id"],
-                    total_cost_usd=data.get("total_cost_usd"),
-                    usage=data.get("usage"),
-                    result=data.get("result"),
-                    structured_output=data.get("structured_output"),
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in result message: {e}", data
-                ) from e
-
-        case "stream_event":
-            try:
-                return StreamEvent(
-                    uuid=data["uuid"],
-                    session_id=data["session_id"],
-                    event=data["event"],
-                    parent_tool_use_id=data.get("parent_tool_use_id"),
-                )
-            except KeyError as e:
-                raise MessageParseError(
-                    f"Missing required field in stream_event message: {e}", data
-                ) from e
-
-        case _:
-            raise MessageParseError(f"Unknown message type: {message_type}", data)
+    parsers = _LAZY_MESSAGE_PARSERS if lazy else _MESSAGE_PARSERS
+    parser = parsers.get(message_type) if isinstance(message_type, str) else None
+    if parser is None:
+        raise MessageParseError(f"Unknown message type: {message_type}", data)
+
+    try:
+        return parser(data)
+    except KeyError as e:
+        raise MessageParseError(
+            f"Missing required field in {message_type} message: {e}", data
+        ) from e
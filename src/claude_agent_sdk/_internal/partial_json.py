@@ -0,0 +1,346 @@
+"""Incremental JSON parser for streamed tool input and structured output.
+
+Tool input and structured output arrive from the API as a series of JSON
+text fragments (`input_json_delta`). Re-parsing the accumulated text on
+every delta is quadratic; this parser instead consumes each fragment once
+and builds the value in place, so the work per delta is proportional to
+the delta's length.
+"""
+
+import json
+import re
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+_LITERAL_CHARS = frozenset("truefalsn")
+_LITERALS = {"true": True, "false": False, "null": None}
+_STRING_STOP = re.compile(r'["\\]')
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# Container states
+_KEY_OR_END = 0  # just after "{"
+_KEY = 1  # after "," in an object
+_COLON = 2
+_VALUE_OR_END = 3  # just after "["
+_VALUE = 4
+_COMMA_OR_END = 5
+
+_MISSING: Any = object()
+
+Path = tuple[str | int, ...]
+
+
+class PartialJSONError(ValueError):
+    """Raised when streamed text cannot be valid JSON."""
+
+
+class _Frame:
+    """An open object or array on the parser stack."""
+
+    __slots__ = ("container", "is_object", "key", "state", "path")
+
+    def __init__(self, container: Any, is_object: bool, path: Path | None):
+        self.container = container
+        self.is_object = is_object
+        self.key: str | None = None
+        self.state = _KEY_OR_END if is_object else _VALUE_OR_END
+        self.path = path
+
+
+class IncrementalJSONParser:
+    """Parse a JSON document fed in arbitrary fragments.
+
+    Objects and arrays are attached to their parent as soon as they open, so
+    `value` always reflects everything parsed so far. Scalars are attached
+    once complete; snapshot() additionally includes a string that is still
+    being streamed.
+
+    With `event_depth` > 0, feed() also returns each value that completed in
+    that fragment at nesting depth <= event_depth, as (path, value) pairs.
+    Depth 1 is a member of the root object or array.
+    """
+
+    def __init__(self, event_depth: int = 0):
+        self._stack: list[_Frame] = []
+        self._root: Any = _MISSING
+        self._token: str | None = None  # "string", "number" or "literal"
+        self._parts: list[str] = []
+        self._is_key = False
+        self._escape: str | None = None
+        self._has_surrogates = False
+        self._event_depth = event_depth
+        self._events: list[tuple[Path, Any]] = []
+        self._complete = False
+
+    @property
+    def value(self) -> Any:
+        """The value parsed so far (live; do not mutate), or None if nothing yet."""
+        return None if self._root is _MISSING else self._root
+
+    @property
+    def complete(self) -> bool:
+        """Whether a full JSON value has been parsed."""
+        return self._complete
+
+    def feed(self, chunk: str) -> list[tuple[Path, Any]]:
+        """Consume the next fragment of JSON text.
+
+        Returns:
+            Values completed in this fragment at depth <= event_depth.
+
+        Raises:
+            PartialJSONError: If the text so far cannot be valid JSON
+        """
+        i = 0
+        n = len(chunk)
+        while i < n:
+            token = self._token
+            if token == "string":
+                i = self._consume_string(chunk, i)
+            elif token is not None:
+                allowed = _NUMBER_CHARS if token == "number" else _LITERAL_CHARS
+                j = i
+                while j < n and chunk[j] in allowed:
+                    j += 1
+                self._parts.append(chunk[i:j])
+                i = j
+                if j < n:
+                    # Delimiter reached; it is handled on the next iteration
+                    self._finish_scalar()
+            else:
+                c = chunk[i]
+                i += 1
+                if c not in _WHITESPACE:
+                    self._structural(c)
+
+        events, self._events = self._events, []
+        return events
+
+    def finish(self) -> Any:
+        """Signal end of input and return the complete value.
+
+        Raises:
+            PartialJSONError: If the document is incomplete
+        """
+        if self._token in ("number", "literal"):
+            self._finish_scalar()
+        if not self._complete:
+            raise PartialJSONError("Incomplete JSON document")
+        return self._root
+
+    def snapshot(self) -> Any:
+        """Return a copy of the value so far, including an unfinished string.
+
+        Only the containers on the path to the value being parsed are copied,
+        so the cost is bounded by their size rather than the whole document.
+        """
+        if self._root is _MISSING:
+            return "".join(self._parts) if self._token == "string" else None
+        if self._complete or not self._stack:
+            return self._root
+
+        copies: list[Any] = [
+            dict(frame.container) if frame.is_object else list(frame.container)
+            for frame in self._stack
+        ]
+        for parent_frame, parent, child in zip(
+            self._stack, copies, copies[1:], strict=False
+        ):
+            if parent_frame.is_object:
+                parent[parent_frame.key] = child
+            else:
+                parent[-1] = child
+
+        if self._token == "string" and not self._is_key:
+            top_frame, top = self._stack[-1], copies[-1]
+            partial = "".join(self._parts)
+            if top_frame.is_object:
+                top[top_frame.key] = partial
+            else:
+                top.append(partial)
+        return copies[0]
+
+    # Parsing
+
+    def _structural(self, c: str) -> None:
+        if not self._stack:
+            if self._root is not _MISSING:
+                raise PartialJSONError(f"Unexpected {c!r} after JSON document")
+            self._start_value(c)
+            return
+
+        frame = self._stack[-1]
+        state = frame.state
+        if frame.is_object:
+            if state in (_KEY_OR_END, _KEY):
+                if c == '"':
+                    self._token = "string"
+                    self._is_key = True
+                elif c == "}" and state == _KEY_OR_END:
+                    self._close()
+                else:
+                    raise PartialJSONError(f"Expected object key, got {c!r}")
+            elif state == _COLON:
+                if c != ":":
+                    raise PartialJSONError(f"Expected ':', got {c!r}")
+                frame.state = _VALUE
+            elif state == _VALUE:
+                self._start_value(c)
+            elif c == ",":
+                frame.state = _KEY
+            elif c == "}":
+                self._close()
+            else:
+                raise PartialJSONError(f"Expected ',' or '}}', got {c!r}")
+        else:
+            if state == _VALUE_OR_END and c == "]":
+                self._close()
+            elif state in (_VALUE_OR_END, _VALUE):
+                self._start_value(c)
+            elif c == ",":
+                frame.state = _VALUE
+            elif c == "]":
+                self._close()
+            else:
+                raise PartialJSONError(f"Expected ',' or ']', got {c!r}")
+
+    def _start_value(self, c: str) -> None:
+        if c == "{" or c == "[":
+            container: Any = {} if c == "{" else []
+            path = self._attach(container, emit=False)
+            self._stack.append(_Frame(container, c == "{", path))
+        elif c == '"':
+            self._token = "string"
+            self._is_key = False
+        elif c == "-" or c.isdigit():
+            self._token = "number"
+            self._parts = [c]
+        elif c in "tfn":
+            self._token = "literal"
+            self._parts = [c]
+        else:
+            raise PartialJSONError(f"Unexpected {c!r} where a value was expected")
+
+    def _attach(self, value: Any, emit: bool = True) -> Path | None:
+        """Attach a value to its parent. Returns its path if it is reportable."""
+        depth = len(self._stack)
+        path: Path | None = None
+        if not self._stack:
+            self._root = value
+            if emit:
+                self._complete = True
+            path = ()
+        else:
+            frame = self._stack[-1]
+            if depth <= self._event_depth:
+                parent_path = frame.path or ()
+                step = frame.key if frame.is_object else len(frame.container)
+                path = (*parent_path, step)  # type: ignore[arg-type]
+            if frame.is_object:
+                frame.container[frame.key] = value
+            else:
+                frame.container.append(value)
+            frame.state = _COMMA_OR_END
+
+        if emit and 0 < depth <= self._event_depth and path is not None:
+            self._events.append((path, value))
+        return path
+
+    def _close(self) -> None:
+        frame = self._stack.pop()
+        depth = len(self._stack)
+        if not self._stack:
+            self._complete = True
+        elif 0 < depth <= self._event_depth and frame.path is not None:
+            self._events.append((frame.path, frame.container))
+
+    def _finish_scalar(self) -> None:
+        text = "".join(self._parts)
+        self._parts = []
+        token, self._token = self._token, None
+        if token == "number":
+            try:
+                value = json.loads(text)
+            except ValueError as e:
+                raise PartialJSONError(f"Invalid number {text!r}") from e
+        elif text in _LITERALS:
+            value = _LITERALS[text]
+        else:
+            raise PartialJSONError(f"Invalid literal {text!r}")
+        self._attach(value)
+
+    def _consume_string(self, chunk: str, i: int) -> int:
+        n = len(chunk)
+        while i < n:
+            if self._escape is not None:
+                i = self._consume_escape(chunk, i)
+                continue
+            match = _STRING_STOP.search(chunk, i)
+            if match is None:
+                self._parts.append(chunk[i:])
+                return n
+            stop = match.start()
+            if stop > i:
+                self._parts.append(chunk[i:stop])
+            if chunk[stop] == '"':
+                self._finish_string()
+                return stop + 1
+            self._escape = ""
+            i = stop + 1
+        return i
+
+    def _consume_escape(self, chunk: str, i: int) -> int:
+        escape = self._escape or ""
+        if not escape:
+            c = chunk[i]
+            if c in _SIMPLE_ESCAPES:
+                self._parts.append(_SIMPLE_ESCAPES[c])
+                self._escape = None
+                return i + 1
+            if c != "u":
+                raise PartialJSONError(f"Invalid escape '\\{c}'")
+            self._escape = "u"
+            return i + 1
+
+        # Collect the 4 hex digits of a \uXXXX escape
+        needed = 5 - len(escape)
+        escape += chunk[i : i + needed]
+        i += min(needed, len(chunk) - i)
+        if len(escape) < 5:
+            self._escape = escape
+            return i
+        try:
+            code = int(escape[1:], 16)
+        except ValueError as e:
+            raise PartialJSONError(f"Invalid escape '\\{escape}'") from e
+        if 0xD800 <= code <= 0xDFFF:
+            self._has_surrogates = True
+        self._parts.append(chr(code))
+        self._escape = None
+        return i
+
+    def _finish_string(self) -> None:
+        text = "".join(self._parts)
+        self._parts = []
+        self._token = None
+        if self._has_surrogates:
+            # Recombine UTF-16 surrogate pairs from \\uXXXX escapes
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16")
+            self._has_surrogates = False
+        if self._is_key:
+            frame = self._stack[-1]
+            frame.key = text
+            frame.state = _COLON
+            self._is_key = False
+        else:
+            self._attach(text)
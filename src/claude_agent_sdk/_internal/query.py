@@ -3,33 +3,62 @@
 import json
 import logging
 import os
-from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+import time
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Mapping,
+)
 from contextlib import suppress
-from typing import TYPE_CHECKING, Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
 
 import anyio
-from mcp.types import (
-    CallToolRequest,
-    CallToolRequestParams,
-    ListToolsRequest,
-)
+from anyio.streams.memory import MemoryObjectSendStream
 
 from ..types import (
+    MessageBufferPolicy,
     PermissionResultAllow,
     PermissionResultDeny,
+    RawMessage,
+    ResourceLimits,
+    ResourceUsage,
     SDKControlPermissionRequest,
     SDKControlRequest,
     SDKControlResponse,
     SDKHookCallbackRequest,
     ToolPermissionContext,
+    ToolSession,
 )
+from .message_buffer import SpillBuffer
+from .raw_message import sniff_message
+from .stream_coalescer import StreamEventCoalescer
+from .tool_session import tool_session_scope
 from .transport import Transport
 
 if TYPE_CHECKING:
     from mcp.server import Server as McpServer
 
+    from ..metrics import SessionMetrics
+    from ..profiling import Profiler
+    from ..tracing import SessionTrace
+
 logger = logging.getLogger(__name__)
 
+_CONTROL_MESSAGE_TYPES = frozenset(
+    ("control_response", "control_request", "control_cancel_request")
+)
+# Messages a SessionTrace reads beyond their type and session_id
+_TRACED_BODY_TYPES = frozenset(("assistant", "user", "result", "stream_event"))
+
+
+class MessageSender(Protocol):
+    async def send(self, item: dict[str, Any] | RawMessage, /) -> None: ...
+
+    def close(self) -> None: ...
+
 
 def _convert_hook_output_for_cli(hook_output: dict[str, Any]) -> dict[str, Any]:
     """Convert Python-safe field names to CLI-expected field names.
@@ -73,6 +102,18 @@ class Query:
         hooks: dict[str, list[dict[str, Any]]] | None = None,
         sdk_mcp_servers: dict[str, "McpServer"] | None = None,
         initialize_timeout: float = 60.0,
+        coalesce_window: float | None = None,
+        coalesce_max_bytes: int | None = None,
+        raw: bool = False,
+        buffer_size: int = 100,
+        buffer_policy: MessageBufferPolicy = "block",
+        spill_dir: str | Path | None = None,
+        metrics: "SessionMetrics | None" = None,
+        trace: "SessionTrace | None" = None,
+        profiler: "Profiler | None" = None,
+        resource_sample_interval: float | None = None,
+        resource_limits: ResourceLimits | None = None,
+        track_session: bool = False,
     ):
         """Initialize Query with transport and callbacks.
 
@@ -83,6 +124,25 @@ class Query:
             hooks: Optional hook configurations
             sdk_mcp_servers: Optional SDK MCP server instances
             initialize_timeout: Timeout in seconds for the initialize request
+            coalesce_window: If set, merge consecutive same-block stream event
+                deltas for up to this many seconds before delivering them
+            coalesce_max_bytes: If set, merge consecutive same-block stream
+                event deltas until their text reaches this many bytes
+            raw: Read undecoded lines from the transport. Data messages are
+                queued as RawMessage and only control messages are decoded.
+            buffer_size: Messages buffered for the consumer
+            buffer_policy: "block" to stop reading when the buffer is full,
+                or "spill" to keep reading and move the overflow to a
+                temporary file in spill_dir
+            metrics: Optional recorder for message and control protocol metrics
+            trace: Optional recorder for per-turn latency traces
+            profiler: Optional hooks called around control protocol stages
+            resource_sample_interval: Sample the CLI process's resources this
+                often, if the transport supports it, and attach a sample to
+                result messages
+            resource_limits: Optional soft limits checked at each sample
+            track_session: Keep session_id up to date even without SDK MCP
+                servers or metrics, which need it anyway
         """
         self._initialize_timeout = initialize_timeout
         self.transport = transport
@@ -90,6 +150,13 @@ class Query:
         self.can_use_tool = can_use_tool
         self.hooks = hooks or {}
         self.sdk_mcp_servers = sdk_mcp_servers or {}
+        # Sessions opened on shared SDK MCP servers, keyed by server name
+        self._sdk_mcp_sessions: dict[str, ToolSession] = {}
+        self._session_id: str | None = None
+        self._track_sessions = (
+            bool(sdk_mcp_servers) or metrics is not None or track_session
+        )
+        self._raw = raw
 
         # Control protocol state
         self.pending_control_responses: dict[str, anyio.Event] = {}
@@ -98,13 +165,47 @@ class Query:
         self.next_callback_id = 0
         self._request_counter = 0
 
-        # Message stream
-        self._message_send, self._message_receive = anyio.create_memory_object_stream[
-            dict[str, Any]
-        ](max_buffer_size=100)
+        # Message stream; holds RawMessage items in raw mode
+        self._spill_buffer: SpillBuffer | None = None
+        if buffer_policy == "spill":
+            self._spill_buffer = SpillBuffer(buffer_size, spill_dir)
+            self._message_send: MessageSender = self._spill_buffer
+            self._message_receive: AsyncIterable[dict[str, Any] | RawMessage] = (
+                self._spill_buffer
+            )
+        elif buffer_policy == "block":
+            self._message_send, self._message_receive = (
+                anyio.create_memory_object_stream[dict[str, Any] | RawMessage](
+                    max_buffer_size=buffer_size
+                )
+            )
+        else:
+            raise ValueError(f"Unknown buffer_policy: {buffer_policy}")
         self._tg: anyio.abc.TaskGroup | None = None
+
+        self._metrics = metrics
+        if metrics is not None:
+            metrics.track_buffer(self._buffer_depth)
+        self._trace = trace
+        self._profiler = profiler
+        if resource_limits is not None and resource_sample_interval is None:
+            resource_sample_interval = 1.0
+        self._resource_sample_interval = resource_sample_interval
+        self._resource_limits = resource_limits
+
+        # Stream event coalescing
+        self._coalescer: StreamEventCoalescer | None = None
+        if not raw and (coalesce_window is not None or coalesce_max_bytes is not None):
+            self._coalescer = StreamEventCoalescer(coalesce_window, coalesce_max_bytes)
+        self._coalesce_lock: anyio.Lock | None = None
+        self._coalesce_wakeup: anyio.Event | None = None
+
         self._initialized = False
         self._closed = False
+        self._reader_finished = False
+        self._reader_done = anyio.Event()
+        self._reader_error: Exception | None = None
+        self._message_iterator: AsyncIterator[dict[str, Any]] | None = None
         self._initialization_result: dict[str, Any] | None = None
 
     async def initialize(self) -> dict[str, Any] | None:
@@ -156,7 +257,17 @@ class Query:
         if self._tg is None:
             self._tg = anyio.create_task_group()
             await self._tg.__aenter__()
-            self._tg.start_soon(self._read_messages)
+            self._tg.start_soon(
+                self._read_raw_messages if self._raw else self._read_messages
+            )
+            if self._coalescer is not None and self._coalescer.window is not None:
+                self._coalesce_lock = anyio.Lock()
+                self._coalesce_wakeup = anyio.Event()
+                self._tg.start_soon(self._flush_coalesced)
+            if self._resource_sample_interval is not None:
+                self._tg.start_soon(
+                    self._watch_resources, self._resource_sample_interval
+                )
 
     async def _read_messages(self) -> None:
         """Read messages from transport and route them."""
@@ -166,37 +277,30 @@ class Query:
                     break
 
                 msg_type = message.get("type")
-
-                # Route control messages
-                if msg_type == "control_response":
-                    response = message.get("response", {})
-                    request_id = response.get("request_id")
-                    if request_id in self.pending_control_responses:
-                        event = self.pending_control_responses[request_id]
-                        if response.get("subtype") == "error":
-                            self.pending_control_results[request_id] = Exception(
-                                response.get("error", "Unknown error")
-                            )
-                        else:
-                            self.pending_control_results[request_id] = response
-                        event.set()
+                if self._metrics is not None:
+                    self._metrics.message_read(str(msg_type))
+                if msg_type in _CONTROL_MESSAGE_TYPES:
+                    self._route_control_message(message)
                     continue
 
-                elif msg_type == "control_request":
-                    # Handle incoming control requests from CLI
-                    # Cast message to SDKControlRequest for type safety
-                    request: SDKControlRequest = message  # type: ignore[assignment]
-                    if self._tg:
-                        self._tg.start_soon(self._handle_control_request, request)
-                    continue
+                # Remember the CLI session for SDK MCP tools, metrics and
+                # restarts
+                if self._track_sessions and "session_id" in message:
+                    self._track_session(message["session_id"])
 
-                elif msg_type == "control_cancel_request":
-                    # Handle cancel requests
-                    # TODO: Implement cancellation support
-                    continue
+                if self._trace is not None:
+                    self._trace.message(message)
+
+                if msg_type == "result" and self._resource_sample_interval is not None:
+                    # The last periodic sample if the process already exited
+                    usage = self.sample_resources() or getattr(
+                        self.transport, "resource_usage", None
+                    )
+                    if usage is not None:
+                        message["sdk_resource_usage"] = usage.to_dict()
 
                 # Regular SDK messages go to the stream
-                await self._message_send.send(message)
+                await self._send_message(message)
 
         except anyio.get_cancelled_exc_class():
             # Task was cancelled - this is expected behavior
@@ -204,17 +308,232 @@ class Query:
             raise  # Re-raise to properly handle cancellation
         except Exception as e:
             logger.error(f"Fatal error in message reader: {e}")
+            self._reader_error = e
+            self._reader_done.set()
+            # Deltas read before the error are delivered ahead of it
+            await self._release_coalesced()
             # Put error in stream so iterators can handle it
             await self._message_send.send({"type": "error", "error": str(e)})
         finally:
-            # Always signal end of stream
+            self._reader_finished = True
+            self._reader_done.set()
+            # Release any held deltas, then signal end of stream
+            await self._release_coalesced()
+            await self._message_send.send({"type": "end"})
+
+    async def _read_raw_messages(self) -> None:
+        """Read undecoded lines from transport and route them.
+
+        Only control messages are decoded; data messages are queued as
+        RawMessage with the type and session_id sniffed from the line.
+        """
+        try:
+            async for line in self.transport.read_raw_messages():
+                if self._closed:
+                    break
+
+                raw = sniff_message(line)
+                if self._metrics is not None:
+                    self._metrics.message_read(str(raw.type))
+                if raw.type in _CONTROL_MESSAGE_TYPES:
+                    self._route_control_message(raw.json())
+                    continue
+
+                # Remember the CLI session for SDK MCP tools, metrics and
+                # restarts
+                if self._track_sessions and raw.session_id is not None:
+                    self._track_session(raw.session_id)
+
+                if self._trace is not None:
+                    # Other messages only need the sniffed fields
+                    self._trace.message(
+                        raw.json()
+                        if raw.type in _TRACED_BODY_TYPES
+                        else {"type": raw.type, "session_id": raw.session_id}
+                    )
+
+                await self._message_send.send(raw)
+
+        except anyio.get_cancelled_exc_class():
+            logger.debug("Read task cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Fatal error in message reader: {e}")
+            self._reader_error = e
+            self._reader_done.set()
+            await self._message_send.send({"type": "error", "error": str(e)})
+        finally:
+            self._reader_finished = True
+            self._reader_done.set()
             await self._message_send.send({"type": "end"})
 
+    def _route_control_message(self, message: dict[str, Any]) -> None:
+        """Route a control_response, control_request or cancel from the CLI."""
+        msg_type = message.get("type")
+        if msg_type == "control_response":
+            response = message.get("response", {})
+            request_id = response.get("request_id")
+            if request_id in self.pending_control_responses:
+                event = self.pending_control_responses[request_id]
+                if response.get("subtype") == "error":
+                    self.pending_control_results[request_id] = Exception(
+                        response.get("error", "Unknown error")
+                    )
+                else:
+                    self.pending_control_results[request_id] = response
+                event.set()
+
+        elif msg_type == "control_request":
+            # Handle incoming control requests from CLI
+            # Cast message to SDKControlRequest for type safety
+            request: SDKControlRequest = message  # type: ignore[assignment]
+            if self._tg:
+                self._tg.start_soon(self._handle_control_request, request)
+
+        # control_cancel_request
+        # TODO: Implement cancellation support
+
+    def _track_session(self, session_id: str) -> None:
+        if session_id == self._session_id:
+            return
+        self._session_id = session_id
+        if self._metrics is not None:
+            self._metrics.set_session(session_id)
+        for tool_session in self._sdk_mcp_sessions.values():
+            tool_session.session_id = session_id
+
+    async def _send_message(self, message: dict[str, Any]) -> None:
+        """Deliver a data message to the stream, coalescing deltas if enabled."""
+        coalescer = self._coalescer
+        if coalescer is None:
+            await self._message_send.send(message)
+            return
+
+        if self._coalesce_lock is None:
+            for ready in coalescer.add(message, anyio.current_time()):
+                await self._message_send.send(ready)
+            return
+
+        async with self._coalesce_lock:
+            for ready in coalescer.add(message, anyio.current_time()):
+                await self._message_send.send(ready)
+        if coalescer.deadline is not None and self._coalesce_wakeup is not None:
+            self._coalesce_wakeup.set()
+
+    async def _release_coalesced(self) -> None:
+        """Deliver every held delta now."""
+        if self._coalescer is not None:
+            for held in self._coalescer.flush():
+                await self._message_send.send(held)
+
+    async def _flush_coalesced(self) -> None:
+        """Release held deltas once their time window elapses."""
+        assert self._coalescer is not None and self._coalesce_lock is not None
+        while True:
+            deadline = self._coalescer.deadline
+            if deadline is None:
+                assert self._coalesce_wakeup is not None
+                await self._coalesce_wakeup.wait()
+                self._coalesce_wakeup = anyio.Event()
+                continue
+            await anyio.sleep(max(deadline - anyio.current_time(), 0))
+            async with self._coalesce_lock:
+                for ready in self._coalescer.flush_due(anyio.current_time()):
+                    await self._message_send.send(ready)
+
+    @property
+    def coalescing_stats(self) -> dict[str, int] | None:
+        """Messages received and delivered when coalescing, else None."""
+        return self._coalescer.stats() if self._coalescer is not None else None
+
+    @property
+    def buffer_stats(self) -> dict[str, int] | None:
+        """Spill buffer counts with the "spill" policy, else None."""
+        return self._spill_buffer.stats() if self._spill_buffer is not None else None
+
+    def _buffer_depth(self) -> int:
+        if self._spill_buffer is not None:
+            stats = self._spill_buffer.stats()
+            return stats["in_memory"] + stats["on_disk"]
+        stream = self._message_send
+        assert isinstance(stream, MemoryObjectSendStream)
+        return stream.statistics().current_buffer_used
+
+    def sample_resources(self) -> ResourceUsage | None:
+        """Sample the CLI process's resource usage, if the transport can."""
+        sample = getattr(self.transport, "sample_resources", None)
+        return sample() if sample is not None else None
+
+    async def _watch_resources(self, interval: float) -> None:
+        """Sample resources periodically and act on soft limits."""
+        limits = self._resource_limits
+        exceeded: set[str] = set()
+        while True:
+            usage = self.sample_resources()
+            if usage is None:
+                # The process has exited, or there is no /proc to read
+                return
+            # In streaming mode, limits apply once the session is initialized
+            # and can be interrupted
+            if limits is not None and (self._initialized or not self.is_streaming_mode):
+                names = limits.exceeded(usage)
+                newly_exceeded = [name for name in names if name not in exceeded]
+                exceeded = set(names)
+                if newly_exceeded:
+                    await self._on_resource_limit(limits, usage, newly_exceeded)
+            await anyio.sleep(interval)
+
+    async def _on_resource_limit(
+        self, limits: ResourceLimits, usage: ResourceUsage, names: list[str]
+    ) -> None:
+        logger.warning(
+            f"CLI process {usage.pid} exceeded resource limits: {', '.join(names)}"
+        )
+        if limits.on_exceeded is not None:
+            try:
+                await limits.on_exceeded(usage, names)
+            except Exception as e:
+                logger.error(f"Resource limit callback failed: {e}")
+        if limits.interrupt and self.is_streaming_mode:
+            try:
+                await self.interrupt()
+            except Exception as e:
+                logger.warning(f"Failed to interrupt after resource limit: {e}")
+
+    @property
+    def reader_finished(self) -> bool:
+        """True once the transport's output has ended or failed."""
+        return self._reader_finished
+
+    async def wait_reader_finished(self) -> None:
+        """Wait until the transport's output has ended or failed."""
+        await self._reader_done.wait()
+
+    @property
+    def reader_error(self) -> Exception | None:
+        """The exception that ended reading from the transport, if any."""
+        return self._reader_error
+
+    @property
+    def session_id(self) -> str | None:
+        """The last session id the CLI reported, if tracked."""
+        return self._session_id
+
     async def _handle_control_request(self, request: SDKControlRequest) -> None:
         """Handle incoming control request from CLI."""
+        if self._profiler is None:
+            await self._answer_control_request(request)
+            return
+        with self._profiler.stage(
+            "control.receive", subtype=request["request"]["subtype"]
+        ):
+            await self._answer_control_request(request)
+
+    async def _answer_control_request(self, request: SDKControlRequest) -> None:
         request_id = request["request_id"]
         request_data = request["request"]
         subtype = request_data["subtype"]
+        started = time.perf_counter()
 
         try:
             response_data: dict[str, Any] = {}
@@ -232,11 +551,20 @@ class Query:
                     or [],
                 )
 
-                response = await self.can_use_tool(
+                permission = self.can_use_tool(
                     permission_request["tool_name"],
                     permission_request["input"],
                     context,
                 )
+                if self._profiler is None:
+                    response = await permission
+                else:
+                    with self._profiler.stage(
+                        "callback",
+                        subtype=subtype,
+                        tool_name=permission_request["tool_name"],
+                    ):
+                        response = await permission
 
                 # Convert PermissionResult to expected dict format
                 if isinstance(response, PermissionResultAllow):
@@ -270,11 +598,18 @@ class Query:
                 if not callback:
                     raise Exception(f"No hook callback found for ID: {callback_id}")
 
-                hook_output = await callback(
+                hook_result = callback(
                     request_data.get("input"),
                     request_data.get("tool_use_id"),
                     {"signal": None},  # TODO: Add abort signal support
                 )
+                if self._profiler is None:
+                    hook_output = await hook_result
+                else:
+                    with self._profiler.stage(
+                        "callback", subtype=subtype, callback_id=callback_id
+                    ):
+                        hook_output = await hook_result
                 # Convert Python-safe field names (async_, continue_) to CLI-expected names (async, continue)
                 response_data = _convert_hook_output_for_cli(hook_output)
 
@@ -289,9 +624,16 @@ class Query:
                 # Type narrowing - we've verified these are not None above
                 assert isinstance(server_name, str)
                 assert isinstance(mcp_message, dict)
-                mcp_response = await self._handle_sdk_mcp_request(
-                    server_name, mcp_message
-                )
+                dispatch = self._handle_sdk_mcp_request(server_name, mcp_message)
+                if self._profiler is None:
+                    mcp_response = await dispatch
+                else:
+                    with self._profiler.stage(
+                        "mcp.dispatch",
+                        server=server_name,
+                        method=mcp_message.get("method"),
+                    ):
+                        mcp_response = await dispatch
                 # Wrap the MCP response as expected by the control protocol
                 response_data = {"mcp_response": mcp_response}
 
@@ -307,6 +649,7 @@ class Query:
                     "response": response_data,
                 },
             }
+            self._record_incoming(request_data, started, failed=False)
             await self.transport.write(json.dumps(success_response) + "\n")
 
         except Exception as e:
@@ -319,8 +662,43 @@ class Query:
                     "error": str(e),
                 },
             }
+            self._record_incoming(request_data, started, failed=True)
             await self.transport.write(json.dumps(error_response) + "\n")
 
+    def _record_incoming(
+        self, request: Mapping[str, Any], started: float, failed: bool
+    ) -> None:
+        """Record metrics and a trace span for an answered CLI request."""
+        if self._metrics is None and self._trace is None:
+            return
+        now = time.perf_counter()
+        subtype = request["subtype"]
+        if self._metrics is not None:
+            self._metrics.control_request(
+                subtype, "incoming", now - started, failed=failed
+            )
+        if self._trace is not None:
+            if subtype == "can_use_tool":
+                name = f"permission:{request.get('tool_name')}"
+            elif subtype == "hook_callback":
+                name = f"hook:{(request.get('input') or {}).get('hook_event_name')}"
+            elif subtype == "mcp_message":
+                name = f"mcp:{request.get('server_name')}"
+            else:
+                name = str(subtype)
+            args: dict[str, Any] = {"direction": "incoming"}
+            if subtype == "mcp_message":
+                mcp_message = request.get("message") or {}
+                args["method"] = mcp_message.get("method")
+                tool_name = (mcp_message.get("params") or {}).get("name")
+                if tool_name:
+                    args["tool"] = tool_name
+            if request.get("tool_use_id"):
+                args["tool_use_id"] = request["tool_use_id"]
+            if failed:
+                args["failed"] = True
+            self._trace.span(name, "control", started, now, **args)
+
     async def _send_control_request(
         self, request: dict[str, Any], timeout: float = 60.0
     ) -> dict[str, Any]:
@@ -330,6 +708,12 @@ class Query:
             request: The control request to send
             timeout: Timeout in seconds to wait for response (default 60s)
         """
+        if self._profiler is None:
+            return await self._request(request, timeout)
+        with self._profiler.stage("control.send", subtype=request["subtype"]):
+            return await self._request(request, timeout)
+
+    async def _request(self, request: dict[str, Any], timeout: float) -> dict[str, Any]:
         if not self.is_streaming_mode:
             raise Exception("Control requests require streaming mode")
 
@@ -348,6 +732,7 @@ class Query:
             "request": request,
         }
 
+        started = time.perf_counter()
         await self.transport.write(json.dumps(control_request) + "\n")
 
         # Wait for response
@@ -358,6 +743,9 @@ class Query:
             result = self.pending_control_results.pop(request_id)
             self.pending_control_responses.pop(request_id, None)
 
+            self._record_outgoing(
+                request["subtype"], started, failed=isinstance(result, Exception)
+            )
             if isinstance(result, Exception):
                 raise result
 
@@ -366,8 +754,24 @@ class Query:
         except TimeoutError as e:
             self.pending_control_responses.pop(request_id, None)
             self.pending_control_results.pop(request_id, None)
+            self._record_outgoing(request["subtype"], started, failed=True)
             raise Exception(f"Control request timeout: {request.get('subtype')}") from e
 
+    def _record_outgoing(self, subtype: str, started: float, failed: bool) -> None:
+        """Record metrics and a trace span for a request sent to the CLI."""
+        if self._metrics is None and self._trace is None:
+            return
+        now = time.perf_counter()
+        if self._metrics is not None:
+            self._metrics.control_request(
+                subtype, "outgoing", now - started, failed=failed
+            )
+        if self._trace is not None:
+            args: dict[str, Any] = {"direction": "outgoing"}
+            if failed:
+                args["failed"] = True
+            self._trace.span(subtype, "control", started, now, **args)
+
     async def _handle_sdk_mcp_request(
         self, server_name: str, message: dict[str, Any]
     ) -> dict[str, Any]:
@@ -394,6 +798,9 @@ class Query:
                 },
             }
 
+        # Deferred so that importing the SDK doesn't load mcp
+        from mcp.types import CallToolRequest, CallToolRequestParams, ListToolsRequest
+
         server = self.sdk_mcp_servers[server_name]
         method = message.get("method")
         params = message.get("params", {})
@@ -406,15 +813,18 @@ class Query:
             # This forces us to manually route methods. When Python MCP adds Transport
             # support, we can refactor to match the TypeScript approach.
             if method == "initialize":
-                # Handle MCP initialization - hardcoded for tools only, no listChanged
+                # Handle MCP initialization - tools only. Servers that can
+                # change their tools at runtime advertise listChanged.
+                self._get_tool_session(server_name)
+                tools_capability = (
+                    {"listChanged": True} if hasattr(server, "add_tool") else {}
+                )
                 return {
                     "jsonrpc": "2.0",
                     "id": message.get("id"),
                     "result": {
                         "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {}  # Tools capability without listChanged
-                        },
+                        "capabilities": {"tools": tools_capability},
                         "serverInfo": {
                             "name": server.name,
                             "version": server.version or "1.0.0",
@@ -457,7 +867,15 @@ class Query:
                 )
                 handler = server.request_handlers.get(CallToolRequest)
                 if handler:
-                    result = await handler(call_request)
+                    started = time.perf_counter()
+                    with tool_session_scope(self._get_tool_session(server_name)):
+                        result = await handler(call_request)
+                    if self._metrics is not None:
+                        self._metrics.mcp_tool_call(
+                            server_name,
+                            str(params.get("name")),
+                            time.perf_counter() - started,
+                        )
                     # Convert MCP result to JSONRPC response
                     content = []
                     for item in result.root.content:  # type: ignore[union-attr]
@@ -502,6 +920,56 @@ class Query:
                 "error": {"code": -32603, "message": str(e)},
             }
 
+    def _get_tool_session(self, server_name: str) -> ToolSession | None:
+        """Return this query's session on an SDK MCP server, opening it lazily."""
+        tool_session = self._sdk_mcp_sessions.get(server_name)
+        if tool_session is None:
+            open_session = getattr(
+                self.sdk_mcp_servers[server_name], "open_session", None
+            )
+            if open_session is None:
+                return None
+            tool_session = open_session(
+                on_tools_changed=lambda: self._on_tools_changed(server_name)
+            )
+            tool_session.session_id = self._session_id
+            self._sdk_mcp_sessions[server_name] = tool_session
+        return tool_session
+
+    def _on_tools_changed(self, server_name: str) -> None:
+        """Schedule a tools/list_changed notification for an SDK MCP server."""
+        if self._closed or not self.is_streaming_mode or not self._tg:
+            return
+        self._tg.start_soon(
+            self._send_mcp_notification,
+            server_name,
+            {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"},
+        )
+
+    async def _send_mcp_notification(
+        self, server_name: str, notification: dict[str, Any]
+    ) -> None:
+        """Forward a server-initiated MCP notification to the CLI.
+
+        Notifications expect no reply, so unlike _send_control_request this
+        does not wait for a control response.
+        """
+        self._request_counter += 1
+        request_id = f"req_{self._request_counter}_{os.urandom(4).hex()}"
+        control_request = {
+            "type": "control_request",
+            "request_id": request_id,
+            "request": {
+                "subtype": "mcp_message",
+                "server_name": server_name,
+                "message": notification,
+            },
+        }
+        try:
+            await self.transport.write(json.dumps(control_request) + "\n")
+        except Exception as e:
+            logger.debug(f"Failed to send MCP notification to CLI: {e}")
+
     async def interrupt(self) -> None:
         """Send interrupt control request."""
         await self._send_control_request({"subtype": "interrupt"})
@@ -530,6 +998,8 @@ class Query:
             async for message in stream:
                 if self._closed:
                     break
+                if self._trace is not None and message.get("type") == "user":
+                    self._trace.prompt_sent()
                 await self.transport.write(json.dumps(message) + "\n")
             # After all messages sent, end input
             await self.transport.end_input()
@@ -538,7 +1008,15 @@ class Query:
 
     async def receive_messages(self) -> AsyncIterator[dict[str, Any]]:
         """Receive SDK messages (not control messages)."""
+        async for message in self._receive_from_stream():
+            yield message
+
+    async def _receive_from_stream(self) -> AsyncIterator[dict[str, Any]]:
         async for message in self._message_receive:
+            if isinstance(message, RawMessage):
+                yield message.json()
+                continue
+
             # Check for special messages
             if message.get("type") == "end":
                 break
@@ -547,23 +1025,62 @@ class Query:
 
             yield message
 
+    async def receive_raw_messages(self) -> AsyncIterator[RawMessage]:
+        """Receive SDK messages undecoded.
+
+        Outside raw mode, messages are re-encoded, which costs more than
+        receive_messages(); construct the Query with `raw=True` to forward
+        the CLI's bytes unchanged.
+        """
+        async for message in self._message_receive:
+            if isinstance(message, RawMessage):
+                yield message
+                continue
+
+            if message.get("type") == "end":
+                break
+            elif message.get("type") == "error":
+                raise Exception(message.get("error", "Unknown error"))
+
+            yield RawMessage(
+                data=json.dumps(message).encode(),
+                type=message.get("type"),
+                session_id=message.get("session_id"),
+            )
+
     async def close(self) -> None:
-        """Close the query and transport."""
+        """Close the query and transport; closing it again does nothing."""
+        if self._closed:
+            return
         self._closed = True
+        if self._coalescer is not None:
+            stats = self._coalescer.stats()
+            logger.debug(
+                f"Coalesced {stats['events_in']} messages into {stats['events_out']}"
+            )
+        for server_name, tool_session in self._sdk_mcp_sessions.items():
+            self.sdk_mcp_servers[server_name].close_session(tool_session)  # type: ignore[attr-defined]
+        self._sdk_mcp_sessions.clear()
         if self._tg:
             self._tg.cancel_scope.cancel()
             # Wait for task group to complete cancellation
             with suppress(anyio.get_cancelled_exc_class()):
                 await self._tg.__aexit__(None, None, None)
         await self.transport.close()
+        # Ends receive_messages() once buffered messages are read, even if
+        # the reader was cancelled before it could send "end"
+        self._message_send.close()
+        if self._metrics is not None:
+            self._metrics.close()
 
     # Make Query an async iterator
     def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
         """Return async iterator for messages."""
-        return self.receive_messages()
+        return self
 
     async def __anext__(self) -> dict[str, Any]:
         """Get next message."""
-        async for message in self.receive_messages():
-            return message
-        raise StopAsyncIteration
+        # One generator for the whole iteration, not a new one per message
+        if self._message_iterator is None:
+            self._message_iterator = self.receive_messages()
+        return await self._message_iterator.__anext__()
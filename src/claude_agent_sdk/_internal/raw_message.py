@@ -0,0 +1,50 @@
+"""Cheap inspection of undecoded CLI message lines."""
+
+import json
+import re
+
+from ..types import RawMessage
+
+_TYPE_PATTERN = re.compile(rb'"type"\s*:\s*"([^"\\]*)"')
+
+
+def _decode(line: bytes) -> RawMessage:
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        return RawMessage(data=line)
+    session_id = data.get("session_id")
+    return RawMessage(
+        data=line,
+        type=data.get("type"),
+        session_id=session_id if isinstance(session_id, str) else None,
+    )
+
+
+def sniff_message(line: bytes) -> RawMessage:
+    """Build a RawMessage, reading type and session_id without a full decode.
+
+    The CLI writes `type` as the first key of every message, so it is taken
+    from the first `"type"` key when nothing but the opening brace precedes
+    it. `session_id` is a top-level field written after the message body,
+    so only the tail of the line from its last `"session_id"` key is
+    decoded; if that tail is not the rest of the top-level object (the key
+    was nested, say in a tool input), the whole line is decoded instead.
+    """
+    type_match = _TYPE_PATTERN.search(line)
+    if type_match is None or line.count(b"{", 0, type_match.start()) != 1:
+        return _decode(line)
+
+    session_id = None
+    start = line.rfind(b'"session_id"')
+    if start != -1:
+        try:
+            tail = json.loads(b"{" + line[start:])
+        except ValueError:
+            return _decode(line)
+        session_id = tail.get("session_id")
+        if not isinstance(session_id, str):
+            session_id = None
+
+    return RawMessage(
+        data=line, type=type_match.group(1).decode(), session_id=session_id
+    )
@@ -0,0 +1,274 @@
+"""In-process MCP server backing create_sdk_mcp_server()."""
+
+import itertools
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any
+
+import anyio
+from mcp.server import Server
+from mcp.types import ImageContent, TextContent, Tool
+
+from ..types import ToolSession
+from .tool_executor import ToolExecutor
+from .tool_session import current_tool_session
+
+if TYPE_CHECKING:
+    from .. import SdkMcpTool
+
+logger = logging.getLogger(__name__)
+
+
+def _input_schema_to_json_schema(input_schema: Any) -> dict[str, Any]:
+    """Convert an SdkMcpTool input_schema to JSON Schema format."""
+    if isinstance(input_schema, dict):
+        # Check if it's already a JSON schema
+        if "type" in input_schema and "properties" in input_schema:
+            return input_schema
+
+        # Simple dict mapping names to types - convert to JSON schema
+        properties = {}
+        for param_name, param_type in input_schema.items():
+            if param_type is str:
+                properties[param_name] = {"type": "string"}
+            elif param_type is int:
+                properties[param_name] = {"type": "integer"}
+            elif param_type is float:
+                properties[param_name] = {"type": "number"}
+            elif param_type is bool:
+                properties[param_name] = {"type": "boolean"}
+            else:
+                properties[param_name] = {"type": "string"}  # Default
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties.keys()),
+        }
+
+    # For TypedDict or other types, create basic schema
+    return {"type": "object", "properties": {}}
+
+
+class SdkMcpServer(Server[Any, Any]):
+    """MCP server whose tools run in-process, shareable across sessions.
+
+    One instance can be attached to any number of concurrent clients by
+    passing the same config to each ClaudeAgentOptions. Tool definitions,
+    handler registration and whatever the tool closures hold (caches,
+    connection pools) are then shared, while each client gets its own
+    ToolSession for per-session state.
+
+    Calls from all sessions are accounted together; `max_concurrency`
+    bounds how many tool calls run at once across every session.
+
+    Tools can be added and removed at runtime with add_tool()/remove_tool().
+    Every attached session is then sent `notifications/tools/list_changed`,
+    so the CLI refreshes its tool list without reconnecting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: str = "1.0.0",
+        tools: list["SdkMcpTool[Any]"] | None = None,
+        executor: Executor | Callable[[], Executor] | None = None,
+        memory_limit: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        super().__init__(name, version=version)
+
+        if executor is not None:
+            self._tool_executor: ToolExecutor | None = ToolExecutor(
+                executor, memory_limit=memory_limit
+            )
+        elif memory_limit is not None:
+            raise ValueError("memory_limit requires an executor")
+        else:
+            self._tool_executor = None
+
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._max_concurrency = max_concurrency
+        self._limiter: anyio.CapacityLimiter | None = None
+
+        self._tools: dict[str, SdkMcpTool[Any]] = {}
+        self._handlers_registered = False
+        self._sessions: dict[str, ToolSession] = {}
+        self._tools_changed_listeners: dict[str, Callable[[], None]] = {}
+        self._session_ids = itertools.count(1)
+
+        # Global call accounting across all attached sessions
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._waiting = 0
+        self._calls = 0
+        self._errors = 0
+
+        # Register tools if provided
+        if tools:
+            for tool_def in tools:
+                self._tools[tool_def.name] = tool_def
+            self._register_handlers()
+
+    def _register_handlers(self) -> None:
+        if self._handlers_registered:
+            return
+        self._handlers_registered = True
+
+        # Register list_tools handler to expose available tools
+        @self.list_tools()  # type: ignore[no-untyped-call,misc]
+        async def list_tools() -> list[Tool]:
+            """Return the list of available tools."""
+            return [
+                Tool(
+                    name=tool_def.name,
+                    description=tool_def.description,
+                    inputSchema=_input_schema_to_json_schema(tool_def.input_schema),
+                )
+                for tool_def in self._tools.values()
+            ]
+
+        # Register call_tool handler to execute tools
+        @self.call_tool()  # type: ignore[misc]
+        async def call_tool(name: str, arguments: dict[str, Any]) -> Any:
+            """Execute a tool by name with given arguments."""
+            return await self._call_tool(name, arguments)
+
+    async def _call_tool(self, name: str, arguments: dict[str, Any]) -> Any:
+        if name not in self._tools:
+            raise ValueError(f"Tool '{name}' not found")
+
+        tool_def = self._tools[name]
+        session = current_tool_session()
+
+        if self._max_concurrency is not None and self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self._max_concurrency)
+
+        # Borrow on behalf of a token rather than the current task, so the
+        # same task can issue several calls without tripping the limiter
+        borrower = object()
+        self._waiting += 1
+        try:
+            if self._limiter is not None:
+                await self._limiter.acquire_on_behalf_of(borrower)
+        finally:
+            self._waiting -= 1
+
+        self._calls += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        if session is not None:
+            session.calls += 1
+            session.in_flight += 1
+        try:
+            # Call the tool's handler with arguments
+            if self._tool_executor is not None:
+                result = await self._tool_executor.run(tool_def.handler, arguments)
+            else:
+                result = await tool_def.handler(arguments)
+        except BaseException:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            if session is not None:
+                session.in_flight -= 1
+            if self._limiter is not None:
+                self._limiter.release_on_behalf_of(borrower)
+
+        # Convert result to MCP format
+        # The decorator expects us to return the content, not a CallToolResult
+        # It will wrap our return value in CallToolResult
+        content: list[TextContent | ImageContent] = []
+        if "content" in result:
+            for item in result["content"]:
+                if item.get("type") == "text":
+                    content.append(TextContent(type="text", text=item["text"]))
+                if item.get("type") == "image":
+                    content.append(
+                        ImageContent(
+                            type="image",
+                            data=item["data"],
+                            mimeType=item["mimeType"],
+                        )
+                    )
+
+        # Return just the content list - the decorator wraps it
+        return content
+
+    @property
+    def tools(self) -> list["SdkMcpTool[Any]"]:
+        """Tools currently exposed by this server."""
+        return list(self._tools.values())
+
+    def add_tool(self, tool_def: "SdkMcpTool[Any]") -> None:
+        """Add a tool, or replace the tool with the same name.
+
+        Attached sessions are notified that the tool list changed. Must be
+        called from the event loop the sessions run on.
+        """
+        self._tools[tool_def.name] = tool_def
+        self._register_handlers()
+        self._tools_changed()
+
+    def remove_tool(self, name: str) -> None:
+        """Remove a tool by name and notify attached sessions.
+
+        Raises:
+            KeyError: If no tool with that name exists
+        """
+        del self._tools[name]
+        self._tools_changed()
+
+    def _tools_changed(self) -> None:
+        # The MCP server caches tool definitions for input validation
+        tool_cache = getattr(self, "_tool_cache", None)
+        if isinstance(tool_cache, dict):
+            tool_cache.clear()
+
+        for listener in list(self._tools_changed_listeners.values()):
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Tool list change listener failed: {e}")
+
+    def open_session(
+        self, on_tools_changed: Callable[[], None] | None = None
+    ) -> ToolSession:
+        """Attach a new session to this server.
+
+        Called by Query the first time it routes a request to this server.
+
+        Args:
+            on_tools_changed: Optional callback invoked whenever tools are
+                added or removed, used to notify the session's CLI.
+        """
+        session = ToolSession(key=f"{self.name}:{next(self._session_ids)}")
+        self._sessions[session.key] = session
+        if on_tools_changed is not None:
+            self._tools_changed_listeners[session.key] = on_tools_changed
+        return session
+
+    def close_session(self, session: ToolSession) -> None:
+        """Detach a session and drop its per-session state."""
+        self._sessions.pop(session.key, None)
+        self._tools_changed_listeners.pop(session.key, None)
+        session.state.clear()
+
+    @property
+    def sessions(self) -> list[ToolSession]:
+        """Sessions currently attached to this server."""
+        return list(self._sessions.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Return global tool call accounting across all sessions."""
+        return {
+            "sessions": len(self._sessions),
+            "calls": self._calls,
+            "errors": self._errors,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self._max_concurrency,
+        }
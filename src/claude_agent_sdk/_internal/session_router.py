@@ -0,0 +1,120 @@
+"""Demultiplexing of one message stream into per-session streams."""
+
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRouter:
+    """Route messages from a Query to bounded per-session buffers.
+
+    A message goes to the session named by its `session_id`. Messages whose
+    session_id names no open session (the CLI may report its own session
+    id) go to the session with the oldest turn still awaiting its result,
+    since the CLI answers turns in the order they were sent. Anything else,
+    such as the init system message, goes to the unrouted stream.
+
+    Sessions share one message stream, which is read in order: a full
+    session buffer stalls routing for every session until it is drained
+    (head-of-line blocking), so each open session needs a consumer. A
+    session that is closed is dropped and its messages discarded, without
+    affecting the others.
+    """
+
+    def __init__(self, messages: AsyncIterator[dict[str, Any]]):
+        self._messages = messages
+        self._sessions: dict[
+            str,
+            tuple[
+                MemoryObjectSendStream[dict[str, Any]],
+                MemoryObjectReceiveStream[dict[str, Any]],
+            ],
+        ] = {}
+        self._pending: deque[str] = deque()
+        # Closed sessions keep their place in _pending until their turns end
+        self._closed: set[str] = set()
+        self._unrouted_send, self._unrouted_receive = anyio.create_memory_object_stream[
+            dict[str, Any]
+        ](max_buffer_size=100)
+        self._error: Exception | None = None
+        self._finished = False
+
+    def open(self, session_id: str, buffer_size: int) -> None:
+        self._closed.discard(session_id)
+        if session_id not in self._sessions:
+            send, receive = anyio.create_memory_object_stream[dict[str, Any]](
+                max_buffer_size=buffer_size
+            )
+            if self._finished:
+                send.close()
+            self._sessions[session_id] = (send, receive)
+
+    def close(self, session_id: str) -> None:
+        """Stop routing to a session, discarding its buffered messages."""
+        streams = self._sessions.pop(session_id, None)
+        if streams is not None:
+            streams[0].close()
+            streams[1].close()
+            self._closed.add(session_id)
+
+    def expect_turn(self, session_id: str) -> None:
+        """Record that a prompt was sent for a session and awaits its result."""
+        self._pending.append(session_id)
+
+    def _target(self, message: dict[str, Any]) -> str | None:
+        session_id = message.get("session_id")
+        if session_id not in self._sessions and session_id not in self._closed:
+            session_id = self._pending[0] if self._pending else None
+        if (
+            session_id is not None
+            and message.get("type") == "result"
+            and session_id in self._pending
+        ):
+            self._pending.remove(session_id)
+        return session_id
+
+    async def run(self) -> None:
+        try:
+            async for message in self._messages:
+                target = self._target(message)
+                if target is None:
+                    await self._unrouted_send.send(message)
+                    continue
+                if target in self._closed:
+                    continue
+                try:
+                    await self._sessions[target][0].send(message)
+                except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                    # Its consumer closed it; the other sessions keep going
+                    logger.debug(f"Dropping closed session {target!r}")
+                    self.close(target)
+        except Exception as e:
+            logger.debug(f"Session routing stopped: {e}")
+            self._error = e
+        finally:
+            self._finished = True
+            self._unrouted_send.close()
+            for send, _ in self._sessions.values():
+                send.close()
+
+    async def receive(self, session_id: str | None) -> AsyncIterator[dict[str, Any]]:
+        """Yield messages for a session, or the unrouted ones for None."""
+        if session_id is None:
+            receive = self._unrouted_receive
+        elif session_id in self._sessions:
+            receive = self._sessions[session_id][1]
+        else:
+            return  # Closed
+        try:
+            async for message in receive:
+                yield message
+        except anyio.ClosedResourceError:
+            return  # Closed while receiving
+        if self._error is not None:
+            raise self._error
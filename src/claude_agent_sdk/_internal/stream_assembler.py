@@ -0,0 +1,188 @@
+"""Assembly of partial-message StreamEvents into AssistantMessages."""
+
+import logging
+from typing import Any
+
+from ..types import (
+    AssistantMessage,
+    ContentBlock,
+    StreamEvent,
+    TextBlock,
+    ThinkingBlock,
+    ToolUseBlock,
+)
+from .partial_json import IncrementalJSONParser, PartialJSONError
+
+logger = logging.getLogger(__name__)
+
+
+class _BlockBuffer:
+    """Accumulates the deltas of one content block."""
+
+    __slots__ = ("type", "id", "name", "parts", "signature", "parser", "_joined")
+
+    def __init__(self, content_block: dict[str, Any]):
+        self.type: str = content_block.get("type", "text")
+        self.id: str = content_block.get("id", "")
+        self.name: str = content_block.get("name", "")
+        self.signature: str = content_block.get("signature", "")
+        # Text is kept as a list of fragments and joined on demand, so
+        # appending a delta is O(1) instead of copying the whole string
+        initial = content_block.get(self.type)
+        self.parts: list[str] = (
+            [initial] if isinstance(initial, str) and initial else []
+        )
+        self.parser = IncrementalJSONParser() if self.type == "tool_use" else None
+        self._joined: str | None = None
+
+    def append(self, text: str) -> None:
+        self.parts.append(text)
+        self._joined = None
+
+    @property
+    def text(self) -> str:
+        if self._joined is None:
+            joined = "".join(self.parts)
+            # Keep a single fragment so later joins don't redo this work
+            self.parts = [joined] if joined else []
+            self._joined = joined
+        return self._joined
+
+    def to_block(self, final: bool) -> ContentBlock | None:
+        if self.type == "text":
+            return TextBlock(text=self.text)
+        if self.type == "thinking":
+            return ThinkingBlock(thinking=self.text, signature=self.signature)
+        if self.type == "tool_use":
+            assert self.parser is not None
+            tool_input: Any = None
+            if final:
+                try:
+                    tool_input = self.parser.finish()
+                except PartialJSONError:
+                    tool_input = self.parser.snapshot()
+            else:
+                tool_input = self.parser.snapshot()
+            return ToolUseBlock(
+                id=self.id,
+                name=self.name,
+                input=tool_input if isinstance(tool_input, dict) else {},
+            )
+        return None
+
+
+class _MessageBuffer:
+    """In-progress assistant message for one parent_tool_use_id."""
+
+    __slots__ = ("model", "blocks", "parent_tool_use_id")
+
+    def __init__(self, model: str, parent_tool_use_id: str | None):
+        self.model = model
+        self.blocks: dict[int, _BlockBuffer] = {}
+        self.parent_tool_use_id = parent_tool_use_id
+
+    def to_message(self, final: bool) -> AssistantMessage:
+        content = []
+        for index in sorted(self.blocks):
+            block = self.blocks[index].to_block(final)
+            if block is not None:
+                content.append(block)
+        return AssistantMessage(
+            content=content,
+            model=self.model,
+            parent_tool_use_id=self.parent_tool_use_id,
+        )
+
+
+class StreamAssembler:
+    """Builds AssistantMessages from partial-message StreamEvents.
+
+    Use with `include_partial_messages=True`. Feed every StreamEvent in
+    order; snapshot() returns the message as streamed so far and feed()
+    returns the finished AssistantMessage on `message_stop`. Deltas are
+    buffered per content block and appended in amortized O(1), and
+    tool_use input JSON is parsed incrementally as it streams, so
+    snapshots of a partially streamed tool input are cheap.
+
+    Subagent messages are tracked separately by parent_tool_use_id.
+
+    Example:
+        ```python
+        assembler = StreamAssembler()
+        async for msg in client.receive_response():
+            if isinstance(msg, StreamEvent):
+                if done := assembler.feed(msg):
+                    print("final:", done.content)
+                else:
+                    render(assembler.snapshot())
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._messages: dict[str | None, _MessageBuffer] = {}
+        self.events_seen = 0
+
+    def feed(self, event: StreamEvent) -> AssistantMessage | None:
+        """Consume one StreamEvent.
+
+        Returns:
+            The completed AssistantMessage when the event ends a message,
+            otherwise None.
+        """
+        self.events_seen += 1
+        data = event.event
+        event_type = data.get("type")
+        key = event.parent_tool_use_id
+
+        if event_type == "message_start":
+            message = data.get("message", {})
+            self._messages[key] = _MessageBuffer(message.get("model", ""), key)
+            return None
+
+        buffer = self._messages.get(key)
+        if buffer is None:
+            # Joined mid-stream; start tracking from here
+            buffer = self._messages[key] = _MessageBuffer("", key)
+
+        if event_type == "content_block_delta":
+            block = buffer.blocks.get(data.get("index", 0))
+            if block is None:
+                block = buffer.blocks[data.get("index", 0)] = _BlockBuffer({})
+            delta = data.get("delta", {})
+            delta_type = delta.get("type")
+            if delta_type == "text_delta":
+                block.append(delta.get("text", ""))
+            elif delta_type == "thinking_delta":
+                block.append(delta.get("thinking", ""))
+            elif delta_type == "signature_delta":
+                block.signature += delta.get("signature", "")
+            elif delta_type == "input_json_delta" and block.parser is not None:
+                try:
+                    block.parser.feed(delta.get("partial_json", ""))
+                except PartialJSONError as e:
+                    logger.debug(f"Unparseable tool input delta: {e}")
+        elif event_type == "content_block_start":
+            buffer.blocks[data.get("index", 0)] = _BlockBuffer(
+                data.get("content_block", {})
+            )
+        elif event_type == "message_stop":
+            del self._messages[key]
+            return buffer.to_message(final=True)
+
+        return None
+
+    def snapshot(
+        self, parent_tool_use_id: str | None = None
+    ) -> AssistantMessage | None:
+        """Return the in-progress message, or None if none is streaming."""
+        buffer = self._messages.get(parent_tool_use_id)
+        if buffer is None:
+            return None
+        return buffer.to_message(final=False)
+
+    def text(self, index: int, parent_tool_use_id: str | None = None) -> str:
+        """Return the text streamed so far for one text or thinking block."""
+        buffer = self._messages.get(parent_tool_use_id)
+        if buffer is None or index not in buffer.blocks:
+            return ""
+        return buffer.blocks[index].text
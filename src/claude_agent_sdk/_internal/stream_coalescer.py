@@ -0,0 +1,145 @@
+"""Merging of consecutive partial-message deltas before they are delivered."""
+
+from typing import Any
+
+# Delta types that can be merged, and the field holding their text
+_MERGEABLE_DELTAS = {
+    "text_delta": "text",
+    "thinking_delta": "thinking",
+    "input_json_delta": "partial_json",
+    "signature_delta": "signature",
+}
+
+
+def _delta_key(message: dict[str, Any]) -> tuple[Any, ...] | None:
+    """Return what a delta must share with its neighbours to be merged."""
+    if message.get("type") != "stream_event":
+        return None
+    event = message.get("event")
+    if not isinstance(event, dict) or event.get("type") != "content_block_delta":
+        return None
+    delta = event.get("delta")
+    if not isinstance(delta, dict):
+        return None
+    delta_type = delta.get("type")
+    if delta_type not in _MERGEABLE_DELTAS:
+        return None
+    return (
+        message.get("session_id"),
+        message.get("parent_tool_use_id"),
+        event.get("index"),
+        delta_type,
+    )
+
+
+def merge_deltas(
+    first: dict[str, Any], second: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Merge two same-block delta stream events into a new message.
+
+    Returns None if they can't be merged. Neither input is modified, so
+    messages shared with other consumers stay intact.
+    """
+    key = _delta_key(first)
+    if key is None or key != _delta_key(second):
+        return None
+    field = _MERGEABLE_DELTAS[key[3]]
+    event = first["event"]
+    delta = event["delta"]
+    text = delta.get(field, "") + second["event"]["delta"].get(field, "")
+    return {**first, "event": {**event, "delta": {**delta, field: text}}}
+
+
+class StreamEventCoalescer:
+    """Merges runs of same-block content_block_delta stream events.
+
+    Deltas for the same content block and delta type are held and merged
+    into the first event of the run, whose delta text becomes the
+    concatenation of the run. A run is released when a different message
+    arrives, when its text reaches `max_bytes`, or once it is older than
+    `window` seconds (see flush_due()).
+
+    Raw message dicts go in and come out, so this runs before
+    parse_message and cuts the per-event work downstream as well.
+    """
+
+    def __init__(self, window: float | None = None, max_bytes: int | None = None):
+        if window is not None and window < 0:
+            raise ValueError("window must not be negative")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.window = window
+        self.max_bytes = max_bytes
+        self.events_in = 0
+        self.events_out = 0
+
+        self._pending: dict[str, Any] | None = None
+        self._pending_key: tuple[Any, ...] | None = None
+        self._pending_parts: list[str] = []
+        self._pending_bytes = 0
+        self._pending_count = 0
+        self._deadline: float | None = None
+
+    @property
+    def deadline(self) -> float | None:
+        """Time by which the held run must be released, if one is held."""
+        return self._deadline
+
+    def add(self, message: dict[str, Any], now: float) -> list[dict[str, Any]]:
+        """Add a message and return the messages ready for delivery, in order."""
+        self.events_in += 1
+        key = _delta_key(message)
+        ready: list[dict[str, Any]] = []
+
+        if key is not None and key == self._pending_key:
+            text = message["event"]["delta"].get(_MERGEABLE_DELTAS[key[3]], "")
+            self._pending_parts.append(text)
+            self._pending_bytes += len(text.encode())
+            self._pending_count += 1
+        else:
+            ready.extend(self.flush())
+            if key is None:
+                self.events_out += 1
+                ready.append(message)
+                return ready
+            text = message["event"]["delta"].get(_MERGEABLE_DELTAS[key[3]], "")
+            self._pending = message
+            self._pending_key = key
+            self._pending_parts = [text]
+            self._pending_bytes = len(text.encode())
+            self._pending_count = 1
+            if self.window is not None:
+                self._deadline = now + self.window
+
+        if self.max_bytes is not None and self._pending_bytes >= self.max_bytes:
+            ready.extend(self.flush())
+        elif self.window is not None and self._deadline is not None:
+            ready.extend(self.flush_due(now))
+        return ready
+
+    def flush_due(self, now: float) -> list[dict[str, Any]]:
+        """Release the held run if its time window has elapsed."""
+        if self._deadline is not None and now >= self._deadline:
+            return self.flush()
+        return []
+
+    def flush(self) -> list[dict[str, Any]]:
+        """Release the held run, if any."""
+        message = self._pending
+        if message is None:
+            return []
+        if self._pending_count > 1:
+            assert self._pending_key is not None
+            field = _MERGEABLE_DELTAS[self._pending_key[3]]
+            message["event"]["delta"][field] = "".join(self._pending_parts)
+        self._pending = None
+        self._pending_key = None
+        self._pending_parts = []
+        self._pending_count = 0
+        self._deadline = None
+        self.events_out += 1
+        return [message]
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of messages received and delivered."""
+        return {"events_in": self.events_in, "events_out": self.events_out}
@@ -0,0 +1,262 @@
+"""Streaming reader for structured output produced with `output_format`."""
+
+from typing import Any
+
+from .._errors import StructuredOutputError
+from ..types import Message, ResultMessage, StreamEvent
+from .partial_json import IncrementalJSONParser, PartialJSONError, Path
+
+_JSON_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def _check_type(value: Any, expected: str) -> bool:
+    types = _JSON_TYPES.get(expected)
+    if types is None:
+        return True
+    # bool is an int subclass but not a JSON number
+    if isinstance(value, bool) and expected not in ("boolean",):
+        return False
+    if expected == "integer" and isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, types)
+
+
+def validate_json_schema(value: Any, schema: dict[str, Any], path: Path = ()) -> None:
+    """Check a value against the commonly used subset of JSON Schema.
+
+    Supports type, enum, const, properties, required, additionalProperties
+    and items. Other keywords, including $ref, are not checked.
+
+    Raises:
+        StructuredOutputError: If the value does not match
+    """
+    expected = schema.get("type")
+    if expected is not None:
+        candidates = expected if isinstance(expected, list) else [expected]
+        if not any(_check_type(value, t) for t in candidates):
+            raise StructuredOutputError(
+                f"Expected {' or '.join(candidates)}, got {type(value).__name__}",
+                path,
+                value,
+            )
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise StructuredOutputError(f"Value {value!r} not in enum", path, value)
+    if "const" in schema and value != schema["const"]:
+        raise StructuredOutputError(f"Value {value!r} is not const", path, value)
+
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                raise StructuredOutputError(
+                    f"Missing required property {key!r}", path, value
+                )
+        additional = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                validate_json_schema(item, properties[key], (*path, key))
+            elif additional is False:
+                raise StructuredOutputError(f"Unexpected property {key!r}", path, value)
+            elif isinstance(additional, dict):
+                validate_json_schema(item, additional, (*path, key))
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for i, item in enumerate(value):
+            validate_json_schema(item, schema["items"], (*path, i))
+
+
+def _subschema(schema: dict[str, Any], path: Path) -> dict[str, Any] | None:
+    """Return the schema for the value at path, or None if unconstrained."""
+    for depth, step in enumerate(path):
+        if isinstance(step, int):
+            items = schema.get("items")
+            if not isinstance(items, dict):
+                return None
+            schema = items
+        else:
+            sub = schema.get("properties", {}).get(step)
+            if sub is None:
+                additional = schema.get("additionalProperties")
+                if additional is False:
+                    raise StructuredOutputError(
+                        f"Unexpected property {step!r}", path[:depth]
+                    )
+                sub = additional if isinstance(additional, dict) else None
+            if sub is None:
+                return None
+            schema = sub
+    return schema
+
+
+class StructuredOutputStream:
+    """Yields structured output fields as soon as each one is complete.
+
+    With `output_format` set, the model produces its answer by calling the
+    `StructuredOutput` tool, and with `include_partial_messages=True` that
+    call's input streams as `input_json_delta` events. Feed every message
+    to this reader; feed() returns each top-level field of the output, and
+    each item of a top-level array, once it has closed, so downstream work
+    can start on the first records while later ones are still generated.
+
+    Items are reported as `(path, value)`. A top-level field has the path
+    `(name,)`; an item of a top-level array field has `(name, index)`; an
+    item of a root array has `(index,)`. Array fields are reported after
+    their items. Each reported value is validated against the matching part
+    of the schema, and required properties are checked when the output
+    completes.
+
+    If partial messages are off, the fields are reported together when the
+    ResultMessage carrying `structured_output` arrives.
+
+    Example:
+        ```python
+        options = ClaudeAgentOptions(
+            output_format={"type": "json_schema", "schema": schema},
+            include_partial_messages=True,
+        )
+        reader = StructuredOutputStream.from_options(options)
+        async for message in query(prompt="...", options=options):
+            for path, value in reader.feed(message):
+                if len(path) == 2:
+                    start_processing(value)
+        ```
+    """
+
+    def __init__(
+        self,
+        output_format: dict[str, Any] | None = None,
+        tool_name: str = "StructuredOutput",
+    ):
+        """Create a reader.
+
+        Args:
+            output_format: The `output_format` from ClaudeAgentOptions, or a
+                bare JSON schema. Without one, nothing is validated.
+            tool_name: Name of the tool the CLI uses for structured output.
+        """
+        schema: dict[str, Any] | None = output_format
+        if output_format is not None and output_format.get("type") == "json_schema":
+            schema = output_format.get("schema")
+        self._schema = schema or {}
+        self._tool_name = tool_name
+        self._parser: IncrementalJSONParser | None = None
+        self._block_index: int | None = None
+        self._result: Any = None
+        self._complete = False
+
+    @classmethod
+    def from_options(cls, options: Any) -> "StructuredOutputStream":
+        """Create a reader for the output_format of ClaudeAgentOptions."""
+        return cls(options.output_format)
+
+    @property
+    def complete(self) -> bool:
+        """Whether the full structured output has been received."""
+        return self._complete
+
+    @property
+    def result(self) -> Any:
+        """The complete structured output, or None until it is complete."""
+        return self._result if self._complete else None
+
+    def snapshot(self) -> Any:
+        """Return the structured output parsed so far."""
+        if self._complete:
+            return self._result
+        return self._parser.snapshot() if self._parser is not None else None
+
+    def feed(self, message: Message) -> list[tuple[Path, Any]]:
+        """Consume one message and return the items it completed.
+
+        Raises:
+            StructuredOutputError: If a completed item does not match the
+                schema, or the streamed JSON is malformed
+        """
+        if isinstance(message, StreamEvent):
+            # Only the top-level agent produces the structured output
+            if message.parent_tool_use_id is None:
+                return self._feed_event(message.event)
+        elif (
+            isinstance(message, ResultMessage)
+            and not self._complete
+            and message.structured_output is not None
+        ):
+            return self._feed_result(message.structured_output)
+        return []
+
+    def _feed_event(self, event: dict[str, Any]) -> list[tuple[Path, Any]]:
+        event_type = event.get("type")
+        if event_type == "content_block_start":
+            block = event.get("content_block", {})
+            if block.get("type") == "tool_use" and block.get("name") == self._tool_name:
+                # A retried call replaces any earlier attempt
+                self._parser = IncrementalJSONParser(event_depth=2)
+                self._block_index = event.get("index")
+                self._complete = False
+                self._result = None
+            return []
+
+        if self._parser is None or event.get("index") != self._block_index:
+            return []
+
+        if event_type == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") != "input_json_delta":
+                return []
+            try:
+                events = self._parser.feed(delta.get("partial_json", ""))
+            except PartialJSONError as e:
+                raise StructuredOutputError(f"Malformed structured output: {e}") from e
+            return self._report(events)
+
+        if event_type == "content_block_stop":
+            try:
+                value = self._parser.finish()
+            except PartialJSONError as e:
+                raise StructuredOutputError(f"Malformed structured output: {e}") from e
+            self._parser = None
+            self._block_index = None
+            return self._finish(value, [])
+        return []
+
+    def _feed_result(self, value: Any) -> list[tuple[Path, Any]]:
+        reported: list[tuple[Path, Any]] = []
+        if isinstance(value, dict):
+            for key, field in value.items():
+                if isinstance(field, list):
+                    reported.extend(((key, i), item) for i, item in enumerate(field))
+                reported.append(((key,), field))
+        elif isinstance(value, list):
+            reported.extend(((i,), item) for i, item in enumerate(value))
+        return self._finish(value, self._report(reported))
+
+    def _report(self, events: list[tuple[Path, Any]]) -> list[tuple[Path, Any]]:
+        reported = []
+        for path, value in events:
+            # Keep top-level fields, and items of top-level arrays
+            if len(path) == 2 and not (
+                isinstance(path[0], str) and isinstance(path[1], int)
+            ):
+                continue
+            subschema = _subschema(self._schema, path)
+            if subschema is not None:
+                validate_json_schema(value, subschema, path)
+            reported.append((path, value))
+        return reported
+
+    def _finish(
+        self, value: Any, reported: list[tuple[Path, Any]]
+    ) -> list[tuple[Path, Any]]:
+        if self._schema:
+            validate_json_schema(value, self._schema)
+        self._result = value
+        self._complete = True
+        return reported
@@ -0,0 +1,283 @@
+"""Executor-backed execution of SDK MCP tool handlers."""
+
+import asyncio
+import contextvars
+import importlib
+import inspect
+import logging
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import anyio
+
+from ..types import ToolSession
+from .tool_session import current_tool_session, tool_session_scope
+
+logger = logging.getLogger(__name__)
+
+ExecutorFactory = Callable[[], Executor]
+
+# A handler reference that can cross a process boundary: (module, qualname)
+_HandlerRef = tuple[str, str]
+
+
+def _handler_reference(handler: Callable[..., Any]) -> Callable[..., Any] | _HandlerRef:
+    """Return a picklable reference to a module-level handler.
+
+    Handlers decorated with @tool are shadowed at module level by the
+    SdkMcpTool they are wrapped in, so pickling the function by reference
+    fails. Sending (module, qualname) instead lets the worker resolve the
+    name itself and unwrap the SdkMcpTool.
+    """
+    module = getattr(handler, "__module__", None)
+    qualname = getattr(handler, "__qualname__", None)
+    if not module or not qualname or "<locals>" in qualname:
+        return handler
+    return (module, qualname)
+
+
+def _resolve_handler(handler: Callable[..., Any] | _HandlerRef) -> Callable[..., Any]:
+    """Resolve a handler reference inside the worker."""
+    if not isinstance(handler, tuple):
+        return handler
+
+    module_name, qualname = handler
+    obj: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    # Unwrap SdkMcpTool instances produced by the @tool decorator
+    inner = getattr(obj, "handler", None)
+    if inner is not None and callable(inner):
+        return inner  # type: ignore[no-any-return]
+    return obj  # type: ignore[no-any-return]
+
+
+def _apply_memory_limit(limit: int) -> Any:
+    """Cap this worker's address space for one call.
+
+    Returns the previous limits so they can be restored, or None when the
+    platform does not support RLIMIT_AS.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    # Budget is on top of what the worker already has mapped
+    baseline = 0
+    try:
+        statm = Path("/proc/self/statm").read_text()
+        baseline = int(statm.split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        pass
+
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    hard = previous[1]
+    soft = baseline + limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    return previous
+
+
+def _restore_memory_limit(previous: Any) -> None:
+    if previous is None:
+        return
+    import resource
+
+    resource.setrlimit(resource.RLIMIT_AS, previous)
+
+
+def _run_handler(
+    handler: Callable[..., Any] | _HandlerRef,
+    arguments: dict[str, Any],
+    memory_limit: int | None,
+    session: ToolSession | None,
+) -> Any:
+    """Entry point executed in the worker thread or process."""
+    fn = _resolve_handler(handler)
+    previous = _apply_memory_limit(memory_limit) if memory_limit else None
+    try:
+        # Set even when None: a forked worker inherits whatever session was
+        # current when it was started
+        with tool_session_scope(session):
+            if inspect.iscoroutinefunction(fn):
+                return anyio.run(fn, arguments)
+            return fn(arguments)
+    finally:
+        _restore_memory_limit(previous)
+
+
+def _call_soon_threadsafe() -> Callable[[Callable[[], Any]], Any]:
+    """Return a function scheduling a callback on the running event loop."""
+    try:
+        return asyncio.get_running_loop().call_soon_threadsafe
+    except RuntimeError:
+        import trio  # type: ignore[import-untyped]
+
+        return trio.lowlevel.current_trio_token().run_sync_soon  # type: ignore[no-any-return]
+
+
+async def _wait(future: Future[Any]) -> Any:
+    """Wait for a future without holding a worker thread.
+
+    The future is cancelled if the wait is, so a call still queued on the
+    executor never starts.
+    """
+    done = anyio.Event()
+    call_soon = _call_soon_threadsafe()
+
+    def wake(_: Future[Any]) -> None:
+        # The event loop may be gone by the time a late call finishes
+        with suppress(RuntimeError):
+            call_soon(done.set)
+
+    future.add_done_callback(wake)
+    try:
+        await done.wait()
+    except anyio.get_cancelled_exc_class():
+        future.cancel()
+        raise
+    return future.result()
+
+
+class ToolExecutor:
+    """Runs SDK MCP tool handlers on a concurrent.futures executor.
+
+    By default SDK MCP tools run on the same event loop that reads CLI output,
+    so a CPU-heavy handler stalls every session sharing that loop. A
+    ToolExecutor moves the handler into a thread or process pool instead.
+
+    Handlers may be sync or async; async handlers are driven with their own
+    event loop inside the worker. With a ProcessPoolExecutor the handler and
+    its arguments/result must be picklable, which in practice means the
+    handler is defined at module level. Workers are reused between calls,
+    so module imports stay warm.
+
+    When built from a factory (e.g. the ``ProcessPoolExecutor`` class itself),
+    a pool broken by a crashed worker is replaced before the next call.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | ExecutorFactory,
+        memory_limit: int | None = None,
+    ):
+        """Initialize the tool executor.
+
+        Args:
+            executor: An executor instance, or a zero-argument factory that
+                creates one. Only factory-built executors can be restarted
+                after a worker crash.
+            memory_limit: Optional per-call address space budget in bytes.
+                Only supported with process pools on POSIX platforms.
+        """
+        if isinstance(executor, Executor):
+            self._executor: Executor | None = executor
+            self._factory: ExecutorFactory | None = None
+        else:
+            self._executor = None
+            self._factory = executor
+        self._memory_limit = memory_limit
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+        if self._executor is not None:
+            self._check_memory_limit(self._executor)
+
+    def _check_memory_limit(self, executor: Executor) -> None:
+        if self._memory_limit is None:
+            return
+        if not isinstance(executor, ProcessPoolExecutor):
+            # RLIMIT_AS applies to the whole process, so limiting a thread
+            # pool would cap the host application instead of the call
+            raise ValueError("memory_limit requires a ProcessPoolExecutor")
+        if sys.platform == "win32":
+            raise ValueError("memory_limit is not supported on Windows")
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                assert self._factory is not None
+                executor = self._factory()
+                self._check_memory_limit(executor)
+                self._executor = executor
+            return self._executor
+
+    def _restart(self, broken: Executor) -> bool:
+        """Replace a broken executor. Returns False if it cannot be replaced."""
+        if self._factory is None:
+            return False
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.restarts += 1
+                logger.warning("SDK MCP tool executor crashed, restarting worker pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        return True
+
+    def _submit(
+        self, handler: Callable[..., Any], arguments: dict[str, Any]
+    ) -> Future[Any]:
+        executor = self._get_executor()
+        call: Callable[[], Any]
+        session = current_tool_session()
+        if isinstance(executor, ProcessPoolExecutor):
+            if session is not None:
+                # State stays in this process; the worker gets who is calling
+                session = ToolSession(key=session.key, session_id=session.session_id)
+            call = partial(
+                _run_handler,
+                _handler_reference(handler),
+                arguments,
+                self._memory_limit,
+                session,
+            )
+        else:
+            # Threads also see the caller's other context variables
+            call = partial(
+                contextvars.copy_context().run,
+                _run_handler,
+                handler,
+                arguments,
+                self._memory_limit,
+                session,
+            )
+        try:
+            return executor.submit(call)
+        except BrokenExecutor:
+            # The pool died between calls - restart it and retry once
+            if not self._restart(executor):
+                raise
+            return self._get_executor().submit(call)
+
+    async def run(
+        self, handler: Callable[..., Any], arguments: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Run a tool handler on the executor and return its result."""
+        future = self._submit(handler, arguments)
+        executor = self._executor
+        try:
+            result = await _wait(future)
+        except BrokenExecutor as e:
+            # The worker died during this call. Don't retry it (the call
+            # itself is the likely culprit), but make sure the next one runs.
+            if executor is not None:
+                self._restart(executor)
+            raise RuntimeError(
+                f"Tool worker crashed while running {getattr(handler, '__name__', handler)!r}"
+            ) from e
+        return result  # type: ignore[no-any-return]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying executor."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,30 @@
+"""Session context for SDK MCP tool calls."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from ..types import ToolSession
+
+_current_tool_session: ContextVar[ToolSession | None] = ContextVar(
+    "claude_agent_sdk_tool_session", default=None
+)
+
+
+def current_tool_session() -> ToolSession | None:
+    """Return the session on whose behalf the current tool call runs.
+
+    Returns None outside of a tool call, or when the handler is invoked
+    directly rather than through a connected client.
+    """
+    return _current_tool_session.get()
+
+
+@contextmanager
+def tool_session_scope(session: ToolSession | None) -> Iterator[None]:
+    """Make `session` the current tool session for the enclosed block."""
+    token = _current_tool_session.set(session)
+    try:
+        yield
+    finally:
+        _current_tool_session.reset(token)
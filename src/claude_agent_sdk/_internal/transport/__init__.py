@@ -1,5 +1,6 @@
 """Transport implementations for Claude SDK."""
 
+import json
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
 from typing import Any
@@ -45,6 +46,22 @@ class Transport(ABC):
         """
         pass
 
+    def read_raw_messages(self) -> AsyncIterator[bytes]:
+        """Read messages without decoding them.
+
+        The default implementation re-encodes the output of read_messages().
+        Transports that receive bytes should override this to yield each
+        JSON line as received, skipping the decode/encode round trip.
+
+        Yields:
+            One JSON document per item, without the trailing newline
+        """
+        return self._encode_messages()
+
+    async def _encode_messages(self) -> AsyncIterator[bytes]:
+        async for message in self.read_messages():
+            yield json.dumps(message).encode()
+
     @abstractmethod
     async def close(self) -> None:
         """Close the transport connection and clean up resources."""
@@ -0,0 +1,39 @@
+"""Resource usage of a child process, read from /proc."""
+
+import os
+import time
+from pathlib import Path
+
+from ...types import ResourceUsage
+
+
+def read_proc_usage(pid: int) -> ResourceUsage | None:
+    """Sample a process's RSS, CPU time and open fds, or None without /proc.
+
+    Costs one read of /proc/<pid>/stat and one directory listing.
+    """
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_bytes()
+    except OSError:
+        return None
+
+    # Fields after the parenthesized command name, starting at the state
+    # (field 3 in proc(5)): utime and stime are fields 14 and 15, in clock
+    # ticks, and rss is field 24, in pages
+    fields = stat[stat.rindex(b")") + 2 :].split()
+    cpu_ticks = int(fields[11]) + int(fields[12])
+    rss_pages = int(fields[21])
+
+    try:
+        # Names only; Path.iterdir() would build an object per descriptor
+        open_fds: int | None = len(os.listdir(f"/proc/{pid}/fd"))  # noqa: PTH208
+    except OSError:
+        open_fds = None
+
+    return ResourceUsage(
+        pid=pid,
+        rss_bytes=rss_pages * os.sysconf("SC_PAGE_SIZE"),
+        cpu_seconds=cpu_ticks / os.sysconf("SC_CLK_TCK"),
+        open_fds=open_fds,
+        sampled_at=time.time(),
+    )
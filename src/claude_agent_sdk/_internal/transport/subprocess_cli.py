@@ -8,12 +8,13 @@ import re
 import shutil
 import sys
 import tempfile
+import time
 from collections.abc import AsyncIterable, AsyncIterator
 from contextlib import suppress
 from dataclasses import asdict
 from pathlib import Path
 from subprocess import PIPE
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import anyio
 import anyio.abc
@@ -23,12 +24,19 @@ from anyio.streams.text import TextReceiveStream, TextSendStream
 from ..._errors import CLIConnectionError, CLINotFoundError, ProcessError
 from ..._errors import CLIJSONDecodeError as SDKJSONDecodeError
 from ..._version import __version__
-from ...types import ClaudeAgentOptions
+from ...types import ClaudeAgentOptions, ResourceUsage
 from . import Transport
+from .resources import read_proc_usage
+
+if TYPE_CHECKING:
+    from ...metrics import SessionMetrics
+    from ...profiling import Profiler
 
 logger = logging.getLogger(__name__)
 
 _DEFAULT_MAX_BUFFER_SIZE = 1024 * 1024  # 1MB buffer limit
+# How long close() waits for the process to be reaped after SIGKILL
+_KILL_TIMEOUT = 5.0
 MINIMUM_CLAUDE_CODE_VERSION = "2.0.0"
 
 # Platform-specific command line length limits
@@ -37,6 +45,27 @@ MINIMUM_CLAUDE_CODE_VERSION = "2.0.0"
 _CMD_LENGTH_LIMIT = 8000 if platform.system() == "Windows" else 100000
 
 
+async def _profiled_reads(
+    profiler: "Profiler", stream: AsyncIterable[Any]
+) -> AsyncIterator[Any]:
+    """Iterate a stdout stream, calling the profiler around each read."""
+    iterator = stream.__aiter__()
+    while True:
+        info: dict[str, Any] = {"bytes": 0}
+        token = profiler.before("transport.read", info)
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            profiler.after("transport.read", info, token, None)
+            return
+        except BaseException as e:
+            profiler.after("transport.read", info, token, e)
+            raise
+        info["bytes"] = len(chunk)
+        profiler.after("transport.read", info, token, None)
+        yield chunk
+
+
 class SubprocessCLITransport(Transport):
     """Subprocess transport using Claude Code CLI."""
 
@@ -44,6 +73,8 @@ class SubprocessCLITransport(Transport):
         self,
         prompt: str | AsyncIterable[dict[str, Any]],
         options: ClaudeAgentOptions,
+        metrics: "SessionMetrics | None" = None,
+        profiler: "Profiler | None" = None,
     ):
         self._prompt = prompt
         self._is_streaming = not isinstance(prompt, str)
@@ -65,6 +96,11 @@ class SubprocessCLITransport(Transport):
             else _DEFAULT_MAX_BUFFER_SIZE
         )
         self._temp_files: list[str] = []  # Track temporary files for cleanup
+        self._metrics = metrics
+        self._exit_recorded = False
+        self._profiler = profiler
+        self._resource_usage: ResourceUsage | None = None
+        self._close_stats: dict[str, Any] | None = None
 
     def _find_cli(self) -> str:
         """Find Claude Code CLI binary."""
@@ -324,6 +360,7 @@ class SubprocessCLITransport(Transport):
             # For backward compat: use debug_stderr file object if no callback and debug is on
             stderr_dest = PIPE if should_pipe_stderr else None
 
+            spawn_started = time.perf_counter()
             self._process = await anyio.open_process(
                 cmd,
                 stdin=PIPE,
@@ -333,6 +370,8 @@ class SubprocessCLITransport(Transport):
                 env=process_env,
                 user=self._options.user,
             )
+            if self._metrics is not None:
+                self._metrics.process_spawned(time.perf_counter() - spawn_started)
 
             if self._process.stdout:
                 self._stdout_stream = TextReceiveStream(self._process.stdout)
@@ -399,7 +438,13 @@ class SubprocessCLITransport(Transport):
             pass  # Ignore other errors during stderr reading
 
     async def close(self) -> None:
-        """Close the transport and clean up resources."""
+        """Close the transport and clean up resources.
+
+        The CLI process gets SIGTERM and options.close_grace_period seconds
+        to exit, then SIGKILL, so a wedged process can't hold up close().
+        Stopping the process is shielded from cancellation, since it is
+        bounded and leaving the process running would leak it.
+        """
         self._ready = False
 
         # Clean up temporary files first (before early return)
@@ -410,6 +455,7 @@ class SubprocessCLITransport(Transport):
 
         if not self._process:
             return
+        started = time.perf_counter()
 
         # Close stderr task group if active
         if self._stderr_task_group:
@@ -434,13 +480,15 @@ class SubprocessCLITransport(Transport):
                 await self._process.stdin.aclose()
 
         # Terminate and wait for process
+        outcome = "exited"
         if self._process.returncode is None:
-            with suppress(ProcessLookupError):
-                self._process.terminate()
-                # Wait for process to finish with timeout
-                with suppress(Exception):
-                    # Just try to wait, but don't block if it fails
-                    await self._process.wait()
+            with anyio.CancelScope(shield=True):
+                outcome = await self._stop_process(self._process)
+        self._record_exit(self._process.returncode)
+        seconds = time.perf_counter() - started
+        self._close_stats = {"seconds": seconds, "outcome": outcome}
+        if self._metrics is not None:
+            self._metrics.process_closed(seconds, outcome)
 
         self._process = None
         self._stdout_stream = None
@@ -448,6 +496,43 @@ class SubprocessCLITransport(Transport):
         self._stderr_stream = None
         self._exit_error = None
 
+    async def _stop_process(self, process: Process) -> str:
+        """Terminate a process, escalating to SIGKILL after the grace period.
+
+        Returns how it ended: "terminated", "killed", or "unreaped" if it
+        still hadn't exited after SIGKILL.
+        """
+        with suppress(ProcessLookupError):
+            process.terminate()
+        with anyio.move_on_after(self._options.close_grace_period):
+            with suppress(Exception):
+                await process.wait()
+            return "terminated"
+
+        logger.warning(
+            f"CLI process {process.pid} did not exit within "
+            f"{self._options.close_grace_period}s of SIGTERM, killing it"
+        )
+        with suppress(ProcessLookupError):
+            process.kill()
+        with anyio.move_on_after(_KILL_TIMEOUT):
+            with suppress(Exception):
+                await process.wait()
+            return "killed"
+
+        logger.error(f"CLI process {process.pid} did not exit after SIGKILL")
+        return "unreaped"
+
+    @property
+    def close_stats(self) -> dict[str, Any] | None:
+        """How the last close() went: its duration in seconds and outcome.
+
+        The outcome is "exited" if the process had already exited, else
+        as returned by the escalation: "terminated", "killed" or
+        "unreaped". None until close() has stopped a process.
+        """
+        return self._close_stats
+
     async def write(self, data: str) -> None:
         """Write raw data to the transport."""
         # Check if ready (like TypeScript)
@@ -467,7 +552,11 @@ class SubprocessCLITransport(Transport):
             ) from self._exit_error
 
         try:
-            await self._stdin_stream.send(data)
+            if self._profiler is None:
+                await self._stdin_stream.send(data)
+            else:
+                with self._profiler.stage("transport.write", bytes=len(data)):
+                    await self._stdin_stream.send(data)
         except Exception as e:
             self._ready = False  # Mark as not ready (like TypeScript)
             self._exit_error = CLIConnectionError(
@@ -492,10 +581,19 @@ class SubprocessCLITransport(Transport):
             raise CLIConnectionError("Not connected")
 
         json_buffer = ""
+        metrics = self._metrics
+        profiler = self._profiler
+        stdout: AsyncIterable[str] = (
+            self._stdout_stream
+            if profiler is None
+            else _profiled_reads(profiler, self._stdout_stream)
+        )
+        # Time spent on failed speculative decodes of the buffered message
+        decode_seconds = 0.0
 
         # Process stdout messages
         try:
-            async for line in self._stdout_stream:
+            async for line in stdout:
                 line_str = line.strip()
                 if not line_str:
                     continue
@@ -523,15 +621,31 @@ class SubprocessCLITransport(Transport):
                             ),
                         )
 
+                    started = time.perf_counter() if metrics is not None else 0.0
                     try:
-                        data = json.loads(json_buffer)
-                        json_buffer = ""
-                        yield data
+                        if profiler is None:
+                            data = json.loads(json_buffer)
+                        else:
+                            with profiler.stage(
+                                "json.decode", bytes=len(json_buffer), complete=False
+                            ) as info:
+                                data = json.loads(json_buffer)
+                                info["complete"] = True
                     except json.JSONDecodeError:
                         # We are speculatively decoding the buffer until we get
                         # a full JSON object. If there is an actual issue, we
                         # raise an error after exceeding the configured limit.
+                        if metrics is not None:
+                            decode_seconds += time.perf_counter() - started
                         continue
+                    if metrics is not None:
+                        metrics.bytes_read(len(json_buffer))
+                        metrics.parsed(
+                            "json", decode_seconds + time.perf_counter() - started
+                        )
+                        decode_seconds = 0.0
+                    json_buffer = ""
+                    yield data
 
         except anyio.ClosedResourceError:
             pass
@@ -539,11 +653,89 @@ class SubprocessCLITransport(Transport):
             # Client disconnected
             pass
 
+        await self._check_exit()
+
+    def read_raw_messages(self) -> AsyncIterator[bytes]:
+        """Read undecoded JSON lines from the transport."""
+        return self._read_raw_messages_impl()
+
+    async def _read_raw_messages_impl(self) -> AsyncIterator[bytes]:
+        """Internal implementation of read_raw_messages."""
+        if not self._process or not self._process.stdout:
+            raise CLIConnectionError("Not connected")
+
+        # Read stdout bytes directly and split on newlines ourselves; the
+        # CLI writes exactly one JSON document per line
+        buffer = bytearray()
+        stdout: AsyncIterable[bytes] = (
+            self._process.stdout
+            if self._profiler is None
+            else _profiled_reads(self._profiler, self._process.stdout)
+        )
+        try:
+            async for chunk in stdout:
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(b"\n", start)) != -1:
+                    line = bytes(buffer[start:end]).strip()
+                    start = end + 1
+                    if line:
+                        if self._metrics is not None:
+                            self._metrics.bytes_read(len(line))
+                        yield line
+                del buffer[:start]
+
+                if len(buffer) > self._max_buffer_size:
+                    buffer_length = len(buffer)
+                    buffer.clear()
+                    raise SDKJSONDecodeError(
+                        f"JSON message exceeded maximum buffer size of {self._max_buffer_size} bytes",
+                        ValueError(
+                            f"Buffer size {buffer_length} exceeds limit {self._max_buffer_size}"
+                        ),
+                    )
+
+            trailing = bytes(buffer).strip()
+            if trailing:
+                if self._metrics is not None:
+                    self._metrics.bytes_read(len(trailing))
+                yield trailing
+
+        except anyio.ClosedResourceError:
+            pass
+        except GeneratorExit:
+            # Client disconnected
+            pass
+
+        await self._check_exit()
+
+    def sample_resources(self) -> ResourceUsage | None:
+        """Sample the CLI process's resource usage from /proc.
+
+        Returns None if the process isn't running or /proc is unavailable.
+        """
+        if self._process is None or self._process.returncode is not None:
+            return None
+        usage = read_proc_usage(self._process.pid)
+        if usage is not None:
+            self._resource_usage = usage
+        return usage
+
+    @property
+    def resource_usage(self) -> ResourceUsage | None:
+        """The most recent sample_resources() result."""
+        return self._resource_usage
+
+    async def _check_exit(self) -> None:
+        """Wait for the process and raise ProcessError if it failed."""
+        assert self._process is not None
+
         # Check process completion and handle errors
         try:
             returncode = await self._process.wait()
         except Exception:
             returncode = -1
+        self._record_exit(returncode)
 
         # Use exit code for error detection
         if returncode is not None and returncode != 0:
@@ -554,6 +746,11 @@ class SubprocessCLITransport(Transport):
             )
             raise self._exit_error
 
+    def _record_exit(self, returncode: int | None) -> None:
+        if self._metrics is not None and not self._exit_recorded:
+            self._exit_recorded = True
+            self._metrics.process_exited(returncode)
+
     async def _check_claude_version(self) -> None:
         """Check Claude Code version and warn if below minimum."""
         version_process = None
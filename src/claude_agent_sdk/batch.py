@@ -0,0 +1,102 @@
+"""Batch function for running many independent queries concurrently."""
+
+import os
+from collections.abc import Callable, Iterable
+
+from ._internal.batch import BatchRun
+from ._internal.transport import Transport
+from .types import ClaudeAgentOptions
+
+
+def batch(
+    prompts: Iterable[str],
+    options: ClaudeAgentOptions | None = None,
+    *,
+    concurrency: int = 4,
+    ordered: bool = True,
+    spawn_interval: float = 0.0,
+    retries: int = 0,
+    retry_backoff: float = 1.0,
+    max_budget_usd: float | None = None,
+    transport_factory: Callable[[str], Transport] | None = None,
+    keep_messages: bool = True,
+    processes: int | None = None,
+) -> BatchRun:
+    """
+    Run many independent one-shot queries with bounded concurrency.
+
+    Each prompt is run as its own query() with the same options, at most
+    `concurrency` at a time. Results are delivered as BatchResult objects as
+    the queries complete, and the returned BatchRun keeps the aggregate cost
+    and token usage.
+
+    Args:
+        prompts: The prompts to run. May be a lazy iterable; prompts are
+                 pulled only as capacity frees up.
+        options: Options shared by every query (defaults to ClaudeAgentOptions())
+        concurrency: Maximum number of CLI processes running at once
+        ordered: If True, results are delivered in prompt order; otherwise as
+                 soon as each completes
+        spawn_interval: Minimum seconds between CLI process starts, to avoid
+                        a burst of spawns at the start of a large batch
+        retries: How many times to retry a prompt whose query raised before
+                 producing a ResultMessage
+        retry_backoff: Delay before the first retry, doubled for each further
+                       retry
+        max_budget_usd: Global budget across the batch. Each running query
+                        reserves a share of what remains as its own
+                        max_budget_usd, so concurrent queries can't overspend
+                        it, and no new prompts start once it is spent; their
+                        indices are recorded in BatchRun.skipped.
+        transport_factory: Optional callable taking a prompt and returning a
+                           fresh transport for its query, instead of the
+                           subprocess CLI transport
+        keep_messages: If False, only the ResultMessage of each query is kept
+                       and BatchResult.messages stays empty, which keeps
+                       memory flat for very large batches
+        processes: Shard the batch across this many worker processes, each
+                   running its own event loop with up to
+                   ceil(concurrency / processes) queries. Useful when parsing
+                   and dispatch in a single loop become the bottleneck.
+                   Options and transport_factory are pickled to the workers,
+                   so callbacks and hooks must be module-level functions.
+                   options.metrics, options.tracer and options.profiler
+                   are not used in workers.
+
+    Returns:
+        A BatchRun to iterate with `async for`
+
+    Example:
+        ```python
+        run = batch(
+            [f"Summarize {path}" for path in paths],
+            ClaudeAgentOptions(allowed_tools=["Read"]),
+            concurrency=8,
+            max_budget_usd=5.0,
+        )
+        async for result in run:
+            if result.error:
+                print(f"{result.prompt} failed: {result.error}")
+            elif result.result:
+                print(result.result.result)
+        print(f"Total cost: ${run.total_cost_usd:.4f}, usage: {run.usage}")
+        ```
+    """
+    if options is None:
+        options = ClaudeAgentOptions()
+
+    os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py"
+
+    return BatchRun(
+        prompts,
+        options,
+        concurrency=concurrency,
+        ordered=ordered,
+        spawn_interval=spawn_interval,
+        retries=retries,
+        retry_backoff=retry_backoff,
+        max_budget_usd=max_budget_usd,
+        transport_factory=transport_factory,
+        keep_messages=keep_messages,
+        processes=processes,
+    )
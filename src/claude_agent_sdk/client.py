@@ -1,14 +1,54 @@
 """Claude SDK Client for interacting with Claude Code."""
 
 import json
+import logging
 import os
-from collections.abc import AsyncIterable, AsyncIterator
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
 from dataclasses import replace
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+import anyio
 
 from . import Transport
 from ._errors import CLIConnectionError
-from .types import ClaudeAgentOptions, HookEvent, HookMatcher, Message, ResultMessage
+from .types import (
+    ClaudeAgentOptions,
+    HookEvent,
+    HookMatcher,
+    Message,
+    RawMessage,
+    ResourceUsage,
+    ResultMessage,
+)
+
+if TYPE_CHECKING:
+    from ._internal.broadcast import OverflowPolicy, Subscription
+    from .metrics import SessionMetrics
+    from .tracing import SessionTrace
+    from .types import RestartPolicy
+
+logger = logging.getLogger(__name__)
+
+
+async def _empty_stream() -> AsyncIterator[dict[str, Any]]:
+    # Never yields, but indicates that this function is an iterator and
+    # keeps the connection open.
+    # This yield is never reached but makes this an async generator
+    return
+    yield {}  # type: ignore[unreachable]
+
+
+async def _first(*waits: Callable[[], Awaitable[Any]]) -> None:
+    """Wait until the first of several waits returns."""
+    async with anyio.create_task_group() as tg:
+
+        async def wait(function: Callable[[], Awaitable[Any]]) -> None:
+            await function()
+            tg.cancel_scope.cancel()
+
+        for function in waits:
+            tg.start_soon(wait, function)
 
 
 class ClaudeSDKClient:
@@ -64,6 +104,23 @@ class ClaudeSDKClient:
         self._custom_transport = transport
         self._transport: Transport | None = None
         self._query: Any | None = None
+        self._router: Any | None = None
+        self._broadcast: Any | None = None
+        self._metrics: SessionMetrics | None = None
+        self._trace: SessionTrace | None = None
+        # Restart state, used with options.restart_policy. The Query then
+        # lives in a supervisor task of the client's own task group.
+        self._supervised = False
+        self._supervisor: anyio.abc.TaskGroup | None = None
+        self._supervisor_done = True
+        self._stopping: anyio.Event | None = None
+        self._query_changed: anyio.Event | None = None
+        self._prompt_scope: anyio.CancelScope | None = None
+        # Cancelled on disconnect, for the router and broadcast tasks
+        self._background_scopes: list[anyio.CancelScope] = []
+        self._restarts = 0
+        self._pending_prompts: list[str] = []
+        self._input_ended = False
         os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py-client"
 
     def _convert_hooks_to_internal_format(
@@ -88,18 +145,7 @@ class ClaudeSDKClient:
         self, prompt: str | AsyncIterable[dict[str, Any]] | None = None
     ) -> None:
         """Connect to Claude with a prompt or message stream."""
-
-        from ._internal.query import Query
-        from ._internal.transport.subprocess_cli import SubprocessCLITransport
-
         # Auto-connect with empty async iterable if no prompt is provided
-        async def _empty_stream() -> AsyncIterator[dict[str, Any]]:
-            # Never yields, but indicates that this function is an iterator and
-            # keeps the connection open.
-            # This yield is never reached but makes this an async generator
-            return
-            yield {}  # type: ignore[unreachable]
-
         actual_prompt = _empty_stream() if prompt is None else prompt
 
         # Validate and configure permission settings (matching TypeScript SDK logic)
@@ -122,16 +168,49 @@ class ClaudeSDKClient:
             options = replace(self.options, permission_prompt_tool_name="stdio")
         else:
             options = self.options
+        if self.options.restart_policy is not None and self._custom_transport is None:
+            await self._connect_supervised(prompt, options)
+            return
+
+        self._use(await self._start(actual_prompt, options))
+
+        assert self._query is not None
+        # If we have an initial prompt stream, start streaming it
+        if prompt is not None and isinstance(prompt, AsyncIterable) and self._query._tg:
+            self._query._tg.start_soon(self._query.stream_input, prompt)
+
+    async def _start(
+        self, prompt: str | AsyncIterable[dict[str, Any]], options: ClaudeAgentOptions
+    ) -> Any:
+        """Spawn the CLI, start reading from it and run the initialize handshake.
+
+        Returns the Query, which must later be closed by the same task.
+        """
+        from ._internal.query import Query
+        from ._internal.transport.subprocess_cli import SubprocessCLITransport
+
+        metrics = (
+            self.options.metrics.session() if self.options.metrics is not None else None
+        )
+        trace = (
+            self.options.tracer.session() if self.options.tracer is not None else None
+        )
 
         # Use provided custom transport or create subprocess transport
+        transport: Transport
         if self._custom_transport:
-            self._transport = self._custom_transport
+            transport = self._custom_transport
         else:
-            self._transport = SubprocessCLITransport(
-                prompt=actual_prompt,
+            transport = SubprocessCLITransport(
+                prompt=prompt,
                 options=options,
+                metrics=metrics,
+                profiler=self.options.profiler,
             )
-        await self._transport.connect()
+        started = time.perf_counter()
+        await transport.connect()
+        if trace is not None:
+            trace.span("spawn", "process", started, time.perf_counter())
 
         # Extract SDK MCP servers from options
         sdk_mcp_servers = {}
@@ -148,8 +227,8 @@ class ClaudeSDKClient:
         initialize_timeout = max(initialize_timeout_ms / 1000.0, 60.0)
 
         # Create Query to handle control protocol
-        self._query = Query(
-            transport=self._transport,
+        query = Query(
+            transport=transport,
             is_streaming_mode=True,  # ClaudeSDKClient always uses streaming mode
             can_use_tool=self.options.can_use_tool,
             hooks=self._convert_hooks_to_internal_format(self.options.hooks)
@@ -157,25 +236,292 @@ class ClaudeSDKClient:
             else None,
             sdk_mcp_servers=sdk_mcp_servers,
             initialize_timeout=initialize_timeout,
+            coalesce_window=self.options.stream_coalesce_window,
+            coalesce_max_bytes=self.options.stream_coalesce_max_bytes,
+            raw=self.options.raw_messages,
+            buffer_size=self.options.message_buffer_size,
+            buffer_policy=self.options.message_buffer_policy,
+            spill_dir=self.options.message_spill_dir,
+            metrics=metrics,
+            trace=trace,
+            profiler=self.options.profiler,
+            resource_sample_interval=self.options.resource_sample_interval,
+            resource_limits=self.options.resource_limits,
+            track_session=self.options.restart_policy is not None,
         )
 
         # Start reading messages and initialize
-        await self._query.start()
-        await self._query.initialize()
+        try:
+            await query.start()
+            await query.initialize()
+        except BaseException:
+            await query.close()
+            raise
+        return query
+
+    def _use(self, query: Any) -> None:
+        self._query = query
+        self._transport = query.transport
+        self._metrics = query._metrics
+        self._trace = query._trace
+
+    async def _connect_supervised(
+        self,
+        prompt: str | AsyncIterable[dict[str, Any]] | None,
+        options: ClaudeAgentOptions,
+    ) -> None:
+        """Connect with the Query owned by a supervisor that restarts it."""
+        self._supervised = True
+        self._supervisor_done = False
+        self._stopping = anyio.Event()
+        self._query_changed = anyio.Event()
+        self._restarts = 0
+        self._pending_prompts.clear()
+        self._input_ended = False
+
+        supervisor = anyio.create_task_group()
+        await supervisor.__aenter__()
+        try:
+            await supervisor.start(self._supervise, options)
+        except BaseException:
+            supervisor.cancel_scope.cancel()
+            await supervisor.__aexit__(None, None, None)
+            self._supervised = False
+            raise
+        self._supervisor = supervisor
 
-        # If we have an initial prompt stream, start streaming it
-        if prompt is not None and isinstance(prompt, AsyncIterable) and self._query._tg:
-            self._query._tg.start_soon(self._query.stream_input, prompt)
+        if isinstance(prompt, str):
+            await self.query(prompt)
+        elif prompt is not None:
+            # Written like query() prompts, so they are sent again after
+            # a restart
+            self._prompt_scope = anyio.CancelScope()
+            supervisor.start_soon(self._stream_prompts, prompt, self._prompt_scope)
+
+    async def _stream_prompts(
+        self, stream: AsyncIterable[dict[str, Any]], scope: anyio.CancelScope
+    ) -> None:
+        with scope:
+            try:
+                async for message in stream:
+                    await self._write_prompt(message)
+                # The CLI exits once input ends; that is not a crash
+                self._input_ended = True
+                if self._transport is not None:
+                    await self._transport.end_input()
+            except Exception as e:
+                logger.debug(f"Error streaming input: {e}")
+
+    async def _supervise(
+        self,
+        options: ClaudeAgentOptions,
+        *,
+        task_status: anyio.abc.TaskStatus[None] = anyio.TASK_STATUS_IGNORED,
+    ) -> None:
+        """Start the Query, and restart it whenever its CLI exits.
+
+        Runs in the client's task group: a Query must be closed by the task
+        that started it, which can't be a task that happened to be reading
+        or writing when the CLI exited. Those wait in _await_restart().
+        """
+        policy = self.options.restart_policy
+        assert policy is not None and self._stopping is not None
+        query = await self._start(_empty_stream(), options)
+        self._use(query)
+        task_status.started()
+        try:
+            while True:
+                await _first(query.wait_reader_finished, self._stopping.wait)
+                if self._stopping.is_set() or not self._should_restart(query):
+                    return
+                session_id, error = query.session_id, query.reader_error
+                await query.close()
+                restarted = await self._restart(policy, options, session_id, error)
+                if restarted is None:
+                    return
+                query = restarted
+                self._use(query)
+                self._notify()
+        finally:
+            self._supervisor_done = True
+            self._notify()
+            await query.close()
+
+    def _should_restart(self, query: Any) -> bool:
+        # A CLI that exits cleanly after its input ended is done, not crashed
+        return query.reader_error is not None or not self._input_ended
+
+    def _notify(self) -> None:
+        """Wake tasks waiting in _await_restart()."""
+        assert self._query_changed is not None
+        self._query_changed.set()
+        self._query_changed = anyio.Event()
+
+    async def _await_restart(self, failed: Any) -> bool:
+        """Wait for the supervisor to replace a Query whose CLI exited.
+
+        Returns False if it won't, because no restart policy applies, its
+        restarts are used up or the client is disconnecting.
+        """
+        while self._query is failed and not self._supervisor_done:
+            assert self._query_changed is not None
+            await self._query_changed.wait()
+        return self._query is not failed and self._query is not None
 
     async def receive_messages(self) -> AsyncIterator[Message]:
         """Receive all messages from Claude."""
         if not self._query:
             raise CLIConnectionError("Not connected. Call connect() first.")
 
+        if self._broadcast is not None:
+            async for message in self._broadcast.receive():
+                yield message
+            return
+
+        # Once sessions are in use, only messages routed to none of them
+        if self._router is not None:
+            async for data in self._router.receive(None):
+                yield self._parse(data)
+            return
+
+        async for data in self._query_messages():
+            yield self._parse(data)
+
+    async def _query_messages(self) -> AsyncIterator[dict[str, Any]]:
+        """Messages from the Query, following it across restarts."""
+        supervised = self._supervised
+        while True:
+            query = self._query
+            if query is None:
+                return  # Disconnected
+            try:
+                async for data in query.receive_messages():
+                    if supervised and data.get("type") == "result":
+                        self._turn_finished()
+                    yield data
+            except Exception:
+                if query.reader_error is None or not await self._await_restart(query):
+                    raise
+            else:
+                if not supervised or not await self._await_restart(query):
+                    return
+
+    def _start_background(self, function: Callable[[], Awaitable[None]]) -> None:
+        """Run a task reading from the Query for as long as the client is connected.
+
+        With a restart policy it runs in the supervisor's task group, so it
+        outlives each Query; otherwise in the Query's.
+        """
+        if self._supervisor is None:
+            assert self._query is not None
+            self._query._tg.start_soon(function)
+            return
+        scope = anyio.CancelScope()
+        self._background_scopes.append(scope)
+
+        async def run() -> None:
+            with scope:
+                await function()
+
+        self._supervisor.start_soon(run)
+
+    def _parse(self, data: dict[str, Any]) -> Message:
         from ._internal.message_parser import parse_message
 
-        async for data in self._query.receive_messages():
-            yield parse_message(data)
+        lazy = self.options.lazy_content_blocks
+        profiler = self.options.profiler
+        if self._metrics is None and profiler is None:
+            return parse_message(data, lazy=lazy)
+        started = time.perf_counter()
+        if profiler is None:
+            message = parse_message(data, lazy=lazy)
+        else:
+            with profiler.stage("parse_message", type=data.get("type")):
+                message = parse_message(data, lazy=lazy)
+        if self._metrics is not None:
+            self._metrics.parsed("message", time.perf_counter() - started)
+        return message
+
+    def subscribe(
+        self, buffer_size: int = 100, overflow: "OverflowPolicy" = "block"
+    ) -> "Subscription[Message]":
+        """Receive messages in one of several independent consumers.
+
+        Each subscription gets every message that arrives after it was
+        created, parsed once and shared by reference with the other
+        subscribers, so messages must not be modified. Each has its own
+        queue of `buffer_size` messages; when it is full, `overflow`
+        decides what happens:
+
+        - "block": delivery to all subscribers waits for this one
+        - "drop_oldest": the oldest undelivered message is discarded
+        - "coalesce": partial-message deltas are merged into the newest
+          queued delta of the same block; other messages wait as with "block"
+
+        Once a subscription exists, receive_messages() and receive_response()
+        read from one more subscription, created with the first and kept
+        across calls, so messages arriving between calls are not lost.
+        Until receive_messages() is first called, that subscription drops
+        its oldest messages beyond message_buffer_size rather than holding
+        up the others; after that it must be consumed like any "block"
+        subscription.
+
+        Example:
+            ```python
+            async with ClaudeSDKClient() as client:
+                ui = client.subscribe(overflow="coalesce")
+                transcript = client.subscribe(buffer_size=1000)
+                tg.start_soon(render, ui)
+                tg.start_soon(write_transcript, transcript)
+                await client.query("Refactor utils.py")
+            ```
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+
+        from ._internal.broadcast import MessageBroadcast
+
+        if self._broadcast is None:
+
+            async def _parsed() -> AsyncIterator[Message]:
+                async for data in self._query_messages():
+                    yield self._parse(data)
+
+            self._broadcast = MessageBroadcast(
+                _parsed(), self.options.message_buffer_size
+            )
+            self._start_background(self._broadcast.run)
+        subscription: Subscription[Message] = self._broadcast.subscribe(
+            buffer_size, overflow
+        )
+        return subscription
+
+    async def receive_raw(self) -> AsyncIterator[RawMessage]:
+        """Receive all messages from Claude without decoding them.
+
+        Each RawMessage carries the line exactly as the CLI wrote it, plus
+        its `type` and `session_id`, so it can be forwarded unchanged.
+        Control messages are still handled internally and never yielded.
+
+        Set `raw_messages=True` in ClaudeAgentOptions to skip decoding
+        entirely; otherwise messages are decoded and re-encoded.
+
+        Example:
+            ```python
+            options = ClaudeAgentOptions(raw_messages=True)
+            async with ClaudeSDKClient(options) as client:
+                await client.query("Hello")
+                async for raw in client.receive_raw():
+                    await websocket.send_bytes(raw.data)
+                    if raw.type == "result":
+                        break
+            ```
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+
+        async for raw in self._query.receive_raw_messages():
+            yield raw
 
     async def query(
         self, prompt: str | AsyncIterable[dict[str, Any]], session_id: str = "default"
@@ -198,14 +544,127 @@ class ClaudeSDKClient:
                 "parent_tool_use_id": None,
                 "session_id": session_id,
             }
-            await self._transport.write(json.dumps(message) + "\n")
+            await self._write_prompt(message)
         else:
             # Handle AsyncIterable prompts - stream them
             async for msg in prompt:
                 # Ensure session_id is set on each message
                 if "session_id" not in msg:
                     msg["session_id"] = session_id
-                await self._transport.write(json.dumps(msg) + "\n")
+                await self._write_prompt(msg)
+
+    async def _write_prompt(self, message: dict[str, Any]) -> None:
+        assert self._transport is not None
+        line = json.dumps(message) + "\n"
+        is_prompt = message.get("type") == "user"
+        if self._trace is not None and is_prompt:
+            self._trace.prompt_sent()
+        if not self._supervised:
+            await self._transport.write(line)
+            return
+
+        # Kept until its result arrives, to send again after a restart
+        if is_prompt:
+            self._pending_prompts.append(line)
+        query = self._query
+        try:
+            await self._transport.write(line)
+        except CLIConnectionError:
+            # The supervisor sends the pending prompts to the new CLI
+            if not await self._await_restart(query):
+                raise
+
+    def _turn_finished(self) -> None:
+        if self._pending_prompts:
+            self._pending_prompts.pop(0)
+        self._restarts = 0
+
+    async def _restart(
+        self,
+        policy: "RestartPolicy",
+        options: ClaudeAgentOptions,
+        session_id: str | None,
+        error: Exception | None,
+    ) -> Any:
+        """Start a Query resuming `session_id`, following the restart policy.
+
+        Sends the prompts still waiting for a result again. Returns None
+        once the policy's restarts are used up.
+        """
+        while self._restarts < policy.max_restarts:
+            self._restarts += 1
+            delay = min(policy.backoff * 2 ** (self._restarts - 1), policy.max_backoff)
+            logger.warning(
+                f"CLI exited ({error or 'end of output'}), restarting it in "
+                f"{delay:.1f}s (attempt {self._restarts} of {policy.max_restarts})"
+            )
+            await anyio.sleep(delay)
+            if session_id is not None:
+                options = replace(
+                    options,
+                    resume=session_id,
+                    continue_conversation=False,
+                    fork_session=False,
+                )
+            try:
+                query = await self._start(_empty_stream(), options)
+            except Exception as e:
+                logger.warning(f"Failed to restart the CLI: {e}")
+                error = e
+                continue
+            try:
+                for line in self._pending_prompts:
+                    await query.transport.write(line)
+            except Exception as e:
+                logger.warning(f"Failed to restart the CLI: {e}")
+                await query.close()
+                error = e
+                continue
+            return query
+        return None
+
+    def session(self, session_id: str, buffer_size: int = 100) -> "ClientSession":
+        """Get a conversation multiplexed over this client's CLI process.
+
+        Prompts sent through the returned ClientSession are tagged with
+        `session_id`, and inbound messages are routed to a buffer per
+        session, so several conversations can be interleaved on one
+        connection. Messages with a session_id that names no open session
+        are routed to the session whose turn is oldest, since the CLI
+        answers turns in order.
+
+        Sessions share one CLI conversation, so each sees the context of
+        every turn sent before it on this client; they separate the message
+        streams, not the model's context. Use separate clients for isolated
+        conversations.
+
+        Once a session is opened, receive_messages() yields only messages
+        that belong to no session. Every open session must be consumed or
+        closed: messages are routed in order, so a session whose buffer
+        (`buffer_size` messages) is full holds up delivery to the others.
+
+        Example:
+            ```python
+            async with ClaudeSDKClient() as client:
+                a, b = client.session("a"), client.session("b")
+                await a.query("Summarize README.md")
+                await b.query("List the open TODOs")
+                async for message in a.receive_response():
+                    ...
+                async for message in b.receive_response():
+                    ...
+            ```
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+
+        from ._internal.session_router import SessionRouter
+
+        if self._router is None:
+            self._router = SessionRouter(self._query_messages())
+            self._start_background(self._router.run)
+        self._router.open(session_id, buffer_size)
+        return ClientSession(self, session_id)
 
     async def interrupt(self) -> None:
         """Send interrupt signal (only works with streaming mode)."""
@@ -286,6 +745,45 @@ class ClaudeSDKClient:
         # Return the initialization result that was already obtained during connect
         return getattr(self._query, "_initialization_result", None)
 
+    def get_coalescing_stats(self) -> dict[str, int] | None:
+        """Get stream event coalescing counts.
+
+        Returns:
+            `{"events_in": ..., "events_out": ...}`, the number of messages
+            read from the CLI and delivered after merging deltas, or None if
+            stream_coalesce_window and stream_coalesce_max_bytes are unset.
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+        stats: dict[str, int] | None = self._query.coalescing_stats
+        return stats
+
+    def get_resource_usage(self) -> ResourceUsage | None:
+        """Sample the CLI process's RSS, CPU time and open file descriptors.
+
+        Reads /proc/<pid>, so it returns None on platforms without /proc,
+        with a custom transport, or once the process has exited. Set
+        options.resource_sample_interval to also sample periodically, attach
+        samples to ResultMessage.resource_usage and enforce
+        options.resource_limits.
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+        usage: ResourceUsage | None = self._query.sample_resources()
+        return usage
+
+    def get_buffer_stats(self) -> dict[str, int] | None:
+        """Get message buffer counts for the "spill" buffer policy.
+
+        Returns:
+            `{"in_memory": ..., "on_disk": ..., "spilled": ..., "peak_on_disk": ...}`,
+            or None if message_buffer_policy is "block".
+        """
+        if not self._query:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+        stats: dict[str, int] | None = self._query.buffer_stats
+        return stats
+
     async def receive_response(self) -> AsyncIterator[Message]:
         """
         Receive messages from Claude until and including a ResultMessage.
@@ -329,10 +827,25 @@ class ClaudeSDKClient:
 
     async def disconnect(self) -> None:
         """Disconnect from Claude."""
-        if self._query:
+        if self._supervisor is not None:
+            assert self._stopping is not None
+            self._stopping.set()
+            if self._prompt_scope is not None:
+                self._prompt_scope.cancel()
+            for scope in self._background_scopes:
+                scope.cancel()
+            self._background_scopes.clear()
+            # The supervisor closes the Query it started
+            await self._supervisor.__aexit__(None, None, None)
+            self._supervisor = None
+            self._prompt_scope = None
+            self._supervised = False
+        elif self._query:
             await self._query.close()
-            self._query = None
+        self._query = None
         self._transport = None
+        self._router = None
+        self._broadcast = None
 
     async def __aenter__(self) -> "ClaudeSDKClient":
         """Enter async context - automatically connects with empty stream for interactive use."""
@@ -343,3 +856,45 @@ class ClaudeSDKClient:
         """Exit async context - always disconnects."""
         await self.disconnect()
         return False
+
+
+class ClientSession:
+    """One conversation on a ClaudeSDKClient shared with other sessions.
+
+    Obtained from ClaudeSDKClient.session(). All sessions of a client share
+    the same CLI conversation and its context; only their messages are kept
+    apart.
+    """
+
+    def __init__(self, client: ClaudeSDKClient, session_id: str):
+        self.client = client
+        self.session_id = session_id
+
+    async def query(self, prompt: str | AsyncIterable[dict[str, Any]]) -> None:
+        """Send a prompt in this session."""
+        router = self.client._router
+        if router is None:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+        router.expect_turn(self.session_id)
+        await self.client.query(prompt, session_id=self.session_id)
+
+    async def receive_messages(self) -> AsyncIterator[Message]:
+        """Receive all messages routed to this session."""
+        router = self.client._router
+        if router is None:
+            raise CLIConnectionError("Not connected. Call connect() first.")
+
+        async for data in router.receive(self.session_id):
+            yield self.client._parse(data)
+
+    async def receive_response(self) -> AsyncIterator[Message]:
+        """Receive this session's messages up to and including a ResultMessage."""
+        async for message in self.receive_messages():
+            yield message
+            if isinstance(message, ResultMessage):
+                return
+
+    def close(self) -> None:
+        """Stop receiving this session's messages; later ones are discarded."""
+        if self.client._router is not None:
+            self.client._router.close(self.session_id)
@@ -0,0 +1,448 @@
+"""In-process metrics for SDK sessions and the control protocol."""
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from typing import Any
+
+# Round trips and callbacks: half a millisecond to a minute
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Decoding and parsing one message: a microsecond to a tenth of a second
+PARSE_BUCKETS = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.01,
+    0.1,
+)
+
+# Whole one-shot queries: half a second to ten minutes
+QUERY_BUCKETS = (
+    0.5,
+    1.0,
+    2.0,
+    3.0,
+    5.0,
+    7.5,
+    10.0,
+    15.0,
+    20.0,
+    30.0,
+    45.0,
+    60.0,
+    90.0,
+    120.0,
+    300.0,
+    600.0,
+)
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def remove(self, label: str, value: str) -> None:
+        """Drop every series whose `label` has `value`."""
+        index = self.labelnames.index(label)
+        for labels in [labels for labels in self._values if labels[index] == value]:
+            del self._values[labels]
+
+
+class Counter(_Family):
+    """Monotonic total per label set."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[tuple[tuple[str, ...], float]]:
+        yield from self._values.items()
+
+
+class Gauge(_Family):
+    """Current value per label set, set directly or read from a function."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        super().__init__(name, help, labelnames)
+        self._functions: dict[
+            int, tuple[Callable[[], tuple[str, ...]], Callable[[], float]]
+        ] = {}
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    def track(
+        self, labels: Callable[[], tuple[str, ...]], value: Callable[[], float]
+    ) -> int:
+        """Read a value when the gauge is exported; returns a key for untrack()."""
+        key = id(value)
+        self._functions[key] = (labels, value)
+        return key
+
+    def untrack(self, key: int) -> None:
+        self._functions.pop(key, None)
+
+    def samples(self) -> Iterator[tuple[tuple[str, ...], float]]:
+        values = dict(self._values)
+        for labels, value in self._functions.values():
+            key = labels()
+            values[key] = values.get(key, 0) + value()
+        yield from values.items()
+
+
+class Histogram(_Family):
+    """Distribution of observed values per label set, in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            # Per-bucket counts (the last one is +Inf), then sum
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterator[tuple[tuple[str, ...], dict[str, Any]]]:
+        for labels, series in self._values.items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(
+                (*self.buckets, float("inf")), series[:-1], strict=True
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+            yield labels, {"count": cumulative, "sum": series[-1], "buckets": buckets}
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return 0 if series is None else sum(series[:-1])
+
+    def quantile(self, q: float, *labels: str) -> float | None:
+        """Estimate the q-quantile (0 to 1) of a series, or None if empty.
+
+        Interpolates linearly within the bucket holding the quantile, as
+        Prometheus' histogram_quantile() does; values in the +Inf bucket
+        are reported as the largest finite bound.
+        """
+        series: list[float] | None = self._values.get(labels)
+        if series is None:
+            return None
+        total = sum(series[:-1])
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0.0
+        lower = 0.0
+        for bound, count in zip(self.buckets, series, strict=False):
+            if count and cumulative + count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms describing what the SDK does.
+
+    Pass a registry as `ClaudeAgentOptions(metrics=...)` to have every
+    client and query using those options record into it; with no
+    registry, nothing is recorded. Export with to_prometheus() (text
+    exposition format, for serving from your own /metrics endpoint) or
+    to_dict().
+
+    Most series are labeled by `session`, which is empty unless
+    `per_session` is True. With per_session=True the label is the session
+    id the CLI reports (still empty for metrics recorded before it is known,
+    such as the initialize request), and the series of finished sessions
+    stay until remove_session(): call it once a session's metrics have been
+    scraped, or the registry grows with every session. The default keeps
+    the number of series bounded for long-running services.
+
+    Recording is a dict update and, for histograms, a bisect, so it can
+    stay on under load. The registry is not locked: use it from one
+    event loop, or accept occasional lost updates across threads.
+
+    Metric families (all prefixed claude_sdk_):
+        messages_read_total: Messages read from the CLI, by type
+        bytes_read_total: Bytes of CLI output decoded
+        parse_seconds: Time to decode JSON ("json") and build Message
+            objects ("message"), by stage
+        message_buffer_depth: Messages waiting for the consumer
+        control_requests_total: Control requests by subtype and direction
+            ("outgoing" from the SDK, "incoming" from the CLI)
+        control_errors_total: Control requests that failed, likewise
+        control_request_seconds: Round trip of outgoing control requests
+        callback_seconds: Time spent answering incoming control requests
+            (permission, hook and SDK MCP callbacks)
+        mcp_tool_seconds: SDK MCP tool calls, by server and tool
+        process_spawn_seconds: Time to start the CLI process
+        process_exits_total: CLI process exits, by exit code
+        process_close_seconds: Time to close the transport, by outcome
+            ("exited", "terminated", "killed" or "unreaped")
+        query_seconds: Time from starting a query() to its result, by
+            result subtype
+        hedged_queries_total: Hedged queries by outcome ("primary" or
+            "hedge" for the attempt that won, "skipped" when the budget
+            left no room for a hedge)
+    """
+
+    def __init__(self, per_session: bool = False):
+        self.per_session = per_session
+        session = ("session",)
+        self.messages_read = Counter(
+            "claude_sdk_messages_read_total",
+            "Messages read from the CLI",
+            (*session, "type"),
+        )
+        self.bytes_read = Counter(
+            "claude_sdk_bytes_read_total", "Bytes of CLI output decoded", session
+        )
+        self.parse_seconds = Histogram(
+            "claude_sdk_parse_seconds",
+            "Time to decode and parse one message",
+            (*session, "stage"),
+            PARSE_BUCKETS,
+        )
+        self.message_buffer_depth = Gauge(
+            "claude_sdk_message_buffer_depth",
+            "Messages buffered for the consumer",
+            session,
+        )
+        self.control_requests = Counter(
+            "claude_sdk_control_requests_total",
+            "Control requests",
+            (*session, "subtype", "direction"),
+        )
+        self.control_errors = Counter(
+            "claude_sdk_control_errors_total",
+            "Control requests that failed",
+            (*session, "subtype", "direction"),
+        )
+        self.control_request_seconds = Histogram(
+            "claude_sdk_control_request_seconds",
+            "Round trip of control requests sent to the CLI",
+            (*session, "subtype"),
+        )
+        self.callback_seconds = Histogram(
+            "claude_sdk_callback_seconds",
+            "Time to answer control requests from the CLI",
+            (*session, "subtype"),
+        )
+        self.mcp_tool_seconds = Histogram(
+            "claude_sdk_mcp_tool_seconds",
+            "SDK MCP tool call duration",
+            (*session, "server", "tool"),
+        )
+        self.process_spawn_seconds = Histogram(
+            "claude_sdk_process_spawn_seconds", "Time to start the CLI process", ()
+        )
+        self.process_exits = Counter(
+            "claude_sdk_process_exits_total", "CLI process exits", ("exit_code",)
+        )
+        self.process_close_seconds = Histogram(
+            "claude_sdk_process_close_seconds",
+            "Time to close the transport and stop the CLI process",
+            ("outcome",),
+        )
+        self.query_seconds = Histogram(
+            "claude_sdk_query_seconds",
+            "Time from starting a query to its result",
+            ("subtype",),
+            QUERY_BUCKETS,
+        )
+        self.hedged_queries = Counter(
+            "claude_sdk_hedged_queries_total", "Hedged queries", ("outcome",)
+        )
+        self.families: list[Counter | Gauge | Histogram] = [
+            self.messages_read,
+            self.bytes_read,
+            self.parse_seconds,
+            self.message_buffer_depth,
+            self.control_requests,
+            self.control_errors,
+            self.control_request_seconds,
+            self.callback_seconds,
+            self.mcp_tool_seconds,
+            self.process_spawn_seconds,
+            self.process_exits,
+            self.process_close_seconds,
+            self.query_seconds,
+            self.hedged_queries,
+        ]
+
+    def session(self) -> "SessionMetrics":
+        """Recorder for one CLI session; used by the SDK internally."""
+        return SessionMetrics(self)
+
+    def remove_session(self, session_id: str) -> None:
+        """Forget every series labeled with a session."""
+        for family in self.families:
+            if "session" in family.labelnames:
+                family.remove("session", session_id)
+
+    def to_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Samples by metric name, each with its labels and value.
+
+        Histogram samples have `count`, `sum` and cumulative `buckets`
+        keyed by upper bound instead of `value`.
+        """
+        result: dict[str, list[dict[str, Any]]] = {}
+        for family in self.families:
+            samples = []
+            for labels, value in family.samples():
+                sample: dict[str, Any] = {
+                    "labels": dict(zip(family.labelnames, labels, strict=True))
+                }
+                if isinstance(value, dict):
+                    sample.update(value)
+                else:
+                    sample["value"] = value
+                samples.append(sample)
+            result[family.name] = samples
+        return result
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for family in self.families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.samples():
+                pairs = list(zip(family.labelnames, labels, strict=True))
+                if isinstance(value, dict):
+                    for bound, count in value["buckets"].items():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(
+                            f"{family.name}_bucket{_labels([*pairs, ('le', le)])} {count}"
+                        )
+                    lines.append(f"{family.name}_sum{_labels(pairs)} {value['sum']!r}")
+                    lines.append(
+                        f"{family.name}_count{_labels(pairs)} {value['count']}"
+                    )
+                else:
+                    lines.append(f"{family.name}{_labels(pairs)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class SessionMetrics:
+    """Records into a MetricsRegistry on behalf of one CLI session.
+
+    Holds the session label, which the SDK sets once the CLI reports its
+    session id.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.session_id = ""
+        self._tracked: list[int] = []
+
+    def set_session(self, session_id: str) -> None:
+        if self.registry.per_session:
+            self.session_id = session_id
+
+    def message_read(self, message_type: str) -> None:
+        self.registry.messages_read.inc(self.session_id, message_type)
+
+    def bytes_read(self, size: int) -> None:
+        self.registry.bytes_read.inc(self.session_id, amount=size)
+
+    def parsed(self, stage: str, seconds: float) -> None:
+        self.registry.parse_seconds.observe(seconds, self.session_id, stage)
+
+    def control_request(
+        self, subtype: str, direction: str, seconds: float, failed: bool
+    ) -> None:
+        registry = self.registry
+        registry.control_requests.inc(self.session_id, subtype, direction)
+        if failed:
+            registry.control_errors.inc(self.session_id, subtype, direction)
+        histogram = (
+            registry.control_request_seconds
+            if direction == "outgoing"
+            else registry.callback_seconds
+        )
+        histogram.observe(seconds, self.session_id, subtype)
+
+    def mcp_tool_call(self, server: str, tool: str, seconds: float) -> None:
+        self.registry.mcp_tool_seconds.observe(seconds, self.session_id, server, tool)
+
+    def process_spawned(self, seconds: float) -> None:
+        self.registry.process_spawn_seconds.observe(seconds)
+
+    def process_exited(self, exit_code: int | None) -> None:
+        self.registry.process_exits.inc(str(exit_code))
+
+    def process_closed(self, seconds: float, outcome: str) -> None:
+        self.registry.process_close_seconds.observe(seconds, outcome)
+
+    def query_finished(self, seconds: float, subtype: str) -> None:
+        self.registry.query_seconds.observe(seconds, subtype)
+
+    def track_buffer(self, depth: Callable[[], float]) -> None:
+        """Report the message buffer depth whenever metrics are exported."""
+        self._tracked.append(
+            self.registry.message_buffer_depth.track(lambda: (self.session_id,), depth)
+        )
+
+    def close(self) -> None:
+        """Stop reading tracked gauges; recorded series are kept."""
+        for key in self._tracked:
+            self.registry.message_buffer_depth.untrack(key)
+        self._tracked.clear()
@@ -0,0 +1,412 @@
+"""Pool of connected ClaudeSDKClient instances for serving many requests."""
+
+import hashlib
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field, fields, is_dataclass
+from pathlib import PurePath
+from typing import Any
+
+import anyio
+from anyio.abc import TaskGroup
+
+from ._errors import CLIConnectionError
+from ._internal.transport import Transport
+from .client import ClaudeSDKClient
+from .types import ClaudeAgentOptions
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value: Any) -> Any:
+    """Reduce a value to a hashable, repr-stable form for fingerprinting."""
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    if isinstance(value, PurePath):
+        return str(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return (
+            type(value).__qualname__,
+            tuple((f.name, _freeze(getattr(value, f.name))) for f in fields(value)),
+        )
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set | frozenset):
+        return tuple(sorted(repr(_freeze(item)) for item in value))
+    # Callbacks, SDK MCP servers, streams: only the same object is equivalent
+    return (type(value).__qualname__, id(value))
+
+
+def options_fingerprint(options: ClaudeAgentOptions) -> str:
+    """Key identifying options that can share pooled clients.
+
+    Plain values are compared by content; callbacks and other objects by
+    identity, so options built with the same hook functions match.
+    """
+    return hashlib.sha256(repr(_freeze(options)).encode()).hexdigest()[:16]
+
+
+def _is_healthy(client: ClaudeSDKClient) -> bool:
+    query = client._query
+    transport = client._transport
+    return (
+        query is not None
+        and transport is not None
+        and transport.is_ready()
+        and not query.reader_finished
+    )
+
+
+@dataclass
+class _PooledClient:
+    key: str
+    client: ClaudeSDKClient
+    # connecting -> idle -> leased -> closing -> closed
+    state: str = "connecting"
+    idle_since: float = 0.0
+    error: Exception | None = None
+    release: anyio.Event = field(default_factory=anyio.Event)
+
+
+class ClientPool:
+    """Connected ClaudeSDKClient instances, leased to one request at a time.
+
+    Connecting a client costs a CLI process spawn plus the initialize
+    handshake. The pool does that ahead of time: it keeps up to `min_idle`
+    connected clients ready for its default options and for each set of
+    options passed to prewarm(), and hands one out per lease. Leases with
+    other options (compared with options_fingerprint()) connect a client on
+    demand and are not kept warm.
+
+    A client is never shared between leases, so every lease starts a clean
+    conversation: when a lease ends its CLI process is retired and a
+    replacement is connected in the background. To have each lease continue
+    from a common conversation instead, lease with options that set
+    `resume=<session id>` and `fork_session=True`; each client then holds
+    its own fork.
+
+    Idle clients are checked every `health_check_interval` seconds and
+    evicted if their CLI process has exited. A lease that ends with an
+    exception evicts its client as well.
+
+    The pool must be used as an async context manager, which owns the tasks
+    that connect and disconnect clients; leases may be taken from any task
+    inside it.
+
+    Example:
+        ```python
+        async with ClientPool(ClaudeAgentOptions(model="sonnet"), max_size=16) as pool:
+            await pool.prewarm(count=4)
+
+            async def handle(prompt: str) -> str:
+                async with pool.lease() as client:
+                    await client.query(prompt)
+                    async for message in client.receive_response():
+                        if isinstance(message, ResultMessage):
+                            return message.result or ""
+                return ""
+        ```
+    """
+
+    def __init__(
+        self,
+        options: ClaudeAgentOptions | None = None,
+        *,
+        max_size: int = 8,
+        min_idle: int = 1,
+        idle_timeout: float | None = None,
+        health_check_interval: float = 5.0,
+        transport_factory: Callable[[ClaudeAgentOptions], Transport] | None = None,
+    ):
+        """Initialize the pool.
+
+        Args:
+            options: Default options for leases that don't pass their own
+            max_size: Maximum number of clients, connected or connecting,
+                      across all options
+            min_idle: Connected clients to keep ready for the default options,
+                      once leased or prewarmed, and for prewarmed options
+            idle_timeout: Evict clients that sat idle this many seconds
+            health_check_interval: Seconds between checks of idle clients
+            transport_factory: Optional callable returning a fresh transport
+                               for each client, instead of the subprocess
+                               CLI transport
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_idle < 0:
+            raise ValueError("min_idle must not be negative")
+        if health_check_interval <= 0:
+            raise ValueError("health_check_interval must be positive")
+        self.options = options or ClaudeAgentOptions()
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._transport_factory = transport_factory
+
+        self._clients: list[_PooledClient] = []
+        # Options whose clients are replaced as they are used up
+        self._warm: dict[str, ClaudeAgentOptions] = {
+            options_fingerprint(self.options): self.options
+        }
+        self._tg: TaskGroup | None = None
+        self._changed: anyio.Event | None = None
+        self._closing = False
+
+        self._leases = 0
+        self._hits = 0
+        self._misses = 0
+        self._spawned = 0
+        self._evicted = 0
+        self._errors = 0
+        self._max_close_seconds = 0.0
+
+    async def __aenter__(self) -> "ClientPool":
+        if self._tg is not None:
+            raise RuntimeError("ClientPool is already open")
+        self._closing = False
+        self._changed = anyio.Event()
+        self._tg = anyio.create_task_group()
+        await self._tg.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> bool:
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        """Disconnect every client, including those still leased."""
+        if self._tg is None:
+            return
+        self._closing = True
+        for pooled in self._clients:
+            pooled.state = "closing"
+            pooled.release.set()
+        self._notify()
+        tg, self._tg = self._tg, None
+        with suppress(anyio.get_cancelled_exc_class()):
+            await tg.__aexit__(None, None, None)
+
+    @asynccontextmanager
+    async def lease(
+        self, options: ClaudeAgentOptions | None = None
+    ) -> AsyncIterator[ClaudeSDKClient]:
+        """Lease a connected client for the duration of the block.
+
+        Waits for a client if the pool is at max_size. Raises the connection
+        error if a client started for this lease fails to connect.
+
+        Args:
+            options: Options for the client, or None for the pool's default
+        """
+        options = options or self.options
+        key = options_fingerprint(options)
+        pooled = await self._acquire(key, options)
+        pooled.state = "leased"
+        self._leases += 1
+        try:
+            yield pooled.client
+        except Exception:
+            self._errors += 1
+            self._evicted += 1
+            raise
+        finally:
+            self._retire(pooled)
+            self._replenish(key)
+
+    async def prewarm(
+        self, options: ClaudeAgentOptions | None = None, count: int | None = None
+    ) -> None:
+        """Connect clients ahead of the first lease and wait until they're ready.
+
+        Args:
+            options: Options to prewarm, or None for the pool's default
+            count: Number of idle clients to have ready (defaults to min_idle)
+        """
+        options = options or self.options
+        key = options_fingerprint(options)
+        self._warm[key] = options
+        started = [
+            self._spawn(key, options) for _ in range(self._shortfall(key, count))
+        ]
+        while any(pooled.state == "connecting" for pooled in started):
+            await self._wait_for_change()
+        for pooled in started:
+            if pooled.error is not None:
+                raise pooled.error
+
+    def stats(self) -> dict[str, Any]:
+        """Pool size and lease counters.
+
+        `utilization` is the fraction of max_size currently leased. `hits`
+        counts leases served by an already connected client, `misses` those
+        that waited for one to connect. `closing` clients are being
+        disconnected and don't count toward max_size; `max_close_seconds` is
+        the longest disconnect so far.
+        """
+        states = [pooled.state for pooled in self._clients]
+        leased = states.count("leased")
+        return {
+            "size": len(self._live()),
+            "max_size": self.max_size,
+            "idle": states.count("idle"),
+            "leased": leased,
+            "connecting": states.count("connecting"),
+            "closing": states.count("closing"),
+            "utilization": leased / self.max_size,
+            "leases": self._leases,
+            "hits": self._hits,
+            "misses": self._misses,
+            "spawned": self._spawned,
+            "evicted": self._evicted,
+            "errors": self._errors,
+            "max_close_seconds": self._max_close_seconds,
+        }
+
+    async def _acquire(self, key: str, options: ClaudeAgentOptions) -> _PooledClient:
+        started: _PooledClient | None = None
+        waited = False
+        while True:
+            pooled = self._take_idle(key)
+            if pooled is not None:
+                if waited:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+                return pooled
+            if started is not None and started.error is not None:
+                raise started.error
+            # Start a client unless one started for this lease is still coming
+            if (started is None or started.state != "connecting") and self._make_room():
+                started = self._spawn(key, options)
+            waited = True
+            await self._wait_for_change()
+
+    def _take_idle(self, key: str) -> _PooledClient | None:
+        for pooled in self._clients:
+            if pooled.key != key or pooled.state != "idle":
+                continue
+            if _is_healthy(pooled.client):
+                return pooled
+            self._evict(pooled, "CLI process exited")
+        return None
+
+    def _live(self) -> list[_PooledClient]:
+        return [
+            pooled
+            for pooled in self._clients
+            if pooled.state in ("connecting", "idle", "leased")
+        ]
+
+    def _make_room(self) -> bool:
+        """Check there is room for one more client, evicting an idle one if needed."""
+        if self._tg is None or self._closing:
+            raise CLIConnectionError("ClientPool is closed")
+        if len(self._live()) < self.max_size:
+            return True
+        idle = [pooled for pooled in self._clients if pooled.state == "idle"]
+        if not idle:
+            return False
+        self._evict(min(idle, key=lambda pooled: pooled.idle_since), "pool is full")
+        return True
+
+    def _shortfall(self, key: str, count: int | None = None) -> int:
+        wanted = self.min_idle if count is None else count
+        ready = sum(
+            1
+            for pooled in self._clients
+            if pooled.key == key and pooled.state in ("connecting", "idle")
+        )
+        room = self.max_size - len(self._live())
+        return max(min(wanted - ready, room), 0)
+
+    def _replenish(self, key: str) -> None:
+        options = self._warm.get(key)
+        if options is None or self._tg is None or self._closing:
+            return
+        for _ in range(self._shortfall(key)):
+            self._spawn(key, options)
+
+    def _spawn(self, key: str, options: ClaudeAgentOptions) -> _PooledClient:
+        if self._tg is None or self._closing:
+            raise CLIConnectionError("ClientPool is closed")
+        transport = (
+            self._transport_factory(options) if self._transport_factory else None
+        )
+        pooled = _PooledClient(key, ClaudeSDKClient(options, transport=transport))
+        self._clients.append(pooled)
+        self._spawned += 1
+        self._tg.start_soon(self._keep, pooled)
+        return pooled
+
+    async def _keep(self, pooled: _PooledClient) -> None:
+        """Connect a client, watch it while idle, and disconnect it when released.
+
+        Runs in the pool's task group, so a client is connected and
+        disconnected by the same task whichever task leases it.
+        """
+        client = pooled.client
+        try:
+            try:
+                await client.connect()
+            except Exception as e:
+                logger.warning(f"Pooled client failed to connect: {e}")
+                pooled.error = e
+                self._errors += 1
+                return
+            if pooled.state == "connecting":
+                pooled.state = "idle"
+                pooled.idle_since = anyio.current_time()
+                self._notify()
+
+            while not pooled.release.is_set():
+                with anyio.move_on_after(self.health_check_interval):
+                    await pooled.release.wait()
+                if pooled.state != "idle":
+                    continue
+                if not _is_healthy(client):
+                    self._evict(pooled, "CLI process exited")
+                elif (
+                    self.idle_timeout is not None
+                    and anyio.current_time() - pooled.idle_since > self.idle_timeout
+                ):
+                    self._evict(pooled, "idle timeout")
+        finally:
+            # Not shielded: the client's task group must be exited from the
+            # scope that entered it. Each client disconnects in its own task,
+            # and the transport bounds how long stopping its CLI can take.
+            started = anyio.current_time()
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.debug(f"Error disconnecting pooled client: {e}")
+            self._max_close_seconds = max(
+                self._max_close_seconds, anyio.current_time() - started
+            )
+            pooled.state = "closed"
+            self._clients.remove(pooled)
+            self._notify()
+
+    def _evict(self, pooled: _PooledClient, reason: str) -> None:
+        logger.debug(f"Evicting pooled client: {reason}")
+        self._evicted += 1
+        self._retire(pooled)
+
+    def _retire(self, pooled: _PooledClient) -> None:
+        if pooled.state != "closed":
+            pooled.state = "closing"
+        pooled.release.set()
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = anyio.Event()
+
+    async def _wait_for_change(self) -> None:
+        assert self._changed is not None
+        await self._changed.wait()
@@ -0,0 +1,116 @@
+"""Profiling hooks around the SDK's internal stages."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Stages a Profiler is called around, and what their info dict holds
+STAGES = {
+    # A chunk read from the CLI's stdout, including the wait for it (bytes)
+    "transport.read": ("bytes",),
+    # A write to the CLI's stdin (bytes)
+    "transport.write": ("bytes",),
+    # One attempt to decode the buffered output as JSON; speculative
+    # decodes of a partial message have complete=False (bytes, complete)
+    "json.decode": ("bytes", "complete"),
+    # Building a Message from a decoded dict (type)
+    "parse_message": ("type",),
+    # A control request sent to the CLI, until its response (subtype)
+    "control.send": ("subtype",),
+    # A control request from the CLI, until it is answered (subtype)
+    "control.receive": ("subtype",),
+    # A permission or hook callback (subtype, plus tool_name or callback_id)
+    "callback": ("subtype",),
+    # An SDK MCP request routed to an in-process server (server, method)
+    "mcp.dispatch": ("server", "method"),
+}
+
+
+class Profiler:
+    """Hooks called before and after each internal stage of the SDK.
+
+    Pass an instance as `ClaudeAgentOptions(profiler=...)` and override
+    before() and after() to plug in timers, samplers or allocation
+    snapshots. When no profiler is set, the SDK does not call into this
+    module at all.
+
+    before() returns a token that is passed back to after(), so stages
+    that overlap (concurrent callbacks, reads during a control request)
+    can be told apart. `info` is the same dict in both calls; the SDK may
+    fill in fields, such as the size of a read, before calling after().
+    See STAGES for the stage names and their info fields.
+
+    Hooks run synchronously on the event loop, inside the stage they
+    measure, so they should be quick. Exceptions from them propagate.
+    """
+
+    def before(self, stage: str, info: dict[str, Any]) -> Any:
+        """Called when a stage starts; the result is passed to after()."""
+        return None
+
+    def after(
+        self,
+        stage: str,
+        info: dict[str, Any],
+        token: Any,
+        error: BaseException | None,
+    ) -> None:
+        """Called when a stage ends, with the exception that ended it, if any."""
+
+    @contextmanager
+    def stage(self, stage: str, **info: Any) -> Iterator[dict[str, Any]]:
+        """Run before() and after() around a block; yields the info dict."""
+        token = self.before(stage, info)
+        try:
+            yield info
+        except BaseException as e:
+            self.after(stage, info, token, e)
+            raise
+        self.after(stage, info, token, None)
+
+
+class StageTimer(Profiler):
+    """Profiler that totals the wall time spent in each stage.
+
+    Example:
+        ```python
+        timer = StageTimer()
+        async for message in query(prompt="...", options=ClaudeAgentOptions(profiler=timer)):
+            ...
+        print(timer.stats()["json.decode"])
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str, list[float]] = {}
+
+    def before(self, stage: str, info: dict[str, Any]) -> float:
+        return time.perf_counter()
+
+    def after(
+        self,
+        stage: str,
+        info: dict[str, Any],
+        token: float,
+        error: BaseException | None,
+    ) -> None:
+        elapsed = time.perf_counter() - token
+        stats = self._stats.get(stage)
+        if stats is None:
+            stats = self._stats[stage] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        if error is not None:
+            stats[3] += 1
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Count, total and max seconds, and errors, by stage."""
+        return {
+            stage: {"count": count, "total": total, "max": longest, "errors": errors}
+            for stage, (count, total, longest, errors) in self._stats.items()
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
@@ -5,8 +5,9 @@ from collections.abc import AsyncIterable, AsyncIterator
 from typing import Any
 
 from ._internal.client import InternalClient
+from ._internal.hedge import hedged_query
 from ._internal.transport import Transport
-from .types import ClaudeAgentOptions, Message
+from .types import ClaudeAgentOptions, Message, RawMessage
 
 
 async def query(
@@ -96,6 +97,22 @@ async def query(
             print(message)
         ```
 
+    Example - Hedged against slow turns:
+        ```python
+        # Spend up to 50 cents in total on second attempts of queries
+        # that take longer than 95% of earlier ones. Both attempts run
+        # tools, so only hedge queries limited to read-only tools. Messages
+        # arrive together once the result is in.
+        hedge = HedgePolicy(max_extra_cost_usd=0.5, percentile=0.95)
+        options = ClaudeAgentOptions(
+            allowed_tools=["Read", "Grep", "Glob"],
+            metrics=MetricsRegistry(),
+            hedge=hedge,
+        )
+        async for message in query(prompt="Where is retry logic?", options=options):
+            print(message)
+        ```
+
     Example - With custom transport:
         ```python
         from claude_agent_sdk import query, Transport
@@ -118,9 +135,58 @@ async def query(
 
     os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py"
 
+    if options.hedge is not None and isinstance(prompt, str) and transport is None:
+        async for message in hedged_query(prompt, options, options.hedge):
+            yield message
+        return
+
     client = InternalClient()
 
     async for message in client.process_query(
         prompt=prompt, options=options, transport=transport
     ):
         yield message
+
+
+async def query_raw(
+    *,
+    prompt: str | AsyncIterable[dict[str, Any]],
+    options: ClaudeAgentOptions | None = None,
+    transport: Transport | None = None,
+) -> AsyncIterator[RawMessage]:
+    """
+    Query Claude Code, yielding messages as undecoded bytes.
+
+    Like query(), but each message is a RawMessage holding the line exactly
+    as the CLI wrote it, along with its `type` and `session_id` read without
+    decoding the rest. Use this to forward messages unchanged, e.g. from a
+    gateway to browsers. Control messages (permission callbacks, hooks, SDK
+    MCP servers) are still handled internally and never yielded.
+
+    Args:
+        prompt: The prompt to send to Claude, as for query()
+        options: Optional configuration (defaults to ClaudeAgentOptions() if None)
+        transport: Optional transport implementation, as for query()
+
+    Yields:
+        Undecoded messages from the conversation
+
+    Example:
+        ```python
+        async for raw in query_raw(prompt="Hello"):
+            await websocket.send_bytes(raw.data)
+            if raw.type == "result":
+                cost = raw.json()["total_cost_usd"]
+        ```
+    """
+    if options is None:
+        options = ClaudeAgentOptions()
+
+    os.environ["CLAUDE_CODE_ENTRYPOINT"] = "sdk-py"
+
+    client = InternalClient()
+
+    async for message in client.process_query_raw(
+        prompt=prompt, options=options, transport=transport
+    ):
+        yield message
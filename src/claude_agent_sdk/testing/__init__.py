@@ -0,0 +1,56 @@
+"""Helpers for testing and load testing code built on the SDK offline.
+
+The fake CLI in this package stands in for the Claude Code binary: point
+`cli_path` at `fake_cli_path()` and describe the answers with a
+FakeCLIWorkload.
+
+Example:
+    ```python
+    from claude_agent_sdk import ClaudeAgentOptions, query
+    from claude_agent_sdk.testing import FakeCLIWorkload, fake_cli_path
+
+    workload = FakeCLIWorkload(text_bytes=2000, tool_calls=1.5, tool_latency=0.05)
+    options = ClaudeAgentOptions(cli_path=fake_cli_path(), env=workload.env())
+    async for message in query(prompt="Hello", options=options):
+        ...
+    ```
+"""
+
+import atexit
+import shlex
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from .fake_cli import FakeCLIWorkload
+
+__all__ = ["FakeCLIWorkload", "fake_cli_path"]
+
+_PACKAGE_ROOT = Path(__file__).resolve().parent.parent.parent
+
+_launcher: Path | None = None
+
+
+def fake_cli_path() -> Path:
+    """Path of an executable that runs the fake CLI with this interpreter.
+
+    The launcher is a small shell script that runs
+    `python -m claude_agent_sdk.testing`, written once per process to a
+    private temp directory (mode 0700) that is removed at exit, so no
+    other user can swap it out. POSIX only.
+    """
+    global _launcher
+    if _launcher is None:
+        directory = Path(tempfile.mkdtemp(prefix="claude-fake-cli-"))
+        atexit.register(shutil.rmtree, directory, True)
+        path = directory / "claude"
+        path.write_text(
+            "#!/bin/sh\n"
+            f"PYTHONPATH={shlex.quote(str(_PACKAGE_ROOT))}${{PYTHONPATH:+:$PYTHONPATH}}"
+            f" exec {shlex.quote(sys.executable)}"
+            ' -m claude_agent_sdk.testing "$@"\n'
+        )
+        path.chmod(0o700)
+        _launcher = path
+    return _launcher
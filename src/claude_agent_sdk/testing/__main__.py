@@ -0,0 +1,7 @@
+"""Run the fake CLI: `python -m claude_agent_sdk.testing [CLI flags]`."""
+
+import sys
+
+from .fake_cli import main
+
+sys.exit(main())
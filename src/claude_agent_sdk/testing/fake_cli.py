@@ -0,0 +1,727 @@
+"""Pure-Python stand-in for the Claude Code CLI.
+
+Accepts the argv that SubprocessCLITransport builds and speaks the same
+stream-json protocol on stdin and stdout, without a model or network
+access. Each turn answers with a workload described by FakeCLIWorkload:
+tool calls (with PreToolUse/PostToolUse hooks, can_use_tool permission
+requests and SDK MCP tool calls where configured), a text answer streamed
+as partial-message events when `--include-partial-messages` is given, and
+a result message.
+
+Run it with `python -m claude_agent_sdk.testing`, or point
+`cli_path` at `fake_cli_path()`. The workload is read from the
+CLAUDE_FAKE_CLI_WORKLOAD environment variable as JSON.
+
+Only the standard library is used, so the fake starts about as fast as a
+Python interpreter can.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import IO, Any
+
+WORKLOAD_ENV = "CLAUDE_FAKE_CLI_WORKLOAD"
+
+VERSION = "2.0.50 (Claude Code, fake)"
+
+MODEL = "fake-model"
+
+# Flags _build_command emits without a value; every other flag takes one
+_BOOLEAN_FLAGS = frozenset(
+    {
+        "--verbose",
+        "--continue",
+        "--include-partial-messages",
+        "--fork-session",
+        "--print",
+    }
+)
+
+_FILLER = "The quick brown fox jumps over the lazy dog. "
+
+
+@dataclass
+class FakeCLIWorkload:
+    """What the fake CLI sends back for each turn.
+
+    Sizes are in characters of ASCII text. Latencies are in seconds and
+    each one is varied by up to `jitter` (a fraction, 0.1 = ±10%).
+
+    Attributes:
+        text_bytes: Length of the answer text, or None to answer
+            "Echo: <prompt>"
+        delta_bytes: Characters of text per text_delta stream event
+        first_token_latency: Pause before the first answer event
+        delta_interval: Pause between text_delta events
+        tool_calls: Tool calls per turn; the fractional part is the
+            probability of one more (0.5 = a tool call every other turn
+            on average)
+        tool_name: Tool to call. A name of the form mcp__<server>__<tool>
+            naming an SDK MCP server is called through the SDK.
+        tool_input_bytes: Size of the generated tool input
+        tool_result_bytes: Size of the result of a non-MCP tool call
+        tool_latency: Time a non-MCP tool call takes
+        jitter: Relative random variation of every latency
+        seed: Seed for the random choices, for repeatable runs
+        cost_usd: total_cost_usd reported for each turn
+        script: Explicit turns, used in order and then repeated, instead
+            of generated ones. Each is a dict with optional keys "text",
+            "tools" (a list of {"name", "input", "result"} dicts),
+            "structured_output" and "cost_usd". Latencies still apply.
+        hang_on_exit: Ignore SIGTERM and keep running once input is done,
+            like a wedged CLI that only SIGKILL stops
+        crash_on_turn: Exit with status 1 in the middle of this turn
+            (counting from 1), unless started with --resume, like a CLI
+            that crashes and then recovers when restarted
+        stall_once: Path of a marker file. The first process to create it
+            pauses `stall_seconds` more before its first answer, like a
+            rare slow turn; processes that find it already there don't
+        stall_seconds: How long the stall_once process stalls
+    """
+
+    text_bytes: int | None = None
+    delta_bytes: int = 16
+    first_token_latency: float = 0.0
+    delta_interval: float = 0.0
+    tool_calls: float = 0.0
+    tool_name: str = "Read"
+    tool_input_bytes: int = 64
+    tool_result_bytes: int = 256
+    tool_latency: float = 0.0
+    jitter: float = 0.0
+    seed: int | None = None
+    cost_usd: float = 0.001
+    script: list[dict[str, Any]] | None = None
+    hang_on_exit: bool = False
+    crash_on_turn: int | None = None
+    stall_once: str | None = None
+    stall_seconds: float = 30.0
+
+    def __post_init__(self) -> None:
+        if self.delta_bytes < 1:
+            raise ValueError("delta_bytes must be at least 1")
+        if self.tool_calls < 0:
+            raise ValueError("tool_calls must not be negative")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def env(self) -> dict[str, str]:
+        """Environment variables that hand this workload to the fake CLI.
+
+        Pass them as `ClaudeAgentOptions(env=...)`.
+        """
+        return {WORKLOAD_ENV: json.dumps(asdict(self))}
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] | None = None) -> "FakeCLIWorkload":
+        value = (os.environ if environ is None else environ).get(WORKLOAD_ENV)
+        if not value:
+            return cls()
+        data = json.loads(value)
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def _filler(size: int) -> str:
+    repeats = size // len(_FILLER) + 1
+    return (_FILLER * repeats)[:size]
+
+
+@dataclass
+class _Args:
+    streaming: bool = False
+    prompt: str | None = None
+    model: str = MODEL
+    partial_messages: bool = False
+    permission_prompt_tool: str | None = None
+    permission_mode: str = "default"
+    resume: str | None = None
+    fork_session: bool = False
+    sdk_mcp_servers: list[str] = field(default_factory=list)
+    tools: list[str] = field(default_factory=list)
+
+
+def parse_args(argv: list[str]) -> _Args:
+    """Read the flags the fake acts on; anything else is accepted and ignored."""
+    args = _Args()
+    values: dict[str, str] = {}
+    flags: set[str] = set()
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--":
+            args.prompt = " ".join(argv[i + 1 :])
+            break
+        if arg in _BOOLEAN_FLAGS:
+            flags.add(arg)
+        elif arg.startswith("--"):
+            # extra_args may add unknown boolean flags: only take a value
+            # that doesn't look like another flag
+            if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
+                values[arg] = argv[i + 1]
+                i += 1
+            else:
+                flags.add(arg)
+        i += 1
+
+    args.streaming = values.get("--input-format") == "stream-json"
+    args.model = values.get("--model") or MODEL
+    args.partial_messages = "--include-partial-messages" in flags
+    args.permission_prompt_tool = values.get("--permission-prompt-tool")
+    args.permission_mode = values.get("--permission-mode", "default")
+    args.resume = values.get("--resume")
+    args.fork_session = "--fork-session" in flags
+    if values.get("--allowedTools"):
+        args.tools = values["--allowedTools"].split(",")
+
+    mcp_config = values.get("--mcp-config")
+    if mcp_config and mcp_config.lstrip().startswith("{"):
+        servers = json.loads(mcp_config).get("mcpServers", {})
+        args.sdk_mcp_servers = [
+            name for name, config in servers.items() if config.get("type") == "sdk"
+        ]
+    return args
+
+
+class _TurnInterruptedError(Exception):
+    """The turn was stopped by an interrupt or a deny with interrupt."""
+
+
+class FakeCLI:
+    """One fake CLI process: reads stdin, answers turns, writes stdout."""
+
+    def __init__(self, args: _Args, workload: FakeCLIWorkload, out: IO[str]):
+        self.args = args
+        self.workload = workload
+        self._out = out
+        self._rng = random.Random(workload.seed)
+        if args.resume and not args.fork_session:
+            self.session_id = args.resume
+        else:
+            self.session_id = str(uuid.uuid4())
+        self._hooks: dict[str, list[dict[str, Any]]] = {}
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._next_request = 0
+        self._next_tool_use = 0
+        self._turns = 0
+        self._turn_task: asyncio.Task[None] | None = None
+
+    # Output
+
+    def emit(self, message: dict[str, Any]) -> None:
+        self._out.write(json.dumps(message) + "\n")
+
+    def flush(self) -> None:
+        self._out.flush()
+
+    async def pause(self, seconds: float) -> None:
+        """Flush what was emitted, then wait `seconds` varied by the jitter."""
+        self.flush()
+        jitter = self.workload.jitter
+        if jitter:
+            seconds *= 1 + self._rng.uniform(-jitter, jitter)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def _stream_event(self, event: dict[str, Any]) -> None:
+        self.emit(
+            {
+                "type": "stream_event",
+                "uuid": str(uuid.uuid4()),
+                "session_id": self.session_id,
+                "parent_tool_use_id": None,
+                "event": event,
+            }
+        )
+
+    async def _assistant(self, block: dict[str, Any]) -> None:
+        """Emit one assistant message, streamed first if partial messages are on."""
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        if self.args.partial_messages:
+            await self._stream_block(message_id, block)
+        self.emit(
+            {
+                "type": "assistant",
+                "message": {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": self.args.model,
+                    "content": [block],
+                },
+                "parent_tool_use_id": None,
+                "session_id": self.session_id,
+            }
+        )
+
+    async def _stream_block(self, message_id: str, block: dict[str, Any]) -> None:
+        start: dict[str, Any]
+        step = self.workload.delta_bytes
+        if block["type"] == "text":
+            start = {"type": "text", "text": ""}
+            body, delta_type, key = block["text"], "text_delta", "text"
+        else:
+            start = {**block, "input": {}}
+            body = json.dumps(block["input"])
+            delta_type, key = "input_json_delta", "partial_json"
+
+        self._stream_event(
+            {
+                "type": "message_start",
+                "message": {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": self.args.model,
+                    "content": [],
+                },
+            }
+        )
+        self._stream_event(
+            {"type": "content_block_start", "index": 0, "content_block": start}
+        )
+        for offset in range(0, len(body), step):
+            if offset and self.workload.delta_interval:
+                await self.pause(self.workload.delta_interval)
+            self._stream_event(
+                {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": delta_type, key: body[offset : offset + step]},
+                }
+            )
+        self._stream_event({"type": "content_block_stop", "index": 0})
+        stop_reason = "tool_use" if block["type"] == "tool_use" else "end_turn"
+        self._stream_event(
+            {"type": "message_delta", "delta": {"stop_reason": stop_reason}}
+        )
+        self._stream_event({"type": "message_stop"})
+
+    # Control protocol
+
+    async def request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Send a control request to the SDK and wait for its response."""
+        self._next_request += 1
+        request_id = f"fake_req_{self._next_request}"
+        future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending[request_id] = future
+        self.emit(
+            {"type": "control_request", "request_id": request_id, "request": request}
+        )
+        self.flush()
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _respond(self, request_id: str, response: dict[str, Any]) -> None:
+        self.emit(
+            {
+                "type": "control_response",
+                "response": {
+                    "subtype": "success",
+                    "request_id": request_id,
+                    "response": response,
+                },
+            }
+        )
+        self.flush()
+
+    def _respond_error(self, request_id: str, error: str) -> None:
+        self.emit(
+            {
+                "type": "control_response",
+                "response": {
+                    "subtype": "error",
+                    "request_id": request_id,
+                    "error": error,
+                },
+            }
+        )
+        self.flush()
+
+    def _handle_control_request(self, message: dict[str, Any]) -> None:
+        request_id = message["request_id"]
+        request = message["request"]
+        subtype = request.get("subtype")
+        if subtype == "initialize":
+            self._hooks = request.get("hooks") or {}
+            self._respond(
+                request_id,
+                {
+                    "commands": [],
+                    "output_style": "default",
+                    "available_output_styles": ["default"],
+                },
+            )
+        elif subtype == "interrupt":
+            if self._turn_task is not None and not self._turn_task.done():
+                self._turn_task.cancel()
+            self._respond(request_id, {})
+        elif subtype == "set_permission_mode":
+            self.args.permission_mode = request.get("mode", "default")
+            self._respond(request_id, {})
+        elif subtype == "set_model":
+            self.args.model = request.get("model") or MODEL
+            self._respond(request_id, {})
+        else:
+            self._respond_error(request_id, f"Unsupported control request: {subtype}")
+
+    def _handle_control_response(self, message: dict[str, Any]) -> None:
+        response = message.get("response", {})
+        future = self._pending.get(response.get("request_id"))
+        if future is None or future.done():
+            return
+        if response.get("subtype") == "error":
+            future.set_exception(RuntimeError(response.get("error", "")))
+        else:
+            future.set_result(response.get("response") or {})
+
+    # Hooks and tools
+
+    def _hook_ids(self, event: str, tool_name: str | None) -> list[str]:
+        ids: list[str] = []
+        for matcher in self._hooks.get(event, []):
+            pattern = matcher.get("matcher")
+            if (
+                tool_name is None
+                or not pattern
+                or pattern == "*"
+                or re.fullmatch(pattern, tool_name)
+            ):
+                ids.extend(matcher.get("hookCallbackIds", []))
+        return ids
+
+    async def _run_hooks(
+        self,
+        event: str,
+        hook_input: dict[str, Any],
+        tool_name: str | None = None,
+        tool_use_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        outputs = []
+        for callback_id in self._hook_ids(event, tool_name):
+            outputs.append(
+                await self.request(
+                    {
+                        "subtype": "hook_callback",
+                        "callback_id": callback_id,
+                        "input": {
+                            "hook_event_name": event,
+                            "session_id": self.session_id,
+                            "transcript_path": "",
+                            "cwd": str(Path.cwd()),
+                            **hook_input,
+                        },
+                        "tool_use_id": tool_use_id,
+                    }
+                )
+            )
+        return outputs
+
+    def _hook_input(self) -> dict[str, Any]:
+        return {"permission_mode": self.args.permission_mode}
+
+    async def _call_tool(
+        self, name: str, tool_input: dict[str, Any], result: str | None
+    ) -> tuple[Any, bool]:
+        """Run a tool; returns its result content and whether it is an error."""
+        parts = name.split("__")
+        if (
+            len(parts) == 3
+            and parts[0] == "mcp"
+            and parts[1] in self.args.sdk_mcp_servers
+        ):
+            response = await self.request(
+                {
+                    "subtype": "mcp_message",
+                    "server_name": parts[1],
+                    "message": {
+                        "jsonrpc": "2.0",
+                        "id": self._next_tool_use,
+                        "method": "tools/call",
+                        "params": {"name": parts[2], "arguments": tool_input},
+                    },
+                }
+            )
+            mcp_response = response.get("mcp_response", {})
+            if "error" in mcp_response:
+                return mcp_response["error"].get("message", ""), True
+            call_result = mcp_response.get("result", {})
+            return call_result.get("content", []), bool(call_result.get("isError"))
+        await self.pause(self.workload.tool_latency)
+        if result is None:
+            result = _filler(self.workload.tool_result_bytes)
+        return result, False
+
+    async def _tool_call(
+        self, name: str, tool_input: dict[str, Any], result: str | None
+    ) -> None:
+        self._next_tool_use += 1
+        tool_use_id = f"toolu_fake_{self._next_tool_use:06d}"
+        await self._assistant(
+            {"type": "tool_use", "id": tool_use_id, "name": name, "input": tool_input}
+        )
+
+        denied: str | None = None
+        for output in await self._run_hooks(
+            "PreToolUse",
+            {**self._hook_input(), "tool_name": name, "tool_input": tool_input},
+            name,
+            tool_use_id,
+        ):
+            if output.get("continue") is False:
+                raise _TurnInterruptedError
+            specific = output.get("hookSpecificOutput") or {}
+            if output.get("decision") == "block" or (
+                specific.get("permissionDecision") == "deny"
+            ):
+                denied = (
+                    output.get("reason")
+                    or specific.get("permissionDecisionReason")
+                    or "Blocked by hook"
+                )
+            if specific.get("updatedInput") is not None:
+                tool_input = specific["updatedInput"]
+
+        if denied is None and self.args.permission_prompt_tool == "stdio":
+            decision = await self.request(
+                {
+                    "subtype": "can_use_tool",
+                    "tool_name": name,
+                    "input": tool_input,
+                    "permission_suggestions": None,
+                    "blocked_path": None,
+                }
+            )
+            if decision.get("behavior") == "allow":
+                tool_input = decision.get("updatedInput") or tool_input
+            else:
+                if decision.get("interrupt"):
+                    raise _TurnInterruptedError
+                denied = decision.get("message") or "Permission denied"
+
+        if denied is not None:
+            content, is_error = denied, True
+        else:
+            content, is_error = await self._call_tool(name, tool_input, result)
+
+        self.emit(
+            {
+                "type": "user",
+                "message": {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "tool_result",
+                            "tool_use_id": tool_use_id,
+                            "content": content,
+                            "is_error": is_error,
+                        }
+                    ],
+                },
+                "parent_tool_use_id": None,
+                "session_id": self.session_id,
+            }
+        )
+        if denied is None:
+            await self._run_hooks(
+                "PostToolUse",
+                {
+                    **self._hook_input(),
+                    "tool_name": name,
+                    "tool_input": tool_input,
+                    "tool_response": content,
+                },
+                name,
+                tool_use_id,
+            )
+
+    # Turns
+
+    def _plan(self, prompt: str) -> dict[str, Any]:
+        """The turn to play: the next scripted one, or a generated one."""
+        workload = self.workload
+        if workload.script:
+            return workload.script[(self._turns - 1) % len(workload.script)]
+        count = int(workload.tool_calls)
+        if self._rng.random() < workload.tool_calls - count:
+            count += 1
+        tool_input = {"data": _filler(max(workload.tool_input_bytes - 12, 0))}
+        return {
+            "text": (
+                f"Echo: {prompt}"
+                if workload.text_bytes is None
+                else _filler(workload.text_bytes)
+            ),
+            "tools": [
+                {"name": workload.tool_name, "input": tool_input} for _ in range(count)
+            ],
+        }
+
+    def _result(
+        self, started: float, subtype: str, text: str | None, plan: dict[str, Any]
+    ) -> dict[str, Any]:
+        duration_ms = int((time.monotonic() - started) * 1000)
+        result: dict[str, Any] = {
+            "type": "result",
+            "subtype": subtype,
+            "duration_ms": duration_ms,
+            "duration_api_ms": duration_ms,
+            "is_error": subtype != "success",
+            "num_turns": self._turns,
+            "session_id": self.session_id,
+            "total_cost_usd": plan.get("cost_usd", self.workload.cost_usd),
+            "usage": {
+                "input_tokens": 0,
+                "output_tokens": len(text or "") // 4,
+            },
+            "result": text,
+        }
+        if plan.get("structured_output") is not None:
+            result["structured_output"] = plan["structured_output"]
+        return result
+
+    def _stall(self) -> float:
+        if self.workload.stall_once is None:
+            return 0.0
+        try:
+            os.close(os.open(self.workload.stall_once, os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return 0.0
+        return self.workload.stall_seconds
+
+    async def run_turn(self, prompt: str) -> None:
+        self._turns += 1
+        started = time.monotonic()
+        plan = self._plan(prompt)
+        self.emit(
+            {
+                "type": "system",
+                "subtype": "init",
+                "session_id": self.session_id,
+                "model": self.args.model,
+                "tools": self.args.tools,
+                "mcp_servers": [
+                    {"name": name, "status": "connected"}
+                    for name in self.args.sdk_mcp_servers
+                ],
+                "permissionMode": self.args.permission_mode,
+                "cwd": str(Path.cwd()),
+            }
+        )
+        try:
+            for output in await self._run_hooks(
+                "UserPromptSubmit", {**self._hook_input(), "prompt": prompt}
+            ):
+                if output.get("continue") is False or output.get("decision") == "block":
+                    raise _TurnInterruptedError
+            for tool in plan.get("tools", []):
+                await self._tool_call(
+                    tool["name"], tool.get("input", {}), tool.get("result")
+                )
+            if self._turns == self.workload.crash_on_turn and not self.args.resume:
+                self.flush()
+                os._exit(1)
+            await self.pause(self.workload.first_token_latency + self._stall())
+            text = plan.get("text", "")
+            await self._assistant({"type": "text", "text": text})
+            await self._run_hooks(
+                "Stop", {**self._hook_input(), "stop_hook_active": False}
+            )
+        except (_TurnInterruptedError, asyncio.CancelledError):
+            self.emit(self._result(started, "error_during_execution", None, plan))
+        else:
+            self.emit(self._result(started, "success", text, plan))
+        self.flush()
+
+    # Main loops
+
+    async def run(self, stdin: IO[str]) -> None:
+        if not self.args.streaming:
+            await self.run_turn(self.args.prompt or "")
+            return
+
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue[str | None] = asyncio.Queue()
+
+        def read_stdin() -> None:
+            for line in stdin:
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            loop.call_soon_threadsafe(lines.put_nowait, None)
+
+        threading.Thread(target=read_stdin, daemon=True).start()
+
+        prompts: asyncio.Queue[str | None] = asyncio.Queue()
+        turns = asyncio.create_task(self._run_turns(prompts))
+        while (line := await lines.get()) is not None:
+            line = line.strip()
+            if not line:
+                continue
+            message = json.loads(line)
+            kind = message.get("type")
+            if kind == "control_request":
+                self._handle_control_request(message)
+            elif kind == "control_response":
+                self._handle_control_response(message)
+            elif kind == "user":
+                prompts.put_nowait(_prompt_text(message["message"].get("content")))
+        # Input is closed: finish the queued turns, then exit
+        prompts.put_nowait(None)
+        for future in self._pending.values():
+            future.cancel()
+        await turns
+
+    async def _run_turns(self, prompts: "asyncio.Queue[str | None]") -> None:
+        while (prompt := await prompts.get()) is not None:
+            self._turn_task = asyncio.create_task(self.run_turn(prompt))
+            try:
+                await self._turn_task
+            except asyncio.CancelledError:
+                # Interrupted before the turn could report it
+                self.emit(
+                    self._result(time.monotonic(), "error_during_execution", None, {})
+                )
+                self.flush()
+            finally:
+                self._turn_task = None
+
+
+def _prompt_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "")
+            for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return ""
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv in (["-v"], ["--version"]):
+        print(VERSION)
+        return 0
+    args = parse_args(argv)
+    workload = FakeCLIWorkload.from_env()
+    if workload.hang_on_exit:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    fake = FakeCLI(args, workload, sys.stdout)
+    asyncio.run(fake.run(sys.stdin))
+    if workload.hang_on_exit:
+        threading.Event().wait()
+    return 0
@@ -0,0 +1,315 @@
+"""Per-turn latency traces, exportable as Chrome trace-event JSON."""
+
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class TraceEvent:
+    """A span (with `end`) or instant (without) in a turn.
+
+    Times are time.perf_counter() readings, in seconds.
+    """
+
+    name: str
+    category: str
+    start: float
+    end: float | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.end is None else self.end - self.start
+
+
+@dataclass
+class Turn:
+    """One prompt and everything up to its ResultMessage.
+
+    The first turn of a session also holds the session's spawn and
+    initialize spans, and control requests sent between turns (such as
+    set_model) are attached to the turn that follows them.
+    """
+
+    index: int
+    session_id: str
+    start: float
+    # Ordinal of the session in its tracer; the process id in Chrome traces
+    session: int = 0
+    end: float | None = None
+    events: list[TraceEvent] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.end is None else self.end - self.start
+
+    def mark(self, name: str) -> float | None:
+        """Seconds from the turn's start to an instant, if it was recorded."""
+        for event in self.events:
+            if event.name == name and event.end is None:
+                return event.start - self.start
+        return None
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        return self.mark("first_text_token")
+
+
+class TurnTracer:
+    """Collects a latency trace of every turn of the sessions using it.
+
+    Pass a tracer as `ClaudeAgentOptions(tracer=...)`. Timestamps are taken
+    with a monotonic clock as the SDK reads each message, and each turn
+    records:
+
+    - spawn and initialize spans (first turn of a session)
+    - first_stream_event and first_text_token instants; without
+      include_partial_messages the first token is the first assistant text
+    - a span per tool call, from the assistant's tool_use block to the
+      tool_result with the same tool_use_id
+    - a span per control round trip: permission prompts, hooks and SDK MCP
+      calls answered by the SDK, and requests such as interrupt sent by it
+    - a result instant with the ResultMessage's cost and duration
+
+    Export with to_chrome_trace() or write(), and open the file in
+    chrome://tracing or https://ui.perfetto.dev. Each session is shown as
+    a process; tool calls and control requests are async slices, since
+    they can overlap.
+
+    Only the most recent `max_turns` completed turns are kept.
+    """
+
+    def __init__(self, max_turns: int = 1000):
+        self.origin = time.perf_counter()
+        self._turns: deque[Turn] = deque(maxlen=max_turns)
+        self._sessions = 0
+
+    def session(self) -> "SessionTrace":
+        """Recorder for one CLI session; used by the SDK internally."""
+        self._sessions += 1
+        return SessionTrace(self, self._sessions)
+
+    def _add(self, turn: Turn) -> None:
+        self._turns.append(turn)
+
+    @property
+    def turns(self) -> list[Turn]:
+        """Completed turns, oldest first."""
+        return list(self._turns)
+
+    def clear(self) -> None:
+        self._turns.clear()
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Completed turns in the Chrome trace-event format."""
+        events: list[dict[str, Any]] = []
+        named: set[int] = set()
+        ids = 0
+        for turn in self._turns:
+            pid = turn.session
+            if pid not in named:
+                named.add(pid)
+                events.append(
+                    {
+                        "name": "process_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": 0,
+                        "args": {"name": f"session {turn.session_id or pid}"},
+                    }
+                )
+            events.append(
+                {
+                    "name": f"turn {turn.index}",
+                    "cat": "turn",
+                    "ph": "X",
+                    "ts": self._us(turn.start),
+                    "dur": self._us(turn.end or turn.start) - self._us(turn.start),
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {"session_id": turn.session_id},
+                }
+            )
+            for event in turn.events:
+                common = {"name": event.name, "cat": event.category, "pid": pid}
+                if event.end is None:
+                    events.append(
+                        {
+                            **common,
+                            "ph": "i",
+                            "s": "t",
+                            "ts": self._us(event.start),
+                            "tid": 0,
+                            "args": event.args,
+                        }
+                    )
+                    continue
+                ids += 1
+                events.append(
+                    {
+                        **common,
+                        "ph": "b",
+                        "id": ids,
+                        "ts": self._us(event.start),
+                        "tid": 0,
+                        "args": event.args,
+                    }
+                )
+                events.append(
+                    {
+                        **common,
+                        "ph": "e",
+                        "id": ids,
+                        "ts": self._us(event.end),
+                        "tid": 0,
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> None:
+        """Write to_chrome_trace() to a JSON file."""
+        Path(path).write_text(json.dumps(self.to_chrome_trace()))
+
+    def _us(self, seconds: float) -> float:
+        return round((seconds - self.origin) * 1e6, 1)
+
+
+class SessionTrace:
+    """Records the turns of one CLI session into a TurnTracer.
+
+    Turns start when a prompt is sent and end at the ResultMessage. The
+    CLI answers prompts in order, so a prompt sent during a turn starts
+    the next turn once the current one ends.
+    """
+
+    def __init__(self, tracer: TurnTracer, ordinal: int):
+        self.tracer = tracer
+        self.ordinal = ordinal
+        self.session_id = ""
+        self._turn: Turn | None = None
+        self._turns = 0
+        # Events recorded between turns, and prompts waiting for a turn
+        self._pending: list[TraceEvent] = []
+        self._prompts: deque[float] = deque()
+        self._tools: dict[str, TraceEvent] = {}
+        # Instants already recorded in the current turn
+        self._marks: set[str] = set()
+
+    def span(
+        self, name: str, category: str, start: float, end: float, **args: Any
+    ) -> None:
+        event = TraceEvent(name, category, start, end, args)
+        if self._turn is not None:
+            self._turn.events.append(event)
+        else:
+            self._pending.append(event)
+
+    def prompt_sent(self, now: float | None = None) -> None:
+        now = time.perf_counter() if now is None else now
+        if self._turn is None:
+            self._start_turn(now)
+        else:
+            self._prompts.append(now)
+
+    def message(self, message: dict[str, Any], now: float | None = None) -> None:
+        """Record a data message read from the CLI."""
+        now = time.perf_counter() if now is None else now
+        turn = self._turn
+        if turn is None:
+            turn = self._start_turn(now)
+        session_id = message.get("session_id")
+        if isinstance(session_id, str):
+            self.session_id = turn.session_id = session_id
+
+        msg_type = message.get("type")
+        if msg_type == "stream_event":
+            if not self._marked("first_stream_event"):
+                self._mark("first_stream_event", now)
+            event = message.get("event") or {}
+            if (
+                event.get("type") == "content_block_delta"
+                and (event.get("delta") or {}).get("type") == "text_delta"
+                and not self._marked("first_text_token")
+            ):
+                self._mark("first_text_token", now)
+        elif msg_type == "assistant":
+            for block in _content(message):
+                if block.get("type") == "text":
+                    if not self._marked("first_text_token"):
+                        self._mark("first_text_token", now)
+                elif block.get("type") == "tool_use":
+                    tool = TraceEvent(
+                        f"tool:{block.get('name')}",
+                        "tool",
+                        now,
+                        args={"tool_use_id": block.get("id")},
+                    )
+                    self._tools[str(block.get("id"))] = tool
+        elif msg_type == "user":
+            for block in _content(message):
+                if block.get("type") == "tool_result":
+                    call = self._tools.pop(str(block.get("tool_use_id")), None)
+                    if call is not None:
+                        call.end = now
+                        if block.get("is_error"):
+                            call.args["is_error"] = True
+                        turn.events.append(call)
+        elif msg_type == "result":
+            self._mark(
+                "result",
+                now,
+                subtype=message.get("subtype"),
+                is_error=message.get("is_error"),
+                num_turns=message.get("num_turns"),
+                duration_ms=message.get("duration_ms"),
+                total_cost_usd=message.get("total_cost_usd"),
+            )
+            self._end_turn(now)
+
+    def _start_turn(self, now: float) -> Turn:
+        self._turns += 1
+        turn = Turn(
+            self._turns, self.session_id, now, self.ordinal, events=self._pending
+        )
+        self._pending = []
+        self._marks.clear()
+        self._turn = turn
+        return turn
+
+    def _end_turn(self, now: float) -> None:
+        assert self._turn is not None
+        turn = self._turn
+        turn.end = now
+        # Tool calls the CLI never reported a result for
+        for tool in self._tools.values():
+            tool.end = now
+            tool.args["unfinished"] = True
+            turn.events.append(tool)
+        self._tools.clear()
+        turn.events.sort(key=lambda event: event.start)
+        self.tracer._add(turn)
+        self._turn = None
+        if self._prompts:
+            queued = self._prompts.popleft()
+            self._start_turn(now).events.append(
+                TraceEvent("queued", "turn", queued, now)
+            )
+
+    def _marked(self, name: str) -> bool:
+        return name in self._marks
+
+    def _mark(self, name: str, now: float, **args: Any) -> None:
+        assert self._turn is not None
+        self._marks.add(name)
+        self._turn.events.append(TraceEvent(name, "turn", now, args=args))
+
+
+def _content(message: dict[str, Any]) -> list[dict[str, Any]]:
+    content = (message.get("message") or {}).get("content")
+    if not isinstance(content, list):
+        return []
+    return [block for block in content if isinstance(block, dict)]
@@ -1,22 +1,32 @@
 """Type definitions for Claude SDK."""
 
+import json
 import sys
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Literal, TypedDict
+from typing import TYPE_CHECKING, Any, Literal, TypedDict, overload
 
 from typing_extensions import NotRequired
 
+from ._errors import MessageParseError
+
 if TYPE_CHECKING:
     from mcp.server import Server as McpServer
 
+    from .metrics import MetricsRegistry
+    from .profiling import Profiler
+    from .tracing import TurnTracer
+
 # Permission modes
 PermissionMode = Literal["default", "acceptEdits", "plan", "bypassPermissions"]
 
 # Agent definitions
 SettingSource = Literal["user", "project", "local"]
 
+# What the message reader does when the consumer falls behind
+MessageBufferPolicy = Literal["block", "spill"]
+
 
 class SystemPromptPreset(TypedDict):
     """System prompt preset configuration."""
@@ -409,6 +419,23 @@ McpServerConfig = (
 )
 
 
+@dataclass
+class ToolSession:
+    """Per-session view of an SDK MCP server shared by several clients.
+
+    Each Query attached to an SDK MCP server gets its own ToolSession. Tool
+    handlers can look it up with current_tool_session() to tell sessions
+    apart and keep per-session data in `state`, which is dropped when the
+    session's client disconnects.
+    """
+
+    key: str  # Unique per attached Query
+    session_id: str | None = None  # Claude Code session ID, once known
+    state: dict[str, Any] = field(default_factory=dict)
+    calls: int = 0
+    in_flight: int = 0
+
+
 class SdkPluginConfig(TypedDict):
     """SDK plugin configuration.
 
@@ -420,14 +447,16 @@ class SdkPluginConfig(TypedDict):
 
 
 # Content block types
-@dataclass
+# Message and block types use __slots__: long transcripts hold very many of
+# them, and slots avoid a per-instance __dict__.
+@dataclass(slots=True)
 class TextBlock:
     """Text content block."""
 
     text: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ThinkingBlock:
     """Thinking content block."""
 
@@ -435,7 +464,7 @@ class ThinkingBlock:
     signature: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolUseBlock:
     """Tool use content block."""
 
@@ -444,7 +473,7 @@ class ToolUseBlock:
     input: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResultBlock:
     """Tool result content block."""
 
@@ -456,6 +485,93 @@ class ToolResultBlock:
 ContentBlock = TextBlock | ThinkingBlock | ToolUseBlock | ToolResultBlock
 
 
+class ContentBlockView(Sequence[ContentBlock]):
+    """Read-only sequence of content blocks that are built on first access.
+
+    Used as message content when `lazy_content_blocks` is enabled. The raw
+    block dicts decoded from the CLI are kept as-is and each ContentBlock is
+    only constructed (then cached) when it is indexed or iterated, so
+    consumers that skip large tool inputs or tool results never pay for
+    them. Unknown block types are skipped, as in eager parsing.
+    """
+
+    __slots__ = ("_raw", "_parsers", "_indices", "_cache")
+
+    def __init__(
+        self,
+        raw: list[dict[str, Any]],
+        parsers: Mapping[str, Callable[[dict[str, Any]], ContentBlock]],
+    ):
+        self._raw = raw
+        self._parsers = parsers
+        self._indices: list[int] | None = None
+        self._cache: dict[int, ContentBlock] = {}
+
+    @property
+    def raw(self) -> list[dict[str, Any]]:
+        """The undecoded content block dicts, for forwarding unchanged."""
+        return self._raw
+
+    def _known_indices(self) -> list[int]:
+        if self._indices is None:
+            self._indices = [
+                i for i, block in enumerate(self._raw) if block["type"] in self._parsers
+            ]
+        return self._indices
+
+    def _materialize(self, raw_index: int) -> ContentBlock:
+        block = self._cache.get(raw_index)
+        if block is None:
+            raw_block = self._raw[raw_index]
+            try:
+                block = self._parsers[raw_block["type"]](raw_block)
+            except KeyError as e:
+                raise MessageParseError(
+                    f"Missing required field in {raw_block['type']} block: {e}",
+                    raw_block,
+                ) from e
+            self._cache[raw_index] = block
+        return block
+
+    def blocks_of_type(self, *block_types: str) -> Iterator[ContentBlock]:
+        """Yield only blocks whose raw type matches, without building others.
+
+        Example:
+            >>> texts = [b.text for b in msg.content.blocks_of_type("text")]
+        """
+        for raw_index in self._known_indices():
+            if self._raw[raw_index]["type"] in block_types:
+                yield self._materialize(raw_index)
+
+    def __len__(self) -> int:
+        return len(self._known_indices())
+
+    @overload
+    def __getitem__(self, index: int) -> ContentBlock: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ContentBlock]: ...
+
+    def __getitem__(self, index: int | slice) -> ContentBlock | list[ContentBlock]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._materialize(self._known_indices()[index])
+
+    def __iter__(self) -> Iterator[ContentBlock]:
+        for raw_index in self._known_indices():
+            yield self._materialize(raw_index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ContentBlockView | list | tuple):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 # Message types
 AssistantMessageError = Literal[
     "authentication_failed",
@@ -467,25 +583,37 @@ AssistantMessageError = Literal[
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class UserMessage:
-    """User message."""
+    """User message.
+
+    `content` is a list, or a read-only ContentBlockView with
+    lazy_content_blocks; treat it as a sequence.
+    """
 
-    content: str | list[ContentBlock]
+    content: str | Sequence[ContentBlock]
     parent_tool_use_id: str | None = None
+    # Raw message dict from the CLI, set only with lazy_content_blocks
+    raw: dict[str, Any] | None = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class AssistantMessage:
-    """Assistant message with content blocks."""
+    """Assistant message with content blocks.
+
+    `content` is a list, or a read-only ContentBlockView with
+    lazy_content_blocks; treat it as a sequence.
+    """
 
-    content: list[ContentBlock]
+    content: Sequence[ContentBlock]
     model: str
     parent_tool_use_id: str | None = None
     error: AssistantMessageError | None = None
+    # Raw message dict from the CLI, set only with lazy_content_blocks
+    raw: dict[str, Any] | None = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemMessage:
     """System message with metadata."""
 
@@ -493,7 +621,144 @@ class SystemMessage:
     data: dict[str, Any]
 
 
+@dataclass(slots=True)
+class ResourceUsage:
+    """Resources used by the CLI process, read from /proc/<pid>.
+
+    Only the CLI process itself is counted, not processes it started.
+    """
+
+    pid: int
+    rss_bytes: int
+    # User plus system CPU time
+    cpu_seconds: float
+    # None if /proc/<pid>/fd could not be listed
+    open_fds: int | None
+    # time.time() when the sample was taken
+    sampled_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "rss_bytes": self.rss_bytes,
+            "cpu_seconds": self.cpu_seconds,
+            "open_fds": self.open_fds,
+            "sampled_at": self.sampled_at,
+        }
+
+
+ResourceLimitCallback = Callable[[ResourceUsage, list[str]], Awaitable[None]]
+
+
+@dataclass
+class ResourceLimits:
+    """Soft limits on the CLI process, checked at every resource sample.
+
+    When a sample first exceeds a limit, `on_exceeded` is called with the
+    sample and the names of the exceeded limits ("rss_bytes",
+    "cpu_seconds", "open_fds"), and with `interrupt` the current turn is
+    interrupted (streaming mode only, where limits are checked once the
+    session is initialized). A limit fires again only after usage has
+    dropped back below it.
+    """
+
+    max_rss_bytes: int | None = None
+    max_cpu_seconds: float | None = None
+    max_open_fds: int | None = None
+    on_exceeded: ResourceLimitCallback | None = None
+    interrupt: bool = False
+
+    def exceeded(self, usage: ResourceUsage) -> list[str]:
+        """Names of the limits a sample is over."""
+        names = []
+        if self.max_rss_bytes is not None and usage.rss_bytes > self.max_rss_bytes:
+            names.append("rss_bytes")
+        if (
+            self.max_cpu_seconds is not None
+            and usage.cpu_seconds > self.max_cpu_seconds
+        ):
+            names.append("cpu_seconds")
+        if (
+            self.max_open_fds is not None
+            and usage.open_fds is not None
+            and usage.open_fds > self.max_open_fds
+        ):
+            names.append("open_fds")
+        return names
+
+
+@dataclass
+class RestartPolicy:
+    """How ClaudeSDKClient restarts a CLI process that exits unexpectedly.
+
+    The new process resumes the last session the CLI reported, repeats
+    the initialize handshake (registering hooks and SDK MCP servers
+    again) and is sent the prompts whose results hadn't arrived yet,
+    whether they came from query() or a prompt stream passed to
+    connect(). The client's Query then lives in a supervisor task that
+    connect() starts and disconnect() stops, so both must be called from
+    the same task.
+    Restart n waits `backoff * 2 ** (n - 1)` seconds, at most
+    `max_backoff`. After `max_restarts` restarts in a row without a
+    result in between, the CLI's error is raised instead.
+    """
+
+    max_restarts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 10.0
+
+
 @dataclass
+class HedgePolicy:
+    """When query() starts a second, identical attempt of a slow query.
+
+    If no result has arrived `delay` seconds after a query started, the
+    same prompt is run again on a new CLI process. The first attempt to
+    produce a ResultMessage wins: its messages are yielded and the other
+    attempt is interrupted and closed.
+
+    Messages are held until the winner is known, so a hedged query yields
+    nothing until its result and then everything at once, even when no
+    hedge was started. Don't hedge queries whose progress is shown as it
+    streams.
+
+    Both attempts run every tool call the model makes, concurrently and in
+    the same working directory, and the loser's side effects are not undone.
+    Hedge only queries limited to read-only tools (for example
+    `allowed_tools=["Read", "Grep", "Glob"]`), never ones that may run Bash
+    or edit files.
+
+    With `percentile` set (e.g. 0.95) and at least `min_samples` results
+    in options.metrics' query_seconds histogram, the delay is that
+    percentile of past query latencies instead.
+
+    Hedge attempts spend at most `max_extra_cost_usd` in total, across
+    every query sharing this policy. Each hedge reserves what is left of
+    the budget, or options.max_budget_usd if that is smaller, as its own
+    max_budget_usd, and holds the reservation until its cost is known; no
+    hedge starts while nothing is left. Set options.max_budget_usd to let
+    several hedges run at once.
+    """
+
+    max_extra_cost_usd: float
+    delay: float = 2.0
+    percentile: float | None = None
+    min_samples: int = 20
+    # Cost of finished hedge attempts; a hedge whose cost is never
+    # reported is charged its whole reservation
+    spent_usd: float = field(default=0.0, init=False)
+    hedges: int = field(default=0, init=False)
+    hedge_wins: int = field(default=0, init=False)
+    # Queries that were slow enough to hedge when the budget was spent
+    skipped: int = field(default=0, init=False)
+    _reserved_usd: float = field(default=0.0, init=False, repr=False)
+
+    def remaining_usd(self) -> float:
+        """Budget neither spent nor reserved by running hedges."""
+        return max(self.max_extra_cost_usd - self.spent_usd - self._reserved_usd, 0.0)
+
+
+@dataclass(slots=True)
 class ResultMessage:
     """Result message with cost and usage information."""
 
@@ -507,9 +772,12 @@ class ResultMessage:
     usage: dict[str, Any] | None = None
     result: str | None = None
     structured_output: Any = None
+    # The CLI process's resource usage when the result was read, if
+    # ClaudeAgentOptions.resource_sample_interval is set
+    resource_usage: ResourceUsage | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """Stream event for partial message updates during streaming."""
 
@@ -522,6 +790,37 @@ class StreamEvent:
 Message = UserMessage | AssistantMessage | SystemMessage | ResultMessage | StreamEvent
 
 
+@dataclass(slots=True)
+class RawMessage:
+    """An undecoded message from the CLI, for forwarding as-is.
+
+    `data` is one JSON document exactly as the CLI wrote it, without the
+    trailing newline. `type` and `session_id` are read from the line without
+    decoding the whole document.
+    """
+
+    data: bytes
+    type: str | None = None
+    session_id: str | None = None
+
+    def json(self) -> dict[str, Any]:
+        """Decode the full message."""
+        decoded: dict[str, Any] = json.loads(self.data)
+        return decoded
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one prompt run by batch()."""
+
+    index: int  # Position of the prompt in the input
+    prompt: str
+    messages: list[Message] = field(default_factory=list)
+    result: ResultMessage | None = None  # The final ResultMessage, if any
+    error: Exception | None = None  # Set if the last attempt raised
+    attempts: int = 0
+
+
 @dataclass
 class ClaudeAgentOptions:
     """Query options for Claude SDK."""
@@ -576,6 +875,59 @@ class ClaudeAgentOptions:
     # Output format for structured outputs (matches Messages API structure)
     # Example: {"type": "json_schema", "schema": {"type": "object", "properties": {...}}}
     output_format: dict[str, Any] | None = None
+    # Build User/AssistantMessage content blocks on first access instead of
+    # eagerly. Content is then a read-only ContentBlockView and the raw
+    # message dict is available as message.raw for forwarding.
+    lazy_content_blocks: bool = False
+    # With include_partial_messages, merge consecutive deltas of the same
+    # content block for up to this many seconds and/or until their text
+    # reaches this many bytes, so consumers see fewer, larger StreamEvents.
+    stream_coalesce_window: float | None = None
+    stream_coalesce_max_bytes: int | None = None
+    # Read CLI output as undecoded bytes. Data messages are then only decoded
+    # when consumed through receive_messages(); receive_raw() forwards them
+    # as-is. Stream event coalescing does not apply in this mode.
+    raw_messages: bool = False
+    # Messages buffered between the CLI reader and the consumer. With the
+    # "block" policy a full buffer pauses reading, which also delays control
+    # requests such as permission prompts. With "spill", messages beyond
+    # message_buffer_size go to a temporary file (in message_spill_dir, if
+    # set), so control traffic is always read.
+    message_buffer_size: int = 100
+    message_buffer_policy: MessageBufferPolicy = "block"
+    message_spill_dir: str | Path | None = None
+    # Registry to record session and control protocol metrics into; nothing
+    # is recorded when None. See MetricsRegistry.
+    metrics: "MetricsRegistry | None" = None
+    # Tracer to record per-turn latency traces into (spawn, first token,
+    # tool calls, control round trips); exported as Chrome trace-event JSON.
+    # See TurnTracer.
+    tracer: "TurnTracer | None" = None
+    # Hooks called before and after internal stages (transport reads and
+    # writes, JSON decoding, message parsing, control requests, callbacks
+    # and SDK MCP dispatch). See Profiler.
+    profiler: "Profiler | None" = None
+    # Sample the CLI process's RSS, CPU time and open file descriptors from
+    # /proc/<pid> every this many seconds (Linux only). The latest sample is
+    # available from ClaudeSDKClient.get_resource_usage() and is attached to
+    # each ResultMessage as resource_usage.
+    resource_sample_interval: float | None = None
+    # Soft limits checked at each sample; sampling defaults to once a second
+    # when limits are set without an interval. See ResourceLimits.
+    resource_limits: ResourceLimits | None = None
+    # Seconds the CLI process gets to exit after SIGTERM when the transport
+    # is closed, before it is killed with SIGKILL
+    close_grace_period: float = 5.0
+    # Restart the CLI if it exits while a ClaudeSDKClient is connected,
+    # resuming the session. Not applied with a custom transport. See
+    # RestartPolicy.
+    restart_policy: RestartPolicy | None = None
+    # Run a second attempt of slow query() calls and keep whichever result
+    # comes first. Only used by query() with a string prompt and no custom
+    # transport. Messages are withheld until the result, so nothing streams
+    # early, and both attempts run tools, so use read-only tools only. See
+    # HedgePolicy.
+    hedge: HedgePolicy | None = None
 
 
 # SDK Control Protocol
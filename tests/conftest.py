@@ -1,4 +1,30 @@
 """Pytest configuration for tests."""
 
+from typing import Any
+
+import pytest
+
+from claude_agent_sdk import ClaudeAgentOptions
+from claude_agent_sdk.testing import FakeCLIWorkload, fake_cli_path
 
 # No async plugin needed since we're using sync tests with anyio.run()
+
+
+@pytest.fixture
+def fake_options(monkeypatch):
+    """Build options that run the fake CLI with a workload.
+
+    Call it as `fake_options(FakeCLIWorkload(...), **options)`; the workload
+    defaults to FakeCLIWorkload(). The CLI version check is skipped.
+    """
+    monkeypatch.setenv("CLAUDE_AGENT_SDK_SKIP_VERSION_CHECK", "1")
+
+    def build(
+        workload: FakeCLIWorkload | None = None, **kwargs: Any
+    ) -> ClaudeAgentOptions:
+        workload = workload or FakeCLIWorkload()
+        return ClaudeAgentOptions(
+            cli_path=fake_cli_path(), env=workload.env(), **kwargs
+        )
+
+    return build
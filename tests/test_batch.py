@@ -0,0 +1,250 @@
+"""Tests for the batch query runner."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import ClaudeAgentOptions, batch
+from claude_agent_sdk._internal.batch import BatchRun
+from claude_agent_sdk._internal.transport import Transport
+from claude_agent_sdk.types import AssistantMessage, ResultMessage
+
+
+class ScriptedTransport(Transport):
+    """Answers a string prompt with an assistant and a result message."""
+
+    instances: list["ScriptedTransport"] = []
+    running = 0
+    peak = 0
+
+    def __init__(self, prompt: str, delays: dict[str, float], failures: dict[str, int]):
+        self.prompt = prompt
+        self._delays = delays
+        self._failures = failures
+        ScriptedTransport.instances.append(self)
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        pass
+
+    def read_messages(self):
+        async def _read():
+            prompt = self.prompt
+            ScriptedTransport.running += 1
+            ScriptedTransport.peak = max(
+                ScriptedTransport.peak, ScriptedTransport.running
+            )
+            try:
+                await anyio.sleep(self._delays.get(prompt, 0))
+                if self._failures.get(prompt, 0) > 0:
+                    self._failures[prompt] -= 1
+                    raise RuntimeError(f"CLI crashed on {prompt}")
+                yield {
+                    "type": "assistant",
+                    "message": {
+                        "model": "m",
+                        "content": [{"type": "text", "text": prompt.upper()}],
+                    },
+                }
+                yield {
+                    "type": "result",
+                    "subtype": "success",
+                    "duration_ms": 1,
+                    "duration_api_ms": 1,
+                    "is_error": False,
+                    "num_turns": 1,
+                    "session_id": prompt,
+                    "total_cost_usd": 0.25,
+                    "usage": {
+                        "input_tokens": 10,
+                        "output_tokens": 5,
+                        "server_tool_use": {"web_search_requests": 1},
+                        "service_tier": "standard",
+                    },
+                }
+            finally:
+                ScriptedTransport.running -= 1
+
+        return _read()
+
+    async def close(self) -> None:
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+@pytest.fixture
+def transports():
+    ScriptedTransport.instances = []
+    ScriptedTransport.running = 0
+    ScriptedTransport.peak = 0
+    delays: dict[str, float] = {}
+    failures: dict[str, int] = {}
+
+    def factory(prompt: str) -> ScriptedTransport:
+        return ScriptedTransport(prompt, delays, failures)
+
+    factory.delays = delays  # type: ignore[attr-defined]
+    factory.failures = failures  # type: ignore[attr-defined]
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_ordered_results_and_aggregates(transports):
+    transports.delays.update({"a": 0.05, "b": 0.0, "c": 0.02})
+    run = batch(["a", "b", "c"], concurrency=3, transport_factory=transports)
+    results = [result async for result in run]
+
+    assert [r.prompt for r in results] == ["a", "b", "c"]
+    assert all(isinstance(r.result, ResultMessage) for r in results)
+    assert isinstance(results[0].messages[0], AssistantMessage)
+    assert run.total_cost_usd == pytest.approx(0.75)
+    assert run.usage == {
+        "input_tokens": 30,
+        "output_tokens": 15,
+        "server_tool_use": {"web_search_requests": 3},
+    }
+    assert run.completed == 3
+
+
+@pytest.mark.asyncio
+async def test_unordered_results_arrive_as_completed(transports):
+    transports.delays.update({"a": 0.05, "b": 0.0})
+    run = batch(["a", "b"], concurrency=2, ordered=False, transport_factory=transports)
+    assert [r.prompt async for r in run] == ["b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(transports):
+    for prompt in "abcdef":
+        transports.delays[prompt] = 0.01
+    run = batch(list("abcdef"), concurrency=2, transport_factory=transports)
+    results = [r async for r in run]
+    assert len(results) == 6
+    assert ScriptedTransport.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_failed_prompt(transports):
+    transports.failures["b"] = 1
+    run = batch(["a", "b"], retries=1, retry_backoff=0, transport_factory=transports)
+    results = [r async for r in run]
+    assert results[1].attempts == 2
+    assert results[1].error is None
+    assert run.spawned == 3
+
+
+@pytest.mark.asyncio
+async def test_reports_error_after_retries_exhausted(transports):
+    transports.failures["a"] = 5
+    run = batch(["a"], retries=1, retry_backoff=0, transport_factory=transports)
+    results = [r async for r in run]
+    assert isinstance(results[0].error, Exception)
+    assert results[0].attempts == 2
+    assert run.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_global_budget_stops_new_prompts(transports):
+    run = batch(
+        list("abcde"),
+        ClaudeAgentOptions(max_budget_usd=10.0),
+        concurrency=1,
+        max_budget_usd=0.5,
+        transport_factory=transports,
+    )
+    results = [r async for r in run]
+    assert [r.prompt for r in results] == ["a", "b"]
+    assert run.budget_exhausted
+    assert run.skipped == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_global_budget_is_reserved_per_query(transports, monkeypatch):
+    budgets = []
+    run_prompt = BatchRun._run_prompt
+
+    async def recording_run_prompt(self, index, prompt, budget_usd=None):
+        budgets.append(budget_usd)
+        return await run_prompt(self, index, prompt, budget_usd)
+
+    monkeypatch.setattr(BatchRun, "_run_prompt", recording_run_prompt)
+    transports.delays.update({"a": 0.05, "b": 0.05})
+    run = batch(
+        list("abcd"), concurrency=2, max_budget_usd=0.75, transport_factory=transports
+    )
+    results = [r async for r in run]
+
+    # Queries in flight split what is left instead of each getting all of it
+    assert len(results) == 4
+    assert budgets == pytest.approx([0.375, 0.375, 0.125, 0.125])
+    assert run._reserved_usd == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_spawn_interval_spaces_starts(transports):
+    start = anyio.current_time()
+    run = batch(
+        list("abc"), concurrency=3, spawn_interval=0.05, transport_factory=transports
+    )
+    [r async for r in run]
+    assert anyio.current_time() - start >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_breaking_early_cancels_remaining(transports):
+    for prompt in "abcd":
+        transports.delays[prompt] = 0.01 if prompt == "a" else 10
+    run = batch(
+        list("abcd"), concurrency=4, ordered=False, transport_factory=transports
+    )
+    with anyio.fail_after(5):
+        async with run:
+            async for result in run:
+                assert result.prompt == "a"
+                break
+    assert ScriptedTransport.running == 0
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        batch(["a"], concurrency=0)
+    with pytest.raises(ValueError):
+        batch(["a"], retries=-1)
+
+
+@pytest.mark.asyncio
+async def test_sharded_across_processes(fake_options):
+    run = batch(
+        [f"p{i}" for i in range(6)],
+        fake_options(),
+        concurrency=4,
+        processes=2,
+        keep_messages=False,
+    )
+    with anyio.fail_after(30):
+        results = [r async for r in run]
+
+    assert [r.prompt for r in results] == [f"p{i}" for i in range(6)]
+    assert [r.result.result for r in results] == [f"Echo: p{i}" for i in range(6)]
+    assert all(r.messages == [] for r in results)
+    assert run.total_cost_usd == pytest.approx(0.006)
+    assert run.completed == 6
+
+
+@pytest.mark.asyncio
+async def test_sharded_errors_are_returned():
+    run = batch(
+        ["a", "b"],
+        ClaudeAgentOptions(cli_path="/nonexistent/claude"),
+        processes=1,
+    )
+    with anyio.fail_after(30):
+        results = [r async for r in run]
+    assert all("not found" in str(r.error) for r in results)
+    assert run.failed == 2
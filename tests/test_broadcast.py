@@ -0,0 +1,198 @@
+"""Tests for fanning out the message stream to several subscribers."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import ClaudeSDKClient
+from claude_agent_sdk._internal.broadcast import MessageBroadcast
+from claude_agent_sdk._internal.query import Query
+from claude_agent_sdk._internal.transport import Transport
+from claude_agent_sdk.types import StreamEvent
+
+
+def _delta(text: str) -> dict:
+    return {
+        "type": "stream_event",
+        "uuid": f"evt-{text}",
+        "session_id": "s",
+        "parent_tool_use_id": None,
+        "event": {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": text},
+        },
+    }
+
+
+async def _source(messages, fail: bool = False):
+    for message in messages:
+        yield message
+    if fail:
+        raise RuntimeError("CLI died")
+
+
+async def _drain(subscription) -> list:
+    return [message async for message in subscription]
+
+
+class TestMessageBroadcast:
+    @pytest.mark.asyncio
+    async def test_subscribers_share_message_objects(self):
+        messages = [{"type": "system", "n": i} for i in range(5)]
+        broadcast = MessageBroadcast(_source(messages))
+        first = broadcast.subscribe(buffer_size=2)
+        second = broadcast.subscribe(buffer_size=2)
+        received = {}
+
+        async def consume(name, subscription):
+            received[name] = await _drain(subscription)
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(broadcast.run)
+                tg.start_soon(consume, "first", first)
+                tg.start_soon(consume, "second", second)
+
+        assert received["first"] == messages
+        assert all(
+            a is b for a, b in zip(received["first"], received["second"], strict=True)
+        )
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_does_not_hold_up_others(self):
+        messages = [{"type": "system", "n": i} for i in range(5)]
+        broadcast = MessageBroadcast(_source(messages))
+        slow = broadcast.subscribe(buffer_size=2, overflow="drop_oldest")
+        with anyio.fail_after(5):
+            await broadcast.run()
+        assert [m["n"] for m in await _drain(slow)] == [3, 4]
+        assert slow.dropped == 3
+
+    @pytest.mark.asyncio
+    async def test_coalesce_merges_deltas_without_touching_shared_ones(self):
+        messages = [_delta(text) for text in "abcd"]
+        broadcast = MessageBroadcast(_source(messages))
+        slow = broadcast.subscribe(buffer_size=2, overflow="coalesce")
+        with anyio.fail_after(5):
+            await broadcast.run()
+        received = await _drain(slow)
+        assert [m["event"]["delta"]["text"] for m in received] == ["a", "bcd"]
+        assert slow.stats() == {"queued": 0, "dropped": 0, "coalesced": 2}
+        # The merged message is new; the originals are unchanged
+        assert messages[1]["event"]["delta"]["text"] == "b"
+
+    @pytest.mark.asyncio
+    async def test_source_error_is_raised_after_queued_messages(self):
+        broadcast = MessageBroadcast(_source([{"type": "system"}], fail=True))
+        subscription = broadcast.subscribe()
+        await broadcast.run()
+        assert await subscription.__anext__() == {"type": "system"}
+        with pytest.raises(RuntimeError, match="CLI died"):
+            await subscription.__anext__()
+
+    @pytest.mark.asyncio
+    async def test_closed_subscription_stops_receiving(self):
+        broadcast = MessageBroadcast(_source([{"type": "system"}] * 3))
+        with broadcast.subscribe(buffer_size=1) as subscription:
+            pass
+        with anyio.fail_after(5):
+            await broadcast.run()
+        assert await _drain(subscription) == []
+
+    def test_invalid_configuration(self):
+        broadcast = MessageBroadcast(_source([]))
+        with pytest.raises(ValueError):
+            broadcast.subscribe(buffer_size=0)
+        with pytest.raises(ValueError):
+            broadcast.subscribe(overflow="lossy")  # type: ignore[arg-type]
+
+
+class _ListTransport(Transport):
+    def __init__(self, messages: list[dict]):
+        self._messages = messages
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        pass
+
+    def read_messages(self):
+        async def _read():
+            for message in self._messages:
+                yield message
+
+        return _read()
+
+    async def close(self) -> None:
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+class TestQueryIteration:
+    @pytest.mark.asyncio
+    async def test_anext_continues_one_iteration(self):
+        messages = [_delta(text) for text in "abc"]
+        query = Query(transport=_ListTransport(messages), is_streaming_mode=False)
+        await query.start()
+        assert (await query.__anext__())["uuid"] == "evt-a"
+        assert (await query.__anext__())["uuid"] == "evt-b"
+        assert [m["uuid"] async for m in query] == ["evt-c"]
+        await query.close()
+
+
+async def _connected_client(messages: list[dict]) -> ClaudeSDKClient:
+    client = ClaudeSDKClient(transport=_ListTransport(messages))
+    # Connect without the initialize handshake, which this transport can't answer
+    client._transport = client._custom_transport
+    client._query = Query(transport=client._transport, is_streaming_mode=False)
+    await client._query.start()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_client_subscribers_share_parsed_messages():
+    client = await _connected_client([_delta(text) for text in "ab"])
+
+    ui = client.subscribe(overflow="coalesce")
+    transcript = client.subscribe()
+    with anyio.fail_after(5):
+        ui_messages = await _drain(ui)
+        transcript_messages = await _drain(transcript)
+    assert all(isinstance(m, StreamEvent) for m in ui_messages)
+    assert [a is b for a, b in zip(ui_messages, transcript_messages, strict=True)] == [
+        True,
+        True,
+    ]
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_client_subscribe_alongside_receive_messages():
+    client = await _connected_client([_delta(text) for text in "abc"])
+    subscription = client.subscribe()
+    with anyio.fail_after(5):
+        received = [m.uuid async for m in client.receive_messages()]
+        assert received == ["evt-a", "evt-b", "evt-c"]
+        assert [m.uuid async for m in subscription] == received
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_client_receive_messages_keeps_messages_between_calls():
+    client = await _connected_client([_delta(text) for text in "abcd"])
+    subscription = client.subscribe()
+    with anyio.fail_after(5):
+        # Everything is published before the first call
+        assert len(await _drain(subscription)) == 4
+        async for message in client.receive_messages():
+            assert message.uuid == "evt-a"
+            break
+        rest = [m.uuid async for m in client.receive_messages()]
+    assert rest == ["evt-b", "evt-c", "evt-d"]
+    await client.disconnect()
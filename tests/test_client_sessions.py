@@ -0,0 +1,166 @@
+"""Tests for per-session demultiplexing on ClaudeSDKClient."""
+
+import json
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    AssistantMessage,
+    ClaudeSDKClient,
+    ResultMessage,
+)
+from claude_agent_sdk._internal.transport import Transport
+
+
+def _assistant(text: str, session_id: str) -> dict:
+    return {
+        "type": "assistant",
+        "message": {"model": "m", "content": [{"type": "text", "text": text}]},
+        "parent_tool_use_id": None,
+        "session_id": session_id,
+    }
+
+
+def _result(text: str, session_id: str) -> dict:
+    return {
+        "type": "result",
+        "subtype": "success",
+        "duration_ms": 1,
+        "duration_api_ms": 1,
+        "is_error": False,
+        "num_turns": 1,
+        "session_id": session_id,
+        "result": text,
+    }
+
+
+class InterleavingTransport(Transport):
+    """Answers user messages in pairs, interleaving the two answers.
+
+    With `cli_session_id` set, replies carry that id instead of the one the
+    prompt was sent with, the way the CLI reports its own session.
+    """
+
+    def __init__(self, cli_session_id: str | None = None):
+        self._cli_session_id = cli_session_id
+        self._send, self._receive = anyio.create_memory_object_stream[dict](100)
+        self._prompts: list[tuple[str, str]] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        message = json.loads(data)
+        if message["type"] == "control_request":
+            await self._send.send(
+                {
+                    "type": "control_response",
+                    "response": {
+                        "subtype": "success",
+                        "request_id": message["request_id"],
+                        "response": {},
+                    },
+                }
+            )
+            await self._send.send(
+                {"type": "system", "subtype": "init", "session_id": "cli"}
+            )
+            return
+
+        session_id = self._cli_session_id or message["session_id"]
+        self._prompts.append((message["message"]["content"], session_id))
+        if len(self._prompts) == 2:
+            (a, a_id), (b, b_id) = self._prompts
+            self._prompts = []
+            for reply in [
+                _assistant(a.upper(), a_id),
+                _assistant(b.upper(), b_id),
+                _result(a, a_id),
+                _result(b, b_id),
+            ]:
+                await self._send.send(reply)
+
+    def read_messages(self):
+        async def _read():
+            async for message in self._receive:
+                yield message
+
+        return _read()
+
+    async def close(self) -> None:
+        self._send.close()
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+async def _collect(session) -> list[str]:
+    texts = []
+    async for message in session.receive_response():
+        if isinstance(message, AssistantMessage):
+            texts.append(message.content[0].text)
+        elif isinstance(message, ResultMessage):
+            texts.append(f"result:{message.result}")
+    return texts
+
+
+@pytest.mark.asyncio
+async def test_routes_interleaved_sessions_by_session_id():
+    async with ClaudeSDKClient(transport=InterleavingTransport()) as client:
+        a, b = client.session("a"), client.session("b")
+        await a.query("first")
+        await b.query("second")
+
+        results = {}
+
+        async def consume(name, session):
+            results[name] = await _collect(session)
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(consume, "a", a)
+                tg.start_soon(consume, "b", b)
+
+        assert results == {
+            "a": ["FIRST", "result:first"],
+            "b": ["SECOND", "result:second"],
+        }
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_id_routes_to_oldest_turn():
+    transport = InterleavingTransport(cli_session_id="cli")
+    async with ClaudeSDKClient(transport=transport) as client:
+        a, b = client.session("a"), client.session("b")
+        await a.query("first")
+        await b.query("second")
+        with anyio.fail_after(5):
+            # Without real ids, both answers land on the oldest open turn
+            # until its result arrives
+            assert await _collect(a) == ["FIRST", "SECOND", "result:first"]
+            assert await _collect(b) == ["result:second"]
+
+
+@pytest.mark.asyncio
+async def test_closed_session_does_not_stop_the_others():
+    async with ClaudeSDKClient(transport=InterleavingTransport()) as client:
+        a, b = client.session("a", buffer_size=1), client.session("b")
+        a.close()
+        await a.query("first")
+        await b.query("second")
+        with anyio.fail_after(5):
+            assert await _collect(b) == ["SECOND", "result:second"]
+            assert await _collect(a) == []
+
+        # A session reading messages when it is closed is dropped as well
+        a = client.session("a", buffer_size=1)
+        await a.query("third")
+        await b.query("fourth")
+        with anyio.fail_after(5):
+            async for _ in a.receive_messages():
+                a.close()
+            assert await _collect(b) == ["FOURTH", "result:fourth"]
@@ -0,0 +1,161 @@
+"""End-to-end tests against the fake CLI in claude_agent_sdk.testing."""
+
+from typing import Any
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    AssistantMessage,
+    ClaudeSDKClient,
+    HookMatcher,
+    PermissionResultAllow,
+    PermissionResultDeny,
+    ResultMessage,
+    ToolResultBlock,
+    UserMessage,
+    create_sdk_mcp_server,
+    query,
+    tool,
+)
+from claude_agent_sdk.testing import FakeCLIWorkload, fake_cli_path
+from claude_agent_sdk.testing.fake_cli import parse_args
+from claude_agent_sdk.types import StreamEvent
+
+
+def tool_results(messages: list[Any]) -> list[ToolResultBlock]:
+    return [
+        block
+        for message in messages
+        if isinstance(message, UserMessage) and isinstance(message.content, list)
+        for block in message.content
+        if isinstance(block, ToolResultBlock)
+    ]
+
+
+def test_launcher_is_private():
+    path = fake_cli_path()
+    assert path == fake_cli_path()
+    assert path.stat().st_mode & 0o777 == 0o700
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_parse_args():
+    args = parse_args(
+        [
+            "--output-format",
+            "stream-json",
+            "--verbose",
+            "--system-prompt",
+            "",
+            "--setting-sources",
+            "",
+            "--mcp-config",
+            '{"mcpServers": {"calc": {"type": "sdk", "name": "calc"}, '
+            '"web": {"type": "stdio", "command": "web"}}}',
+            "--some-extra-flag",
+            "--include-partial-messages",
+            "--print",
+            "--",
+            "hello",
+        ]
+    )
+    assert not args.streaming
+    assert args.prompt == "hello"
+    assert args.partial_messages
+    assert args.sdk_mcp_servers == ["calc"]
+
+
+@pytest.mark.asyncio
+async def test_one_shot_query_streams_sized_answer(fake_options):
+    workload = FakeCLIWorkload(text_bytes=100, delta_bytes=10)
+    options = fake_options(workload, include_partial_messages=True)
+    with anyio.fail_after(30):
+        messages = [m async for m in query(prompt="hi", options=options)]
+
+    deltas = [
+        m.event["delta"]["text"]
+        for m in messages
+        if isinstance(m, StreamEvent) and m.event["type"] == "content_block_delta"
+    ]
+    assert len(deltas) == 10
+    result = messages[-1]
+    assert isinstance(result, ResultMessage)
+    assert result.subtype == "success"
+    assert result.result == "".join(deltas)
+    assert len(result.result) == 100
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_go_through_hooks_and_permissions(fake_options):
+    seen: list[str] = []
+
+    async def pre_tool_use(hook_input, tool_use_id, context):
+        seen.append(f"hook:{hook_input['tool_name']}")
+        return {}
+
+    async def can_use_tool(tool_name, tool_input, context):
+        seen.append(f"permission:{tool_name}")
+        if len(seen) > 2:
+            return PermissionResultDeny(message="not twice")
+        return PermissionResultAllow()
+
+    workload = FakeCLIWorkload(tool_calls=2, tool_name="Bash", tool_result_bytes=32)
+    options = fake_options(
+        workload,
+        can_use_tool=can_use_tool,
+        hooks={"PreToolUse": [HookMatcher(matcher="Bash", hooks=[pre_tool_use])]},
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("run it")
+            messages = [m async for m in client.receive_response()]
+
+    assert seen == ["hook:Bash", "permission:Bash", "hook:Bash", "permission:Bash"]
+    results = tool_results(messages)
+    assert [r.is_error for r in results] == [False, True]
+    assert len(results[0].content) == 32
+    assert results[1].content == "not twice"
+    assert isinstance(messages[-1], ResultMessage)
+
+
+@pytest.mark.asyncio
+async def test_sdk_mcp_tool_is_called(fake_options):
+    @tool("add", "Add two numbers", {"a": int, "b": int})
+    async def add(args):
+        return {"content": [{"type": "text", "text": str(args["a"] + args["b"])}]}
+
+    workload = FakeCLIWorkload(
+        script=[
+            {
+                "tools": [{"name": "mcp__calc__add", "input": {"a": 2, "b": 3}}],
+                "text": "done",
+            }
+        ]
+    )
+    options = fake_options(
+        workload,
+        mcp_servers={"calc": create_sdk_mcp_server("calc", tools=[add])},
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("add")
+            messages = [m async for m in client.receive_response()]
+
+    assert tool_results(messages)[0].content == [{"type": "text", "text": "5"}]
+    assert messages[-1].result == "done"
+
+
+@pytest.mark.asyncio
+async def test_interrupt_ends_the_turn(fake_options):
+    workload = FakeCLIWorkload(first_token_latency=30)
+    with anyio.fail_after(15):
+        async with ClaudeSDKClient(fake_options(workload)) as client:
+            await client.query("slow")
+            await anyio.sleep(0.2)
+            await client.interrupt()
+            messages = [m async for m in client.receive_response()]
+
+    assert not any(isinstance(m, AssistantMessage) for m in messages)
+    assert messages[-1].subtype == "error_during_execution"
+    assert messages[-1].is_error
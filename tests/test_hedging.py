@@ -0,0 +1,62 @@
+"""Tests for hedged queries."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    HedgePolicy,
+    MetricsRegistry,
+    ResultMessage,
+    query,
+)
+from claude_agent_sdk._internal.hedge import hedge_delay
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+
+def test_delay_learned_from_query_latencies():
+    registry = MetricsRegistry()
+    policy = HedgePolicy(max_extra_cost_usd=1.0, percentile=0.9, min_samples=10)
+    assert hedge_delay(policy, registry) == policy.delay
+
+    # Nine quick queries and a slow one
+    for _ in range(9):
+        registry.query_seconds.observe(0.8, "success")
+    registry.query_seconds.observe(12.0, "success")
+    registry.query_seconds.observe(100.0, "error_during_execution")
+    assert registry.query_seconds.count("success") == 10
+    assert hedge_delay(policy, registry) == pytest.approx(1.0)
+    assert registry.query_seconds.quantile(0.95, "success") == pytest.approx(12.5)
+    assert hedge_delay(HedgePolicy(max_extra_cost_usd=1.0), registry) == 2.0
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_against_stalled_attempt(fake_options, tmp_path):
+    registry = MetricsRegistry()
+    policy = HedgePolicy(max_extra_cost_usd=0.01, delay=0.2)
+    workload = FakeCLIWorkload(stall_once=str(tmp_path / "stalled"), cost_usd=0.002)
+    options = fake_options(workload, metrics=registry, hedge=policy)
+    with anyio.fail_after(15):
+        messages = [message async for message in query(prompt="hi", options=options)]
+
+    result = messages[-1]
+    assert isinstance(result, ResultMessage) and result.subtype == "success"
+    assert sum(isinstance(m, ResultMessage) for m in messages) == 1
+    assert (policy.hedges, policy.hedge_wins, policy.skipped) == (1, 1, 0)
+    # Only the hedge counts against the budget, and nothing stays reserved
+    assert policy.spent_usd == pytest.approx(0.002)
+    assert policy.remaining_usd() == pytest.approx(0.008)
+    [sample] = registry.to_dict()["claude_sdk_hedged_queries_total"]
+    assert sample["labels"] == {"outcome": "hedge"}
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_once_budget_is_spent(fake_options, tmp_path):
+    policy = HedgePolicy(max_extra_cost_usd=0.0, delay=0.05)
+    workload = FakeCLIWorkload(stall_once=str(tmp_path / "stalled"), stall_seconds=0.5)
+    options = fake_options(workload, hedge=policy)
+    with anyio.fail_after(15):
+        messages = [message async for message in query(prompt="hi", options=options)]
+
+    assert isinstance(messages[-1], ResultMessage)
+    assert messages[-1].subtype == "success"
+    assert (policy.hedges, policy.skipped, policy.spent_usd) == (0, 1, 0.0)
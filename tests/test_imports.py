@@ -0,0 +1,31 @@
+"""Tests that importing the SDK stays lightweight."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import claude_agent_sdk
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_import_does_not_load_mcp():
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+        "import claude_agent_sdk; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'mcp'))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_sdk_mcp_server_is_importable_on_demand():
+    from claude_agent_sdk import SdkMcpServer
+    from claude_agent_sdk._internal.sdk_mcp_server import (
+        SdkMcpServer as InternalServer,
+    )
+
+    assert SdkMcpServer is InternalServer
+    assert "SdkMcpServer" in claude_agent_sdk.__all__
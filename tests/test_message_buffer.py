@@ -0,0 +1,148 @@
+"""Tests for the spill-to-disk message buffer."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import PermissionResultAllow
+from claude_agent_sdk._internal.message_buffer import SpillBuffer
+from claude_agent_sdk._internal.query import Query
+from claude_agent_sdk._internal.transport import Transport
+from claude_agent_sdk.types import RawMessage
+
+
+class TestSpillBuffer:
+    @pytest.mark.asyncio
+    async def test_keeps_order_across_memory_and_disk(self, tmp_path):
+        buffer = SpillBuffer(memory_limit=2, directory=tmp_path)
+        for i in range(5):
+            await buffer.send({"n": i})
+        assert buffer.stats() == {
+            "in_memory": 2,
+            "on_disk": 3,
+            "spilled": 3,
+            "peak_on_disk": 3,
+        }
+
+        received = [(await buffer.__anext__())["n"] for _ in range(3)]
+        # Newer messages queue behind the spilled ones
+        await buffer.send({"n": 5})
+        received += [(await buffer.__anext__())["n"] for _ in range(3)]
+        assert received == [0, 1, 2, 3, 4, 5]
+        assert buffer.stats()["on_disk"] == 0
+        buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_raw_messages_round_trip(self):
+        buffer = SpillBuffer(memory_limit=1)
+        line = b'{"type":"assistant","session_id":"s1"}'
+        await buffer.send({"type": "system"})
+        await buffer.send(RawMessage(data=line, type="assistant", session_id="s1"))
+        assert await buffer.__anext__() == {"type": "system"}
+        assert await buffer.__anext__() == RawMessage(
+            data=line, type="assistant", session_id="s1"
+        )
+        buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_ends_iteration(self):
+        buffer = SpillBuffer(memory_limit=1)
+        await buffer.send({"n": 0})
+        buffer.close()
+        assert [m async for m in buffer] == []
+        with pytest.raises(anyio.ClosedResourceError):
+            await buffer.send({"n": 1})
+
+
+def _assistant(i: int) -> dict:
+    return {
+        "type": "assistant",
+        "message": {"model": "m", "content": [{"type": "text", "text": str(i)}]},
+    }
+
+
+class _BurstTransport(Transport):
+    """Sends many data messages, then a permission request."""
+
+    def __init__(self):
+        self.written: list[str] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        self.written.append(data)
+
+    def read_messages(self):
+        async def _read():
+            for i in range(20):
+                yield _assistant(i)
+            yield {
+                "type": "control_request",
+                "request_id": "perm-1",
+                "request": {
+                    "subtype": "can_use_tool",
+                    "tool_name": "Read",
+                    "input": {},
+                    "permission_suggestions": None,
+                },
+            }
+
+        return _read()
+
+    async def close(self) -> None:
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+async def _allow(tool_name, input_data, context):
+    return PermissionResultAllow()
+
+
+@pytest.mark.asyncio
+async def test_spill_policy_answers_control_requests_without_a_consumer():
+    transport = _BurstTransport()
+    query = Query(
+        transport=transport,
+        is_streaming_mode=True,
+        can_use_tool=_allow,
+        buffer_size=4,
+        buffer_policy="spill",
+    )
+    await query.start()
+    with anyio.fail_after(5):
+        while not transport.written:
+            await anyio.sleep(0.01)
+    assert "perm-1" in transport.written[0]
+    assert query.buffer_stats["spilled"] > 0
+
+    received = []
+    async for message in query.receive_messages():
+        received.append(message["message"]["content"][0]["text"])
+    assert received == [str(i) for i in range(20)]
+    await query.close()
+
+
+@pytest.mark.asyncio
+async def test_block_policy_stalls_control_requests():
+    transport = _BurstTransport()
+    query = Query(
+        transport=transport,
+        is_streaming_mode=True,
+        can_use_tool=_allow,
+        buffer_size=4,
+    )
+    await query.start()
+    await anyio.sleep(0.05)
+    assert transport.written == []
+    assert query.buffer_stats is None
+    await query.close()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        Query(transport=_BurstTransport(), is_streaming_mode=True, buffer_policy="drop")  # type: ignore[arg-type]
@@ -6,6 +6,7 @@ from claude_agent_sdk._errors import MessageParseError
 from claude_agent_sdk._internal.message_parser import parse_message
 from claude_agent_sdk.types import (
     AssistantMessage,
+    ContentBlockView,
     ResultMessage,
     SystemMessage,
     TextBlock,
@@ -282,3 +283,87 @@ class TestMessageParser:
         with pytest.raises(MessageParseError) as exc_info:
             parse_message(data)
         assert exc_info.value.data == data
+
+
+class TestLazyMessageParser:
+    """Test lazy content block materialization."""
+
+    def _assistant_data(self):
+        return {
+            "type": "assistant",
+            "message": {
+                "model": "claude-opus-4-1-20250805",
+                "content": [
+                    {"type": "text", "text": "Reading"},
+                    {"type": "server_tool_use", "id": "srv"},  # Unknown: skipped
+                    {
+                        "type": "tool_use",
+                        "id": "tool_1",
+                        "name": "Read",
+                        "input": {"file_path": "/x"},
+                    },
+                ],
+            },
+        }
+
+    def test_lazy_matches_eager(self):
+        """Test that lazy content compares equal to eager content."""
+        data = self._assistant_data()
+        eager = parse_message(data)
+        lazy = parse_message(data, lazy=True)
+
+        assert isinstance(lazy, AssistantMessage)
+        assert isinstance(lazy.content, ContentBlockView)
+        assert len(lazy.content) == 2
+        assert lazy.content == eager.content
+        assert lazy == eager
+        assert lazy.raw is data
+        assert eager.raw is None
+
+    def test_blocks_built_on_first_access_and_cached(self):
+        """Test that blocks are only constructed when accessed."""
+        lazy = parse_message(self._assistant_data(), lazy=True)
+
+        texts = list(lazy.content.blocks_of_type("text"))
+        assert texts == [TextBlock(text="Reading")]
+        assert list(lazy.content._cache) == [0]
+
+        assert lazy.content[-1] is lazy.content[1]
+        assert isinstance(lazy.content[1], ToolUseBlock)
+        assert lazy.content[0:1] == [TextBlock(text="Reading")]
+
+    def test_raw_passthrough(self):
+        """Test that raw blocks are available without materializing."""
+        data = self._assistant_data()
+        lazy = parse_message(data, lazy=True)
+        assert lazy.content.raw is data["message"]["content"]
+        assert lazy.content._cache == {}
+
+    def test_lazy_user_message(self):
+        """Test lazy parsing for user messages with list and string content."""
+        data = {
+            "type": "user",
+            "message": {
+                "content": [
+                    {"type": "tool_result", "tool_use_id": "tool_1", "content": "x"}
+                ]
+            },
+        }
+        message = parse_message(data, lazy=True)
+        assert isinstance(message, UserMessage)
+        assert message.content[0] == ToolResultBlock(tool_use_id="tool_1", content="x")
+
+        message = parse_message(
+            {"type": "user", "message": {"content": "plain"}}, lazy=True
+        )
+        assert message.content == "plain"
+
+    def test_lazy_missing_block_field_raises_on_access(self):
+        """Test that malformed blocks raise MessageParseError when accessed."""
+        data = {
+            "type": "assistant",
+            "message": {"model": "m", "content": [{"type": "text"}]},
+        }
+        message = parse_message(data, lazy=True)
+        with pytest.raises(MessageParseError, match="Missing required field"):
+            message.content[0]
@@ -0,0 +1,143 @@
+"""Tests for the in-process metrics registry."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeSDKClient,
+    HookMatcher,
+    MetricsRegistry,
+    PermissionResultAllow,
+    create_sdk_mcp_server,
+    tool,
+)
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+
+def samples(registry: MetricsRegistry, name: str) -> list[dict]:
+    return registry.to_dict()[name]
+
+
+def value(registry: MetricsRegistry, name: str, **labels: str) -> float:
+    for sample in samples(registry, name):
+        if all(sample["labels"].get(k) == v for k, v in labels.items()):
+            return sample.get("value", sample.get("count"))
+    return 0
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry(per_session=True)
+    recorder = registry.session()
+    recorder.set_session('s"1')
+    recorder.message_read("assistant")
+    recorder.message_read("assistant")
+    recorder.control_request("interrupt", "outgoing", 0.003, failed=False)
+    recorder.process_exited(0)
+
+    text = registry.to_prometheus()
+    assert "# TYPE claude_sdk_messages_read_total counter" in text
+    assert 'claude_sdk_messages_read_total{session="s\\"1",type="assistant"} 2' in text
+    assert (
+        'claude_sdk_control_request_seconds_bucket{session="s\\"1",'
+        'subtype="interrupt",le="0.0025"} 0' in text
+    )
+    assert (
+        'claude_sdk_control_request_seconds_bucket{session="s\\"1",'
+        'subtype="interrupt",le="0.005"} 1' in text
+    )
+    assert 'le="+Inf"} 1' in text
+    assert 'claude_sdk_process_exits_total{exit_code="0"} 1' in text
+
+
+def test_per_session_default_and_remove_session():
+    registry = MetricsRegistry()
+    recorder = registry.session()
+    recorder.set_session("abc")
+    recorder.message_read("result")
+    assert samples(registry, "claude_sdk_messages_read_total")[0]["labels"] == {
+        "session": "",
+        "type": "result",
+    }
+
+    registry = MetricsRegistry(per_session=True)
+    for session_id in ("a", "b"):
+        recorder = registry.session()
+        recorder.set_session(session_id)
+        recorder.message_read("result")
+    registry.remove_session("a")
+    assert [
+        s["labels"]["session"]
+        for s in samples(registry, "claude_sdk_messages_read_total")
+    ] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_client_records_session_metrics(fake_options):
+    @tool("add", "Add two numbers", {"a": int, "b": int})
+    async def add(args):
+        return {"content": [{"type": "text", "text": str(args["a"] + args["b"])}]}
+
+    async def allow(tool_name, tool_input, context):
+        return PermissionResultAllow()
+
+    async def hook(hook_input, tool_use_id, context):
+        return {}
+
+    registry = MetricsRegistry(per_session=True)
+    workload = FakeCLIWorkload(
+        script=[{"tools": [{"name": "mcp__calc__add", "input": {"a": 1, "b": 2}}]}]
+    )
+    options = fake_options(
+        workload,
+        metrics=registry,
+        can_use_tool=allow,
+        hooks={"PreToolUse": [HookMatcher(hooks=[hook])]},
+        mcp_servers={"calc": create_sdk_mcp_server("calc", tools=[add])},
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("add")
+            async for _ in client.receive_response():
+                pass
+            buffered = samples(registry, "claude_sdk_message_buffer_depth")
+
+    assert buffered and buffered[0]["value"] == 0
+    assert samples(registry, "claude_sdk_message_buffer_depth") == []
+    session_id = next(
+        s["labels"]["session"]
+        for s in samples(registry, "claude_sdk_messages_read_total")
+        if s["labels"]["type"] == "result"
+    )
+    assert session_id
+    assert value(registry, "claude_sdk_messages_read_total", type="result") == 1
+    assert value(registry, "claude_sdk_bytes_read_total", session=session_id) > 0
+    assert value(registry, "claude_sdk_parse_seconds", stage="json") > 0
+    assert value(registry, "claude_sdk_parse_seconds", stage="message") > 0
+    # initialize goes out before the CLI has reported a session id
+    assert (
+        value(
+            registry,
+            "claude_sdk_control_request_seconds",
+            session="",
+            subtype="initialize",
+        )
+        == 1
+    )
+    for subtype in ("can_use_tool", "hook_callback", "mcp_message"):
+        assert (
+            value(
+                registry,
+                "claude_sdk_control_requests_total",
+                session=session_id,
+                subtype=subtype,
+                direction="incoming",
+            )
+            == 1
+        )
+    assert value(registry, "claude_sdk_callback_seconds", subtype="mcp_message") == 1
+    assert (
+        value(registry, "claude_sdk_mcp_tool_seconds", server="calc", tool="add") == 1
+    )
+    assert value(registry, "claude_sdk_control_errors_total") == 0
+    assert value(registry, "claude_sdk_process_spawn_seconds") == 1
+    assert len(samples(registry, "claude_sdk_process_exits_total")) == 1
@@ -0,0 +1,216 @@
+"""Tests for the connected client pool."""
+
+import json
+
+import anyio
+import pytest
+
+from claude_agent_sdk import ClaudeAgentOptions, ClientPool, ResultMessage
+from claude_agent_sdk._internal.transport import Transport
+from claude_agent_sdk.pool import options_fingerprint
+
+
+class ChatTransport(Transport):
+    """Answers initialize and echoes each user message back as a result."""
+
+    instances: list["ChatTransport"] = []
+
+    def __init__(self, options: ClaudeAgentOptions, fail_connect: bool = False):
+        self.options = options
+        self._fail_connect = fail_connect
+        self._send, self._receive = anyio.create_memory_object_stream[dict](100)
+        self._ready = False
+        self.closed = False
+        ChatTransport.instances.append(self)
+
+    async def connect(self) -> None:
+        if self._fail_connect:
+            raise ConnectionError("spawn failed")
+        self._ready = True
+
+    async def write(self, data: str) -> None:
+        message = json.loads(data)
+        if message["type"] == "control_request":
+            await self._send.send(
+                {
+                    "type": "control_response",
+                    "response": {
+                        "subtype": "success",
+                        "request_id": message["request_id"],
+                        "response": {},
+                    },
+                }
+            )
+        elif message["type"] == "user":
+            await self._send.send(
+                {
+                    "type": "result",
+                    "subtype": "success",
+                    "duration_ms": 1,
+                    "duration_api_ms": 1,
+                    "is_error": False,
+                    "num_turns": 1,
+                    "session_id": "s",
+                    "result": message["message"]["content"],
+                }
+            )
+
+    def read_messages(self):
+        async def _read():
+            async for message in self._receive:
+                yield message
+
+        return _read()
+
+    def exit(self) -> None:
+        """Simulate the CLI process exiting."""
+        self._send.close()
+
+    async def close(self) -> None:
+        self._ready = False
+        self.closed = True
+        self._send.close()
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    async def end_input(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_instances():
+    ChatTransport.instances = []
+
+
+async def _ask(client, prompt: str) -> str | None:
+    await client.query(prompt)
+    async for message in client.receive_response():
+        if isinstance(message, ResultMessage):
+            return message.result
+    return None
+
+
+@pytest.mark.asyncio
+async def test_leases_prewarmed_client_and_replaces_it():
+    async with ClientPool(transport_factory=ChatTransport) as pool:
+        await pool.prewarm()
+        assert pool.stats()["idle"] == 1
+
+        async with pool.lease() as client:
+            assert pool.stats()["leased"] == 1
+            assert await _ask(client, "hello") == "hello"
+
+        # The used client is retired and a fresh one connected in its place
+        with anyio.fail_after(5):
+            while pool.stats()["idle"] != 1:
+                await anyio.sleep(0.01)
+        assert ChatTransport.instances[0].closed
+        stats = pool.stats()
+        assert stats["hits"] == 1
+        assert stats["spawned"] == 2
+
+    assert all(transport.closed for transport in ChatTransport.instances)
+
+
+@pytest.mark.asyncio
+async def test_waits_for_capacity():
+    async with ClientPool(
+        max_size=1, min_idle=0, transport_factory=ChatTransport
+    ) as pool:
+        order = []
+
+        async def use(name: str) -> None:
+            async with pool.lease() as client:
+                order.append(f"{name} start")
+                assert pool.stats()["utilization"] == 1.0
+                await _ask(client, name)
+                await anyio.sleep(0.02)
+                order.append(f"{name} end")
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(use, "a")
+            tg.start_soon(use, "b")
+
+    assert order == ["a start", "a end", "b start", "b end"]
+
+
+@pytest.mark.asyncio
+async def test_clients_are_keyed_by_options():
+    sonnet = ClaudeAgentOptions(model="sonnet")
+    async with ClientPool(sonnet, transport_factory=ChatTransport) as pool:
+        async with pool.lease(ClaudeAgentOptions(model="opus")) as client:
+            assert client.options.model == "opus"
+        async with pool.lease() as client:
+            assert client.options.model == "sonnet"
+
+        # Only the default options are kept warm; one-off options are not
+        with anyio.fail_after(5):
+            while pool.stats()["size"] != 1:
+                await anyio.sleep(0.01)
+        assert [c.client.options.model for c in pool._live()] == ["sonnet"]
+        assert len(pool._warm) == 1
+
+    assert options_fingerprint(sonnet) == options_fingerprint(
+        ClaudeAgentOptions(model="sonnet")
+    )
+    assert options_fingerprint(sonnet) != options_fingerprint(
+        ClaudeAgentOptions(model="opus")
+    )
+
+
+@pytest.mark.asyncio
+async def test_evicts_idle_client_whose_process_exited():
+    async with ClientPool(
+        health_check_interval=0.01, transport_factory=ChatTransport
+    ) as pool:
+        await pool.prewarm()
+        ChatTransport.instances[0].exit()
+        await anyio.sleep(0.05)
+        assert pool.stats()["evicted"] == 1
+        async with pool.lease() as client:
+            assert client._transport is ChatTransport.instances[1]
+            assert await _ask(client, "hi") == "hi"
+
+
+@pytest.mark.asyncio
+async def test_error_in_lease_evicts_client():
+    async with ClientPool(min_idle=0, transport_factory=ChatTransport) as pool:
+        with pytest.raises(RuntimeError):
+            async with pool.lease():
+                raise RuntimeError("request failed")
+        stats = pool.stats()
+        assert stats["errors"] == 1
+        assert stats["evicted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_failure_is_raised_to_lease():
+    def factory(options: ClaudeAgentOptions) -> ChatTransport:
+        return ChatTransport(options, fail_connect=True)
+
+    async with ClientPool(min_idle=0, transport_factory=factory) as pool:
+        with pytest.raises(ConnectionError):
+            async with pool.lease():
+                pass
+        assert pool.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_wedged_clients_close_concurrently(fake_options):
+    from claude_agent_sdk.testing import FakeCLIWorkload
+
+    options = fake_options(
+        FakeCLIWorkload(hang_on_exit=True),
+        close_grace_period=0.5,
+    )
+    with anyio.fail_after(20):
+        pool = ClientPool(options, max_size=4, min_idle=0)
+        async with pool:
+            await pool.prewarm(count=4)
+            started = anyio.current_time()
+        elapsed = anyio.current_time() - started
+
+    # One grace period for all four, not one each
+    assert pool.stats()["max_close_seconds"] >= 0.5
+    assert elapsed < 1.5
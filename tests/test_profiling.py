@@ -0,0 +1,94 @@
+"""Tests for profiling hooks."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeSDKClient,
+    HookMatcher,
+    PermissionResultAllow,
+    Profiler,
+    StageTimer,
+    create_sdk_mcp_server,
+    query,
+    tool,
+)
+from claude_agent_sdk.profiling import STAGES
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+
+def test_stage_context_manager_reports_errors():
+    calls = []
+
+    class Recorder(Profiler):
+        def before(self, stage, info):
+            calls.append(("before", stage, dict(info)))
+            return len(calls)
+
+        def after(self, stage, info, token, error):
+            calls.append(("after", stage, dict(info), token, type(error)))
+
+    profiler = Recorder()
+    with profiler.stage("json.decode", bytes=3) as info:
+        info["complete"] = True
+    with pytest.raises(ValueError), profiler.stage("callback", subtype="x"):
+        raise ValueError
+
+    assert calls == [
+        ("before", "json.decode", {"bytes": 3}),
+        ("after", "json.decode", {"bytes": 3, "complete": True}, 1, type(None)),
+        ("before", "callback", {"subtype": "x"}),
+        ("after", "callback", {"subtype": "x"}, 3, ValueError),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_client_calls_profiler_on_every_stage(fake_options):
+    @tool("add", "Add two numbers", {"a": int, "b": int})
+    async def add(args):
+        return {"content": [{"type": "text", "text": str(args["a"] + args["b"])}]}
+
+    async def allow(tool_name, tool_input, context):
+        return PermissionResultAllow()
+
+    async def hook(hook_input, tool_use_id, context):
+        return {}
+
+    timer = StageTimer()
+    workload = FakeCLIWorkload(
+        script=[{"tools": [{"name": "mcp__calc__add", "input": {"a": 1, "b": 2}}]}]
+    )
+    options = fake_options(
+        workload,
+        profiler=timer,
+        can_use_tool=allow,
+        hooks={"PreToolUse": [HookMatcher(hooks=[hook])]},
+        mcp_servers={"calc": create_sdk_mcp_server("calc", tools=[add])},
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("add")
+            async for _ in client.receive_response():
+                pass
+
+    stats = timer.stats()
+    assert set(stats) == set(STAGES)
+    # initialize, plus the CLI's permission, hook and MCP requests
+    assert stats["control.send"]["count"] == 1
+    assert stats["control.receive"]["count"] >= 3
+    assert stats["callback"]["count"] == 2
+    assert stats["parse_message"]["count"] >= 3
+    assert all(s["total"] >= 0 for s in stats.values())
+
+
+@pytest.mark.asyncio
+async def test_raw_query_reads_are_profiled(fake_options):
+    timer = StageTimer()
+    options = fake_options(profiler=timer, raw_messages=True)
+    with anyio.fail_after(30):
+        messages = [message async for message in query(prompt="hi", options=options)]
+
+    assert messages
+    stats = timer.stats()
+    assert stats["transport.read"]["count"] >= 1
+    assert "json.decode" not in stats
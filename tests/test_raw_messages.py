@@ -0,0 +1,176 @@
+"""Tests for undecoded message passthrough."""
+
+import json
+
+import pytest
+
+from claude_agent_sdk import RawMessage, TurnTracer, query_raw
+from claude_agent_sdk._internal.query import Query
+from claude_agent_sdk._internal.raw_message import sniff_message
+from claude_agent_sdk._internal.transport import Transport
+
+
+class RawTransport(Transport):
+    """Transport that yields pre-encoded lines and records writes."""
+
+    def __init__(self, lines: list[bytes]):
+        self.lines = lines
+        self.written: list[str] = []
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        self.written.append(data)
+
+    def read_messages(self):
+        async def _read():
+            for line in self.lines:
+                yield json.loads(line)
+
+        return _read()
+
+    def read_raw_messages(self):
+        async def _read():
+            for line in self.lines:
+                yield line
+
+        return _read()
+
+    async def close(self) -> None:
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+ASSISTANT = (
+    b'{"type":"assistant","message":{"content":[{"type":"tool_use","id":"t1",'
+    b'"name":"Read","input":{"session_id":"inner"}}],"model":"m"},'
+    b'"parent_tool_use_id":null,"session_id":"session-1"}'
+)
+RESULT = (
+    b'{"type":"result","subtype":"success","duration_ms":1,"duration_api_ms":1,'
+    b'"is_error":false,"num_turns":1,"session_id":"session-1"}'
+)
+
+
+class TestSniffMessage:
+    def test_reads_type_and_session_id(self):
+        raw = sniff_message(ASSISTANT)
+        assert raw == RawMessage(
+            data=ASSISTANT, type="assistant", session_id="session-1"
+        )
+        assert raw.json()["message"]["model"] == "m"
+
+    def test_falls_back_when_type_is_not_first(self):
+        line = b'{"message": {"type": "nested"}, "type": "user", "session_id": "s"}'
+        raw = sniff_message(line)
+        assert raw.type == "user"
+        assert raw.session_id == "s"
+
+    def test_nested_session_id_after_the_top_level_one(self):
+        line = (
+            b'{"type":"user","session_id":"s","message":{"content":'
+            b'[{"type":"tool_result","content":{"session_id":"inner"}}]}}'
+        )
+        raw = sniff_message(line)
+        assert raw.type == "user"
+        assert raw.session_id == "s"
+        # Only nested
+        raw = sniff_message(b'{"type":"user","message":{"session_id":"inner"}}')
+        assert raw.session_id is None
+
+    def test_missing_session_id(self):
+        raw = sniff_message(b'{"type": "system", "subtype": "init"}')
+        assert raw.type == "system"
+        assert raw.session_id is None
+
+
+class TestRawQuery:
+    @pytest.mark.asyncio
+    async def test_routes_control_messages_and_forwards_data(self):
+        control_response = json.dumps(
+            {
+                "type": "control_response",
+                "response": {
+                    "subtype": "success",
+                    "request_id": "req_x",
+                    "response": {},
+                },
+            }
+        ).encode()
+        transport = RawTransport([ASSISTANT, control_response, RESULT])
+        query = Query(transport=transport, is_streaming_mode=True, raw=True)
+        await query.start()
+
+        received = [raw async for raw in query.receive_raw_messages()]
+
+        # The bytes are forwarded unchanged; control traffic is not yielded
+        assert [raw.data for raw in received] == [ASSISTANT, RESULT]
+        assert [raw.type for raw in received] == ["assistant", "result"]
+        await query.close()
+
+    @pytest.mark.asyncio
+    async def test_receive_messages_decodes_in_raw_mode(self):
+        query = Query(
+            transport=RawTransport([RESULT]), is_streaming_mode=True, raw=True
+        )
+        await query.start()
+        received = [message async for message in query.receive_messages()]
+        assert received == [json.loads(RESULT)]
+        await query.close()
+
+    @pytest.mark.asyncio
+    async def test_receive_raw_outside_raw_mode_reencodes(self):
+        query = Query(transport=RawTransport([RESULT]), is_streaming_mode=True)
+        await query.start()
+        received = [raw async for raw in query.receive_raw_messages()]
+        assert [raw.json() for raw in received] == [json.loads(RESULT)]
+        assert received[0].type == "result"
+        await query.close()
+
+    @pytest.mark.asyncio
+    async def test_tracer_decodes_only_the_messages_it_reads(self, monkeypatch):
+        decoded = []
+        decode = RawMessage.json
+
+        def recording_json(self):
+            decoded.append(self.type)
+            return decode(self)
+
+        monkeypatch.setattr(RawMessage, "json", recording_json)
+        tracer = TurnTracer()
+        system = b'{"type":"system","subtype":"init","session_id":"session-1"}'
+        query = Query(
+            transport=RawTransport([system, ASSISTANT, RESULT]),
+            is_streaming_mode=True,
+            raw=True,
+            trace=tracer.session(),
+        )
+        await query.start()
+        received = [raw async for raw in query.receive_raw_messages()]
+        await query.close()
+
+        assert len(received) == 3
+        assert decoded == ["assistant", "result"]
+        [turn] = tracer.turns
+        assert turn.session_id == "session-1"
+
+    @pytest.mark.asyncio
+    async def test_query_raw(self):
+        transport = RawTransport([ASSISTANT, RESULT])
+        received = [raw async for raw in query_raw(prompt="Hi", transport=transport)]
+        assert [raw.data for raw in received] == [ASSISTANT, RESULT]
+
+    @pytest.mark.asyncio
+    async def test_default_transport_fallback_encodes_messages(self):
+        class DecodingTransport(RawTransport):
+            read_raw_messages = Transport.read_raw_messages
+
+        transport = DecodingTransport([RESULT])
+        lines = [line async for line in transport.read_raw_messages()]
+        assert [json.loads(line) for line in lines] == [json.loads(RESULT)]
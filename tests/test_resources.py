@@ -0,0 +1,74 @@
+"""Tests for CLI process resource sampling and soft limits."""
+
+import os
+import sys
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeSDKClient,
+    ResourceLimits,
+    ResourceUsage,
+    ResultMessage,
+)
+from claude_agent_sdk._internal.transport.resources import read_proc_usage
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+needs_proc = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="reads /proc"
+)
+
+
+@needs_proc
+def test_read_proc_usage():
+    usage = read_proc_usage(os.getpid())
+    assert usage is not None
+    assert usage.pid == os.getpid()
+    assert usage.rss_bytes > 1 << 20
+    assert usage.cpu_seconds > 0
+    assert usage.open_fds is not None and usage.open_fds >= 3
+    assert read_proc_usage(2**22 + 1) is None
+
+
+def test_limits_exceeded():
+    usage = ResourceUsage(
+        pid=1, rss_bytes=100, cpu_seconds=2.0, open_fds=None, sampled_at=0.0
+    )
+    assert ResourceLimits().exceeded(usage) == []
+    assert ResourceLimits(
+        max_rss_bytes=50, max_cpu_seconds=1.0, max_open_fds=1
+    ).exceeded(usage) == ["rss_bytes", "cpu_seconds"]
+
+
+@needs_proc
+@pytest.mark.asyncio
+async def test_soft_limit_interrupts_turn(fake_options):
+    exceeded = []
+
+    async def on_exceeded(usage, names):
+        exceeded.append((usage, names))
+
+    options = fake_options(
+        # Slow enough that the limit fires while the turn is running
+        FakeCLIWorkload(first_token_latency=5.0),
+        resource_sample_interval=0.05,
+        resource_limits=ResourceLimits(
+            max_rss_bytes=1, on_exceeded=on_exceeded, interrupt=True
+        ),
+    )
+    with anyio.fail_after(4):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("hi")
+            messages = [m async for m in client.receive_response()]
+            usage = client.get_resource_usage()
+
+    result = messages[-1]
+    assert isinstance(result, ResultMessage)
+    assert result.subtype == "error_during_execution"
+    assert result.resource_usage is not None
+    assert result.resource_usage.rss_bytes > 0
+    # Fired once, although every sample is over the limit
+    [(sampled, names)] = exceeded
+    assert names == ["rss_bytes"]
+    assert usage is not None and usage.pid == sampled.pid == result.resource_usage.pid
@@ -0,0 +1,117 @@
+"""Tests for restarting a crashed CLI."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeSDKClient,
+    RestartPolicy,
+    ResultMessage,
+)
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+
+@pytest.mark.asyncio
+async def test_crashed_cli_is_resumed(fake_options):
+    options = fake_options(
+        FakeCLIWorkload(crash_on_turn=2),
+        restart_policy=RestartPolicy(backoff=0.01),
+    )
+    results = []
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            for prompt in ("one", "two", "three"):
+                await client.query(prompt)
+                async for message in client.receive_response():
+                    if isinstance(message, ResultMessage):
+                        results.append(message)
+
+    # The second prompt was sent again to a CLI resuming the same session
+    assert [r.subtype for r in results] == ["success"] * 3
+    assert len({r.session_id for r in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_restarts_are_limited(fake_options):
+    options = fake_options(
+        FakeCLIWorkload(crash_on_turn=1),
+        restart_policy=RestartPolicy(max_restarts=0),
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            await client.query("one")
+            with pytest.raises(Exception, match="exit code 1"):
+                async for _ in client.receive_response():
+                    pass
+
+
+@pytest.mark.asyncio
+async def test_restart_from_reader_and_writer_tasks(fake_options):
+    options = fake_options(
+        FakeCLIWorkload(crash_on_turn=1),
+        restart_policy=RestartPolicy(backoff=0.01),
+    )
+    results = []
+
+    async def prompts():
+        yield {"type": "user", "message": {"role": "user", "content": "one"}}
+
+    async def read(client):
+        async for message in client.receive_messages():
+            if isinstance(message, ResultMessage):
+                results.append(message)
+                if len(results) == 2:
+                    return
+
+    with anyio.fail_after(30):
+        client = ClaudeSDKClient(options)
+        await client.connect(prompts())
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(read, client)
+                tg.start_soon(client.query, "two")
+        finally:
+            await client.disconnect()
+
+    # The streamed prompt was sent again after the crash, then "two"
+    assert [r.subtype for r in results] == ["success"] * 2
+    assert len({r.session_id for r in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_survive_a_restart(fake_options):
+    options = fake_options(
+        FakeCLIWorkload(crash_on_turn=2),
+        restart_policy=RestartPolicy(backoff=0.01),
+    )
+    results = []
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            subscription = client.subscribe()
+            for prompt in ("one", "two", "three"):
+                await client.query(prompt)
+                async for message in subscription:
+                    if isinstance(message, ResultMessage):
+                        results.append(message)
+                        break
+
+    assert [r.subtype for r in results] == ["success"] * 3
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_a_restart(fake_options):
+    options = fake_options(
+        FakeCLIWorkload(crash_on_turn=2),
+        restart_policy=RestartPolicy(backoff=0.01),
+    )
+    results = []
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            session = client.session("a")
+            for prompt in ("one", "two", "three"):
+                await session.query(prompt)
+                async for message in session.receive_response():
+                    if isinstance(message, ResultMessage):
+                        results.append(message)
+
+    assert [r.subtype for r in results] == ["success"] * 3
@@ -5,8 +5,16 @@ matching the TypeScript SDK test/sdk.test.ts pattern.
 """
 
 import base64
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 from typing import Any
+from unittest.mock import AsyncMock
 
+import anyio
 import pytest
 from mcp.types import CallToolRequest, CallToolRequestParams
 
@@ -17,6 +25,51 @@ from claude_agent_sdk import (
 )
 
 
+@tool("worker_pid", "Report the worker process id", {})
+def worker_pid(args: dict[str, Any]) -> dict[str, Any]:
+    return {"content": [{"type": "text", "text": str(os.getpid())}]}
+
+
+@tool("crash_worker", "Kill the worker process", {})
+def crash_worker(args: dict[str, Any]) -> dict[str, Any]:
+    os._exit(1)
+
+
+@tool("allocate", "Allocate memory", {"mb": int})
+def allocate(args: dict[str, Any]) -> dict[str, Any]:
+    data = bytearray(args["mb"] * 1024 * 1024)
+    return {"content": [{"type": "text", "text": str(len(data))}]}
+
+
+@tool("session_key", "Report the calling tool session", {})
+def session_key(args: dict[str, Any]) -> dict[str, Any]:
+    from claude_agent_sdk import current_tool_session
+
+    session = current_tool_session()
+    return {"content": [{"type": "text", "text": session.key if session else "-"}]}
+
+
+def _fork_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    )
+
+
+requires_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="process pool tests rely on the fork start method",
+)
+
+
+async def _call(server: Any, name: str, arguments: dict[str, Any]) -> Any:
+    call_handler = server.request_handlers[CallToolRequest]
+    request = CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(name=name, arguments=arguments),
+    )
+    return await call_handler(request)
+
+
 @pytest.mark.asyncio
 async def test_sdk_mcp_server_handlers():
     """Test that SDK MCP server handlers are properly registered."""
@@ -263,3 +316,304 @@ async def test_image_content_support():
     assert len(tool_executions) == 1
     assert tool_executions[0]["name"] == "generate_chart"
     assert tool_executions[0]["args"]["title"] == "Sales Report"
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_sync_and_async_handlers():
+    """Test that tools run on the executor instead of the event loop thread."""
+    loop_thread = threading.get_ident()
+
+    @tool("sync_thread", "Report thread", {})
+    def sync_thread(args: dict[str, Any]) -> dict[str, Any]:
+        return {"content": [{"type": "text", "text": str(threading.get_ident())}]}
+
+    @tool("async_thread", "Report thread", {})
+    async def async_thread(args: dict[str, Any]) -> dict[str, Any]:
+        return {"content": [{"type": "text", "text": str(threading.get_ident())}]}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        server_config = create_sdk_mcp_server(
+            name="threaded", tools=[sync_thread, async_thread], executor=executor
+        )
+        server = server_config["instance"]
+
+        for name in ("sync_thread", "async_thread"):
+            result = await _call(server, name, {})
+            assert not result.root.isError
+            assert int(result.root.content[0].text) != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_does_not_start_on_executor():
+    """Test that cancelling a queued call cancels it on the executor."""
+    release = threading.Event()
+    ran: list[str] = []
+
+    @tool("block", "Block the only worker", {})
+    def block(args: dict[str, Any]) -> dict[str, Any]:
+        release.wait(5)
+        return {"content": [{"type": "text", "text": "done"}]}
+
+    @tool("queued", "Record that it ran", {})
+    def queued(args: dict[str, Any]) -> dict[str, Any]:
+        ran.append("queued")
+        return {"content": [{"type": "text", "text": "ran"}]}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        server = create_sdk_mcp_server(
+            name="cancel", tools=[block, queued], executor=executor
+        )["instance"]
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_call, server, "block", {})
+            await anyio.sleep(0.05)
+            with anyio.move_on_after(0.05):
+                await _call(server, "queued", {})
+            release.set()
+
+    assert ran == []
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test_process_executor_runs_module_level_handler():
+    """Test that @tool-decorated module-level handlers run in worker processes."""
+    server_config = create_sdk_mcp_server(
+        name="procs", tools=[worker_pid], executor=_fork_pool
+    )
+    server = server_config["instance"]
+
+    result = await _call(server, "worker_pid", {})
+    assert not result.root.isError
+    assert int(result.root.content[0].text) != os.getpid()
+
+
+@requires_fork
+@pytest.mark.asyncio
+async def test_process_executor_restarts_after_worker_crash():
+    """Test that a crashed worker fails its call and the pool is replaced."""
+    server_config = create_sdk_mcp_server(
+        name="procs", tools=[worker_pid, crash_worker], executor=_fork_pool
+    )
+    server = server_config["instance"]
+
+    result = await _call(server, "crash_worker", {})
+    assert result.root.isError
+    assert "crashed" in result.root.content[0].text
+
+    result = await _call(server, "worker_pid", {})
+    assert not result.root.isError
+
+
+@requires_fork
+@pytest.mark.skipif(
+    not Path("/proc/self/statm").exists(), reason="requires Linux /proc"
+)
+@pytest.mark.asyncio
+async def test_process_executor_enforces_memory_limit():
+    """Test that a call exceeding its memory budget fails without poisoning the pool."""
+    server_config = create_sdk_mcp_server(
+        name="mem",
+        tools=[allocate],
+        executor=_fork_pool,
+        memory_limit=64 * 1024 * 1024,
+    )
+    server = server_config["instance"]
+
+    result = await _call(server, "allocate", {"mb": 512})
+    assert result.root.isError
+
+    result = await _call(server, "allocate", {"mb": 1})
+    assert not result.root.isError
+
+
+def test_memory_limit_requires_process_pool():
+    """Test that per-call memory limits are rejected for thread pools."""
+    with pytest.raises(ValueError, match="memory_limit"):
+        create_sdk_mcp_server(name="mem", tools=[worker_pid], memory_limit=1024)
+
+    with (
+        ThreadPoolExecutor(max_workers=1) as executor,
+        pytest.raises(ValueError, match="ProcessPoolExecutor"),
+    ):
+        create_sdk_mcp_server(
+            name="mem", tools=[worker_pid], executor=executor, memory_limit=1024
+        )
+
+
+@pytest.mark.asyncio
+async def test_shared_server_isolates_sessions():
+    """Test that one server attached to several queries keeps per-session state."""
+    from claude_agent_sdk import current_tool_session
+    from claude_agent_sdk._internal.query import Query
+
+    @tool("remember", "Remember a value", {"value": str})
+    async def remember(args: dict[str, Any]) -> dict[str, Any]:
+        session = current_tool_session()
+        assert session is not None
+        seen = session.state.setdefault("values", [])
+        seen.append(args["value"])
+        return {"content": [{"type": "text", "text": ",".join(seen)}]}
+
+    shared = create_sdk_mcp_server(name="shared", tools=[remember])
+    server = shared["instance"]
+
+    queries = [
+        Query(
+            transport=AsyncMock(),
+            is_streaming_mode=True,
+            sdk_mcp_servers={"shared": server},
+        )
+        for _ in range(2)
+    ]
+
+    async def call(query: Query, value: str) -> str:
+        response = await query._handle_sdk_mcp_request(
+            "shared",
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "tools/call",
+                "params": {"name": "remember", "arguments": {"value": value}},
+            },
+        )
+        return response["result"]["content"][0]["text"]
+
+    assert await call(queries[0], "a") == "a"
+    assert await call(queries[1], "x") == "x"
+    assert await call(queries[0], "b") == "a,b"
+
+    stats = server.stats()
+    assert stats["sessions"] == 2
+    assert stats["calls"] == 3
+    assert stats["in_flight"] == 0
+
+    await queries[0].close()
+    assert server.stats()["sessions"] == 1
+    await queries[1].close()
+    assert server.sessions == []
+
+
+@pytest.mark.parametrize(
+    "executor",
+    [
+        lambda: ThreadPoolExecutor(max_workers=1),
+        pytest.param(_fork_pool, marks=requires_fork),
+    ],
+    ids=["threads", "processes"],
+)
+@pytest.mark.asyncio
+async def test_executor_handlers_see_tool_session(executor):
+    """Test that handlers on an executor see the calling tool session."""
+    from claude_agent_sdk._internal.tool_session import tool_session_scope
+    from claude_agent_sdk.types import ToolSession
+
+    server = create_sdk_mcp_server(
+        name="sessions", tools=[session_key], executor=executor
+    )["instance"]
+    try:
+        with tool_session_scope(ToolSession(key="sessions:1")):
+            result = await _call(server, "session_key", {})
+        assert result.root.content[0].text == "sessions:1"
+        result = await _call(server, "session_key", {})
+        assert result.root.content[0].text == "-"
+    finally:
+        server._tool_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shared_server_max_concurrency():
+    """Test that max_concurrency bounds tool calls across all callers."""
+    running = 0
+    peak = 0
+
+    @tool("slow", "Slow tool", {})
+    async def slow(args: dict[str, Any]) -> dict[str, Any]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.01)
+        running -= 1
+        return {"content": [{"type": "text", "text": "done"}]}
+
+    server = create_sdk_mcp_server(name="bounded", tools=[slow], max_concurrency=2)[
+        "instance"
+    ]
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(_call, server, "slow", {})
+
+    assert peak == 2
+    stats = server.stats()
+    assert stats["calls"] == 6
+    assert stats["peak_in_flight"] == 2
+    assert stats["max_concurrency"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hot_swap_tools_notifies_sessions():
+    """Test that adding/removing tools updates tools/list and notifies the CLI."""
+    from claude_agent_sdk._internal.query import Query
+
+    @tool("first", "First tool", {})
+    async def first(args: dict[str, Any]) -> dict[str, Any]:
+        return {"content": [{"type": "text", "text": "first"}]}
+
+    @tool("second", "Second tool", {"x": int})
+    async def second(args: dict[str, Any]) -> dict[str, Any]:
+        return {"content": [{"type": "text", "text": f"second {args['x']}"}]}
+
+    # Start empty: tools can still be added later
+    server = create_sdk_mcp_server(name="dynamic")["instance"]
+
+    transport = AsyncMock()
+    query = Query(
+        transport=transport,
+        is_streaming_mode=True,
+        sdk_mcp_servers={"dynamic": server},
+    )
+
+    async def request(method: str, params: dict[str, Any] | None = None) -> Any:
+        return await query._handle_sdk_mcp_request(
+            "dynamic",
+            {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}},
+        )
+
+    async with anyio.create_task_group() as tg:
+        query._tg = tg
+
+        init = await request("initialize")
+        assert init["result"]["capabilities"]["tools"] == {"listChanged": True}
+
+        server.add_tool(first)
+        server.add_tool(second)
+        listed = await request("tools/list")
+        assert [t["name"] for t in listed["result"]["tools"]] == ["first", "second"]
+
+        server.remove_tool("first")
+        listed = await request("tools/list")
+        assert [t["name"] for t in listed["result"]["tools"]] == ["second"]
+
+        called = await request("tools/call", {"name": "second", "arguments": {"x": 2}})
+        assert called["result"]["content"][0]["text"] == "second 2"
+
+        removed = await request("tools/call", {"name": "first", "arguments": {}})
+        assert "not found" in removed["result"]["content"][0]["text"]
+        query._tg = None
+
+    notifications = [
+        json.loads(call.args[0])
+        for call in transport.write.call_args_list
+        if "list_changed" in call.args[0]
+    ]
+    assert len(notifications) == 3
+    assert notifications[0]["type"] == "control_request"
+    assert notifications[0]["request"] == {
+        "subtype": "mcp_message",
+        "server_name": "dynamic",
+        "message": {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"},
+    }
+
+    await query.close()
+    server.add_tool(first)  # No longer attached - nothing to notify
+    assert len(transport.write.call_args_list) == 3
@@ -0,0 +1,208 @@
+"""Tests for the incremental JSON parser and StreamEvent assembler."""
+
+import json
+import random
+
+import pytest
+
+from claude_agent_sdk import (
+    IncrementalJSONParser,
+    PartialJSONError,
+    StreamAssembler,
+)
+from claude_agent_sdk.types import (
+    AssistantMessage,
+    StreamEvent,
+    TextBlock,
+    ThinkingBlock,
+    ToolUseBlock,
+)
+
+DOCUMENTS = [
+    {"a": 1, "b": [1, 2.5, -3e2], "c": {"d": None, "e": True, "f": False}},
+    [],
+    {},
+    "plain",
+    42,
+    {"text": 'quote " backslash \\ newline \n unicode é emoji \U0001f600'},
+    {"nested": [[{"x": [1, {"y": "z"}]}], []]},
+]
+
+
+def _feed_in_chunks(parser: IncrementalJSONParser, text: str, rng: random.Random):
+    events = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 5)
+        events.extend(parser.feed(text[i : i + step]))
+        i += step
+    return events
+
+
+class TestIncrementalJSONParser:
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    def test_matches_json_loads_for_any_fragmentation(self, document):
+        rng = random.Random(0)
+        for text in (json.dumps(document), json.dumps(document, ensure_ascii=False)):
+            for _ in range(20):
+                parser = IncrementalJSONParser()
+                _feed_in_chunks(parser, text, rng)
+                assert parser.finish() == document
+
+    def test_events_report_completed_members(self):
+        parser = IncrementalJSONParser(event_depth=2)
+        events = _feed_in_chunks(
+            parser, '{"a": 1, "items": [{"x": 1}, 2], "b": "s"}', random.Random(1)
+        )
+        assert events == [
+            (("a",), 1),
+            (("items", 0), {"x": 1}),
+            (("items", 1), 2),
+            (("items",), [{"x": 1}, 2]),
+            (("b",), "s"),
+        ]
+
+    def test_snapshot_includes_partial_string_without_mutating(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"path": "/tmp/fi')
+        assert parser.snapshot() == {"path": "/tmp/fi"}
+        assert parser.value == {}
+        parser.feed('le", "n": [1, ')
+        assert parser.snapshot() == {"path": "/tmp/file", "n": [1]}
+        assert not parser.complete
+
+    def test_invalid_input_raises(self):
+        for text in ['{"a" 1}', "[1 2]", '{"a": tru e}', '"\\x"', "{}}"]:
+            parser = IncrementalJSONParser()
+            with pytest.raises(PartialJSONError):
+                parser.feed(text)
+                parser.finish()
+
+    def test_finish_incomplete_raises(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"a": [1')
+        with pytest.raises(PartialJSONError):
+            parser.finish()
+
+
+def _event(event: dict, parent_tool_use_id: str | None = None) -> StreamEvent:
+    return StreamEvent(
+        uuid="evt",
+        session_id="session-1",
+        event=event,
+        parent_tool_use_id=parent_tool_use_id,
+    )
+
+
+def _stream(parent_tool_use_id: str | None = None) -> list[StreamEvent]:
+    events = [
+        {"type": "message_start", "message": {"model": "claude-sonnet-4-5"}},
+        {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "thinking", "thinking": ""},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "thinking_delta", "thinking": "Need to "},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "thinking_delta", "thinking": "read it."},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "signature_delta", "signature": "sig"},
+        },
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "content_block_start",
+            "index": 1,
+            "content_block": {"type": "text", "text": ""},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 1,
+            "delta": {"type": "text_delta", "text": "Reading "},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 1,
+            "delta": {"type": "text_delta", "text": "the file."},
+        },
+        {"type": "content_block_stop", "index": 1},
+        {
+            "type": "content_block_start",
+            "index": 2,
+            "content_block": {
+                "type": "tool_use",
+                "id": "toolu_01",
+                "name": "Read",
+                "input": {},
+            },
+        },
+        {
+            "type": "content_block_delta",
+            "index": 2,
+            "delta": {"type": "input_json_delta", "partial_json": '{"file_pa'},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 2,
+            "delta": {"type": "input_json_delta", "partial_json": 'th": "/tmp/x.py"}'},
+        },
+        {"type": "content_block_stop", "index": 2},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use"}},
+        {"type": "message_stop"},
+    ]
+    return [_event(e, parent_tool_use_id) for e in events]
+
+
+class TestStreamAssembler:
+    def test_assembles_final_message(self):
+        assembler = StreamAssembler()
+        results = [assembler.feed(event) for event in _stream()]
+
+        assert results[:-1] == [None] * (len(results) - 1)
+        message = results[-1]
+        assert isinstance(message, AssistantMessage)
+        assert message.model == "claude-sonnet-4-5"
+        assert message.content == [
+            ThinkingBlock(thinking="Need to read it.", signature="sig"),
+            TextBlock(text="Reading the file."),
+            ToolUseBlock(id="toolu_01", name="Read", input={"file_path": "/tmp/x.py"}),
+        ]
+        assert assembler.snapshot() is None
+
+    def test_snapshots_while_streaming(self):
+        assembler = StreamAssembler()
+        events = _stream()
+        for event in events[:8]:
+            assembler.feed(event)
+        snapshot = assembler.snapshot()
+        assert snapshot is not None
+        assert snapshot.content[1] == TextBlock(text="Reading ")
+        assert assembler.text(1) == "Reading "
+
+        for event in events[8:12]:
+            assembler.feed(event)
+        snapshot = assembler.snapshot()
+        assert snapshot is not None
+        assert snapshot.content[1] == TextBlock(text="Reading the file.")
+        # The first key is still being streamed
+        assert snapshot.content[2] == ToolUseBlock(id="toolu_01", name="Read", input={})
+
+    def test_interleaved_subagent_messages(self):
+        assembler = StreamAssembler()
+        main, sub = _stream(), _stream("toolu_parent")
+        finished = []
+        for a, b in zip(main, sub, strict=True):
+            for event in (a, b):
+                if (message := assembler.feed(event)) is not None:
+                    finished.append(message)
+
+        assert [m.parent_tool_use_id for m in finished] == [None, "toolu_parent"]
+        assert finished[0].content == finished[1].content
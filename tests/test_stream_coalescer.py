@@ -0,0 +1,179 @@
+"""Tests for stream event coalescing."""
+
+import anyio
+import pytest
+
+from claude_agent_sdk._internal.query import Query
+from claude_agent_sdk._internal.stream_coalescer import StreamEventCoalescer
+from claude_agent_sdk._internal.transport import Transport
+
+
+def _delta(text: str, index: int = 0, delta_type: str = "text_delta") -> dict:
+    field = {"text_delta": "text", "input_json_delta": "partial_json"}[delta_type]
+    return {
+        "type": "stream_event",
+        "uuid": f"evt-{text}",
+        "session_id": "session-1",
+        "parent_tool_use_id": None,
+        "event": {
+            "type": "content_block_delta",
+            "index": index,
+            "delta": {"type": delta_type, field: text},
+        },
+    }
+
+
+def _stop(index: int = 0) -> dict:
+    return {
+        "type": "stream_event",
+        "uuid": "evt-stop",
+        "session_id": "session-1",
+        "event": {"type": "content_block_stop", "index": index},
+    }
+
+
+def _texts(messages: list[dict]) -> list[str | None]:
+    return [m["event"].get("delta", {}).get("text") for m in messages]
+
+
+class TestStreamEventCoalescer:
+    def test_merges_same_block_deltas_until_other_message(self):
+        coalescer = StreamEventCoalescer(max_bytes=1000)
+        out = []
+        for message in [_delta("a"), _delta("b"), _delta("c"), _stop()]:
+            out.extend(coalescer.add(message, now=0.0))
+
+        assert _texts(out) == ["abc", None]
+        assert out[0]["uuid"] == "evt-a"
+        assert coalescer.stats() == {"events_in": 4, "events_out": 2}
+
+    def test_does_not_merge_across_blocks_or_delta_types(self):
+        coalescer = StreamEventCoalescer(max_bytes=1000)
+        out = []
+        for message in [
+            _delta("a", index=0),
+            _delta("b", index=1),
+            _delta('{"x"', index=1, delta_type="input_json_delta"),
+            _delta(": 1}", index=1, delta_type="input_json_delta"),
+        ]:
+            out.extend(coalescer.add(message, now=0.0))
+        out.extend(coalescer.flush())
+
+        assert [m["event"]["delta"] for m in out] == [
+            {"type": "text_delta", "text": "a"},
+            {"type": "text_delta", "text": "b"},
+            {"type": "input_json_delta", "partial_json": '{"x": 1}'},
+        ]
+
+    def test_byte_window(self):
+        coalescer = StreamEventCoalescer(max_bytes=4)
+        out = []
+        for text in ["ab", "cd", "e", "é", "f"]:
+            out.extend(coalescer.add(_delta(text), now=0.0))
+        out.extend(coalescer.flush())
+        # "é" is two bytes in UTF-8
+        assert _texts(out) == ["abcd", "eéf"]
+
+    def test_time_window(self):
+        coalescer = StreamEventCoalescer(window=0.05)
+        assert coalescer.add(_delta("a"), now=1.0) == []
+        assert coalescer.deadline == pytest.approx(1.05)
+        assert coalescer.add(_delta("b"), now=1.01) == []
+        assert coalescer.flush_due(now=1.02) == []
+        assert _texts(coalescer.flush_due(now=1.05)) == ["ab"]
+        assert coalescer.deadline is None
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            StreamEventCoalescer(window=-1)
+        with pytest.raises(ValueError):
+            StreamEventCoalescer(max_bytes=0)
+
+
+class _PausingTransport(Transport):
+    """Yields a few deltas, then waits before finishing the block."""
+
+    def __init__(self, resume: anyio.Event):
+        self._resume = resume
+
+    async def connect(self) -> None:
+        pass
+
+    async def write(self, data: str) -> None:
+        pass
+
+    def read_messages(self):
+        async def _read():
+            for text in ["Hel", "lo", "!"]:
+                yield _delta(text)
+            await self._resume.wait()
+            yield _stop()
+
+        return _read()
+
+    async def close(self) -> None:
+        pass
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def end_input(self) -> None:
+        pass
+
+
+class TestQueryCoalescing:
+    @pytest.mark.asyncio
+    async def test_time_window_releases_held_deltas(self):
+        resume = anyio.Event()
+        query = Query(
+            transport=_PausingTransport(resume),
+            is_streaming_mode=True,
+            coalesce_window=0.01,
+        )
+        await query.start()
+        received = []
+        async for message in query.receive_messages():
+            received.append(message)
+            # The merged delta arrives while the CLI is still silent
+            if len(received) == 1:
+                resume.set()
+
+        assert _texts(received) == ["Hello!", None]
+        assert query.coalescing_stats == {"events_in": 4, "events_out": 2}
+        await query.close()
+
+    @pytest.mark.asyncio
+    async def test_held_deltas_arrive_before_reader_error(self):
+        class FailingTransport(_PausingTransport):
+            def read_messages(self):
+                async def _read():
+                    yield _delta("Hel")
+                    yield _delta("lo")
+                    raise RuntimeError("CLI went away")
+
+                return _read()
+
+        query = Query(
+            transport=FailingTransport(anyio.Event()),
+            is_streaming_mode=True,
+            coalesce_window=10.0,
+        )
+        await query.start()
+        received = []
+        with pytest.raises(Exception, match="CLI went away"):
+            async for message in query.receive_messages():
+                received.append(message)
+
+        assert _texts(received) == ["Hello"]
+        await query.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        resume = anyio.Event()
+        resume.set()
+        query = Query(transport=_PausingTransport(resume), is_streaming_mode=True)
+        await query.start()
+        received = [message async for message in query.receive_messages()]
+        assert len(received) == 4
+        assert query.coalescing_stats is None
+        await query.close()
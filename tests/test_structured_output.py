@@ -0,0 +1,153 @@
+"""Tests for streaming structured output."""
+
+import json
+
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeAgentOptions,
+    StructuredOutputError,
+    StructuredOutputStream,
+)
+from claude_agent_sdk.types import ResultMessage, StreamEvent
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "records": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "tags": {"type": "array"}},
+                "required": ["id"],
+            },
+        },
+        "done": {"type": "boolean"},
+    },
+    "required": ["title", "records"],
+    "additionalProperties": False,
+}
+
+OPTIONS = ClaudeAgentOptions(output_format={"type": "json_schema", "schema": SCHEMA})
+
+
+def _events(output: str, chunk_size: int = 7, index: int = 1) -> list[StreamEvent]:
+    raw = [
+        {"type": "message_start", "message": {"model": "claude-sonnet-4-5"}},
+        {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": '{"title": "ignored"}'},
+        },
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "content_block_start",
+            "index": index,
+            "content_block": {
+                "type": "tool_use",
+                "id": "toolu_01",
+                "name": "StructuredOutput",
+                "input": {},
+            },
+        },
+        *(
+            {
+                "type": "content_block_delta",
+                "index": index,
+                "delta": {
+                    "type": "input_json_delta",
+                    "partial_json": output[i : i + chunk_size],
+                },
+            }
+            for i in range(0, len(output), chunk_size)
+        ),
+        {"type": "content_block_stop", "index": index},
+        {"type": "message_stop"},
+    ]
+    return [
+        StreamEvent(uuid=str(i), session_id="s", event=e) for i, e in enumerate(raw)
+    ]
+
+
+def _collect(reader: StructuredOutputStream, messages) -> list:
+    reported = []
+    for message in messages:
+        reported.extend(reader.feed(message))
+    return reported
+
+
+class TestStructuredOutputStream:
+    def test_reports_fields_and_items_as_they_close(self):
+        output = {
+            "title": "Report",
+            "records": [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}],
+            "done": True,
+        }
+        reader = StructuredOutputStream.from_options(OPTIONS)
+        events = _events(json.dumps(output))
+
+        # The first record is reported before the second has streamed
+        seen = []
+        for event in events:
+            for path, value in reader.feed(event):
+                seen.append(path)
+                if path == ("records", 0):
+                    assert value == {"id": 1, "tags": ["a"]}
+                    assert "records" in reader.snapshot()
+                    assert not reader.complete
+
+        assert seen == [
+            ("title",),
+            ("records", 0),
+            ("records", 1),
+            ("records",),
+            ("done",),
+        ]
+        assert reader.complete
+        assert reader.result == output
+
+    def test_rejects_item_not_matching_schema(self):
+        reader = StructuredOutputStream(OPTIONS.output_format)
+        output = json.dumps({"title": "T", "records": [{"id": "one"}]})
+        with pytest.raises(StructuredOutputError, match="records/0/id"):
+            _collect(reader, _events(output))
+
+    def test_rejects_unexpected_property_early(self):
+        reader = StructuredOutputStream(SCHEMA)
+        with pytest.raises(StructuredOutputError, match="Unexpected property"):
+            _collect(reader, _events('{"extra": 1, "title": "T", "records": []}'))
+
+    def test_checks_required_on_completion(self):
+        reader = StructuredOutputStream(SCHEMA)
+        with pytest.raises(StructuredOutputError, match="'records'"):
+            _collect(reader, _events('{"title": "T"}'))
+
+    def test_falls_back_to_result_message(self):
+        reader = StructuredOutputStream(SCHEMA)
+        output = {"title": "T", "records": [{"id": 1}]}
+        result = ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=1,
+            session_id="s",
+            structured_output=output,
+        )
+        assert reader.feed(result) == [
+            (("title",), "T"),
+            (("records", 0), {"id": 1}),
+            (("records",), [{"id": 1}]),
+        ]
+        assert reader.result == output
+
+    def test_root_array_and_no_schema(self):
+        reader = StructuredOutputStream()
+        reported = _collect(reader, _events('[{"a": [1, 2]}, 3]', chunk_size=2))
+        assert reported == [((0,), {"a": [1, 2]}), ((1,), 3)]
@@ -327,3 +327,51 @@ class TestSubprocessBuffering:
             assert messages[2]["subtype"] == "end"
 
         anyio.run(_test)
+
+    def test_raw_messages_split_across_chunks(self) -> None:
+        """Test raw reading yields each line's bytes unchanged."""
+
+        async def _test() -> None:
+            msg1 = json.dumps({"type": "system", "subtype": "start"}).encode()
+            msg2 = json.dumps(
+                {"type": "assistant", "message": {"content": "é" * 100}},
+                ensure_ascii=False,
+            ).encode()
+            stream = msg1 + b"\n" + msg2 + b"\n\n"
+            # Split inside the multi-byte character as well as mid-line
+            chunks = [stream[:10], stream[10:41], stream[41:]]
+
+            transport = SubprocessCLITransport(prompt="test", options=make_options())
+
+            mock_process = MagicMock()
+            mock_process.returncode = None
+            mock_process.wait = AsyncMock(return_value=None)
+            mock_process.stdout = MockTextReceiveStream(chunks)  # type: ignore[arg-type]
+            transport._process = mock_process
+
+            lines = [line async for line in transport.read_raw_messages()]
+            assert lines == [msg1, msg2]
+
+        anyio.run(_test)
+
+    def test_raw_messages_buffer_size_exceeded(self) -> None:
+        """Test raw reading enforces max_buffer_size on unterminated lines."""
+
+        async def _test() -> None:
+            transport = SubprocessCLITransport(
+                prompt="test", options=make_options(max_buffer_size=100)
+            )
+
+            mock_process = MagicMock()
+            mock_process.returncode = None
+            mock_process.wait = AsyncMock(return_value=None)
+            mock_process.stdout = MockTextReceiveStream([b'{"a": "' + b"x" * 200])  # type: ignore[arg-type]
+            transport._process = mock_process
+
+            with pytest.raises(CLIJSONDecodeError) as exc_info:
+                async for _ in transport.read_raw_messages():
+                    pass
+
+            assert "maximum buffer size of 100 bytes" in str(exc_info.value)
+
+        anyio.run(_test)
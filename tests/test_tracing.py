@@ -0,0 +1,130 @@
+"""Tests for per-turn latency traces."""
+
+import json
+
+import anyio
+import pytest
+
+from claude_agent_sdk import (
+    ClaudeSDKClient,
+    HookMatcher,
+    PermissionResultAllow,
+    TurnTracer,
+)
+from claude_agent_sdk.testing import FakeCLIWorkload
+
+
+def test_turn_from_messages():
+    tracer = TurnTracer()
+    trace = tracer.session()
+    trace.span("spawn", "process", 0.0, 0.5)
+    trace.prompt_sent(1.0)
+    trace.prompt_sent(1.1)  # queued behind the first turn
+    trace.message({"type": "system", "session_id": "s1"}, 1.2)
+    trace.message(
+        {
+            "type": "stream_event",
+            "event": {
+                "type": "content_block_delta",
+                "delta": {"type": "text_delta", "text": "hi"},
+            },
+        },
+        1.5,
+    )
+    trace.message(
+        {
+            "type": "assistant",
+            "message": {
+                "content": [
+                    {"type": "text", "text": "hi"},
+                    {"type": "tool_use", "id": "t1", "name": "Read", "input": {}},
+                    {"type": "tool_use", "id": "t2", "name": "Grep", "input": {}},
+                ]
+            },
+        },
+        1.6,
+    )
+    trace.span("permission:Read", "control", 1.7, 1.8)
+    trace.message(
+        {
+            "type": "user",
+            "message": {
+                "content": [{"type": "tool_result", "tool_use_id": "t1", "content": ""}]
+            },
+        },
+        2.0,
+    )
+    trace.message({"type": "result", "subtype": "success", "num_turns": 2}, 3.0)
+
+    [turn] = tracer.turns
+    assert (turn.index, turn.session_id, turn.start, turn.end) == (1, "s1", 1.0, 3.0)
+    assert turn.time_to_first_token == 0.5
+    assert turn.mark("first_stream_event") == 0.5
+    spans = {e.name: e for e in turn.events if e.end is not None}
+    assert spans["spawn"].duration == 0.5
+    assert spans["tool:Read"].duration == pytest.approx(0.4)
+    assert spans["tool:Grep"].args == {"tool_use_id": "t2", "unfinished": True}
+    assert spans["permission:Read"].start == 1.7
+
+    # The queued prompt's turn began when the first one ended
+    trace.message({"type": "result", "subtype": "success"}, 4.0)
+    second = tracer.turns[1]
+    assert (second.index, second.start, second.end) == (2, 3.0, 4.0)
+    assert second.events[0].name == "queued"
+
+    chrome = tracer.to_chrome_trace()
+    events = chrome["traceEvents"]
+    assert events[0]["ph"] == "M" and events[0]["args"]["name"] == "session s1"
+    turn_event = next(e for e in events if e["name"] == "turn 1")
+    assert turn_event["ph"] == "X" and turn_event["dur"] == pytest.approx(2e6)
+    begin = next(e for e in events if e["name"] == "tool:Read" and e["ph"] == "b")
+    end = next(e for e in events if e["name"] == "tool:Read" and e["ph"] == "e")
+    assert begin["id"] == end["id"]
+    assert end["ts"] - begin["ts"] == pytest.approx(4e5)
+    json.dumps(chrome)
+
+
+@pytest.mark.asyncio
+async def test_client_trace(fake_options, tmp_path):
+    async def allow(tool_name, tool_input, context):
+        return PermissionResultAllow()
+
+    async def hook(hook_input, tool_use_id, context):
+        return {}
+
+    tracer = TurnTracer()
+    options = fake_options(
+        FakeCLIWorkload(tool_calls=1),
+        tracer=tracer,
+        can_use_tool=allow,
+        include_partial_messages=True,
+        hooks={"PreToolUse": [HookMatcher(hooks=[hook])]},
+    )
+    with anyio.fail_after(30):
+        async with ClaudeSDKClient(options) as client:
+            for prompt in ("one", "two"):
+                await client.query(prompt)
+                async for _ in client.receive_response():
+                    pass
+
+    first, second = tracer.turns
+    assert first.session_id and first.session_id == second.session_id
+    names = [event.name for event in first.events]
+    for name in (
+        "spawn",
+        "initialize",
+        "first_stream_event",
+        "first_text_token",
+        "tool:Read",
+        "permission:Read",
+        "hook:PreToolUse",
+        "result",
+    ):
+        assert name in names
+    assert "spawn" not in [event.name for event in second.events]
+    assert 0 < first.time_to_first_token < first.duration
+
+    path = tmp_path / "trace.json"
+    tracer.write(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["turn 1", "turn 2"]
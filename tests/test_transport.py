@@ -500,3 +500,29 @@ class TestSubprocessCLITransport:
                 assert user_passed == "claude"
 
         anyio.run(_test)
+
+
+@pytest.mark.asyncio
+async def test_close_escalates_to_sigkill(fake_options):
+    """A CLI that ignores SIGTERM is killed once the grace period is over."""
+    from claude_agent_sdk import ClaudeSDKClient, MetricsRegistry
+    from claude_agent_sdk.testing import FakeCLIWorkload
+
+    registry = MetricsRegistry()
+    options = fake_options(
+        FakeCLIWorkload(hang_on_exit=True),
+        close_grace_period=0.2,
+        metrics=registry,
+    )
+    with anyio.fail_after(10):
+        async with ClaudeSDKClient(options) as client:
+            transport = client._transport
+            await client.query("hi")
+            async for _ in client.receive_response():
+                pass
+
+    stats = transport.close_stats
+    assert stats["outcome"] == "killed"
+    assert 0.2 <= stats["seconds"] < 5
+    [closed] = registry.to_dict()["claude_sdk_process_close_seconds"]
+    assert closed["labels"] == {"outcome": "killed"}
@@ -6,6 +6,8 @@ from claude_agent_sdk import (
     ResultMessage,
 )
 from claude_agent_sdk.types import (
+    StreamEvent,
+    SystemMessage,
     TextBlock,
     ThinkingBlock,
     ToolResultBlock,
@@ -72,6 +74,29 @@ class TestMessageTypes:
         assert msg.total_cost_usd == 0.01
         assert msg.session_id == "session-123"
 
+    def test_message_types_use_slots(self):
+        """Test that message and block instances carry no per-instance __dict__."""
+        instances = [
+            TextBlock(text="hi"),
+            ThinkingBlock(thinking="hmm", signature="sig"),
+            ToolUseBlock(id="t1", name="Read", input={}),
+            ToolResultBlock(tool_use_id="t1"),
+            UserMessage(content="hi"),
+            AssistantMessage(content=[], model="claude-sonnet-4-5"),
+            SystemMessage(subtype="init", data={}),
+            ResultMessage(
+                subtype="success",
+                duration_ms=1,
+                duration_api_ms=1,
+                is_error=False,
+                num_turns=1,
+                session_id="s",
+            ),
+            StreamEvent(uuid="u", session_id="s", event={}),
+        ]
+        for instance in instances:
+            assert not hasattr(instance, "__dict__"), type(instance).__name__
+
 
 class TestOptions:
     """Test Options configuration."""